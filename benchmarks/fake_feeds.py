@@ -0,0 +1,235 @@
+"""
+Servidor Local de Feeds
+Responde todos os endpoints externos (The Odds API, stats.nba.com,
+cdn.nba.com, ESPN RSS, fbref) a partir dos fixtures gravados, com latência,
+taxa de erro e tamanho de payload configuráveis
+
+Uso:
+    python benchmarks/fake_feeds.py --port 8765 --latency 150 --jitter 50
+    python benchmarks/fake_feeds.py --error-rate 0.2 --feed-error odds=1.0 --scale 20
+
+    # em outro terminal (todas as bases apontam para o servidor):
+    FEEDS_BASE_URL=http://127.0.0.1:8765 ODDS_API_KEY=fake streamlit run Home.py
+    FEEDS_BASE_URL=http://127.0.0.1:8765 ODDS_API_KEY=fake python -m core.scan
+
+GET /__stats devolve as contagens de requisições/erros por feed.
+"""
+import argparse
+import copy
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from fixtures import DATA_DIR, FEEDS, Feed
+
+
+class FeedSettings:
+    """Latência/erros por feed (valores globais com sobrescrita por nome)"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, scale: int = 1, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.scale = scale
+        self.feed_latency: Dict[str, float] = {}
+        self.feed_error: Dict[str, float] = {}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def delay(self, feed: str) -> float:
+        base = self.feed_latency.get(feed, self.latency_ms)
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, base + jitter) / 1000
+
+    def should_fail(self, feed: str) -> bool:
+        rate = self.feed_error.get(feed, self.error_rate)
+        if rate <= 0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < rate
+
+
+def _scale_body(feed: Feed, raw: bytes, scale: int) -> bytes:
+    """
+    Aumenta o payload `scale` vezes mantendo o formato da fonte.
+
+    Odds: replica os jogos (IDs únicos). Gamelog: replica as linhas.
+    RSS: replica os itens. Demais feeds têm tamanho fixo (30 times / 20 clubes).
+    """
+    if scale <= 1:
+        return raw
+    if feed.name == 'odds':
+        games = json.loads(raw)
+        out = []
+        for c in range(scale):
+            for game in games:
+                g = copy.deepcopy(game)
+                g['id'] = f"{game['id']}-{c}"
+                out.append(g)
+        return json.dumps(out, separators=(',', ':')).encode()
+    if feed.name == 'gamelog':
+        data = json.loads(raw)
+        data['resultSets'][0]['rowSet'] *= scale
+        return json.dumps(data, separators=(',', ':')).encode()
+    if feed.name == 'news':
+        text = raw.decode('utf-8')
+        items = ''.join(re.findall(r'<item>.*?</item>', text, flags=re.S))
+        return text.replace('</channel>', items * (scale - 1) + '</channel>').encode('utf-8')
+    return raw
+
+
+def load_bodies(scale: int = 1) -> Dict[str, Tuple[bytes, str]]:
+    """Carrega (e escala) todos os fixtures: {feed: (corpo, etag)}."""
+    bodies = {}
+    for feed in FEEDS:
+        raw = _scale_body(feed, (DATA_DIR / feed.fixture).read_bytes(), scale)
+        bodies[feed.name] = (raw, '"' + hashlib.md5(raw).hexdigest() + '"')
+    return bodies
+
+
+def route(path: str, query: Dict[str, str]) -> Optional[Feed]:
+    """Feed correspondente ao caminho/parâmetros (o de match mais específico vence)."""
+    best = None
+    for feed in FEEDS:
+        if feed.path.lower() != path.rstrip('/').lower():
+            continue
+        if all(query.get(k) == v for k, v in feed.match.items()):
+            if best is None or len(feed.match) > len(best.match):
+                best = feed
+    return best
+
+
+def make_handler(settings: FeedSettings, bodies: Dict[str, Tuple[bytes, str]], quiet: bool = False):
+    stats: Dict[str, Dict[str, int]] = {}
+    stats_lock = threading.Lock()
+
+    def count(feed: str, key: str) -> None:
+        with stats_lock:
+            row = stats.setdefault(feed, {'requests': 0, 'errors': 0, 'not_modified': 0})
+            row[key] += 1
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                sys.stderr.write(f"[FAKE] {self.address_string()} {fmt % args}\n")
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/__stats':
+                with stats_lock:
+                    body = json.dumps(stats, indent=2).encode()
+                return self._send(200, body, 'application/json')
+
+            feed = route(url.path, dict(parse_qsl(url.query, keep_blank_values=True)))
+            if feed is None:
+                return self._send(404, b'{"message":"unknown endpoint"}', 'application/json')
+
+            count(feed.name, 'requests')
+            time.sleep(settings.delay(feed.name))
+
+            if settings.should_fail(feed.name):
+                count(feed.name, 'errors')
+                return self._send(settings.error_status, b'{"message":"injected failure"}', 'application/json')
+
+            body, etag = bodies[feed.name]
+            if self.headers.get('If-None-Match') == etag:
+                count(feed.name, 'not_modified')
+                return self._send(304, b'', feed.content_type, {'ETag': etag})
+
+            headers = {'ETag': etag, 'Cache-Control': 'max-age=60'}
+            if feed.name == 'odds':
+                headers.update({'x-requests-remaining': '500', 'x-requests-used': '0'})
+            self._send(200, body, feed.content_type, headers)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, settings: Optional[FeedSettings] = None,
+          quiet: bool = False) -> ThreadingHTTPServer:
+    """
+    Cria o servidor (sem iniciar o loop). Use `serve_forever()` ou uma thread.
+
+    Args:
+        host, port: Endereço de escuta (port=0 escolhe uma porta livre)
+        settings: Latência/erros/escala
+        quiet: Não loga cada requisição
+
+    Returns:
+        ThreadingHTTPServer pronto (server.server_address tem a porta real)
+    """
+    settings = settings or FeedSettings()
+    handler = make_handler(settings, load_bodies(settings.scale), quiet)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _parse_overrides(values, flag: str) -> Dict[str, float]:
+    names = {f.name for f in FEEDS}
+    out = {}
+    for item in values or []:
+        name, _, value = item.partition('=')
+        if name not in names:
+            raise SystemExit(f"{flag}: feed desconhecido '{name}' (use um de: {', '.join(sorted(names))})")
+        out[name] = float(value)
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Servidor local que replica os feeds externos')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência base por resposta (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Variação uniforme ± na latência (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas com erro (0-1)')
+    parser.add_argument('--error-status', type=int, default=503, help='Status HTTP dos erros injetados')
+    parser.add_argument('--scale', type=int, default=1, help='Multiplica o tamanho dos payloads de odds/gamelog/news')
+    parser.add_argument('--feed-latency', action='append', metavar='FEED=MS', help='Latência de um feed (repetível)')
+    parser.add_argument('--feed-error', action='append', metavar='FEED=TAXA', help='Taxa de erro de um feed (repetível)')
+    parser.add_argument('--seed', type=int, help='Semente da latência/erros (reprodutível)')
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    settings = FeedSettings(args.latency, args.jitter, args.error_rate, args.error_status, args.scale, args.seed)
+    settings.feed_latency = _parse_overrides(args.feed_latency, '--feed-latency')
+    settings.feed_error = _parse_overrides(args.feed_error, '--feed-error')
+
+    server = serve(args.host, args.port, settings, args.quiet)
+    host, port = server.server_address[:2]
+    print(f"[OK] Feeds locais em http://{host}:{port} ({len(FEEDS)} endpoints, escala {args.scale}x)")
+    print(f"     export FEEDS_BASE_URL=http://{host}:{port} ODDS_API_KEY=fake")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,449 @@
+"""
+Fixtures dos Benchmarks
+Respostas gravadas de cada feed externo (The Odds API, stats.nba.com,
+cdn.nba.com, ESPN RSS, fbref), tabela da Premier League e ledgers sintéticos
+de apostas; tudo determinístico e sem rede
+
+Uso:
+    python benchmarks/fixtures.py --record     # regrava os feeds a partir das fontes reais
+    python benchmarks/fixtures.py --synthetic  # regrava os feeds sintéticos (mesmo formato das fontes)
+"""
+import argparse
+import copy
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+ODDS_FIXTURE = DATA_DIR / 'odds_nba.json'
+EPL_TABLE = ROOT / 'dados_pl.csv'
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Casas do slate sintético (as padrão + as que aparecem em us/eu)
+SYNTHETIC_BOOKS = [
+    'pinnacle', 'bet365', 'draftkings', 'fanduel',
+    'betmgm', 'williamhill_us', 'betrivers', 'unibet_eu'
+]
+
+LEDGER_COLUMNS = ["Data", "Jogo", "Tipo", "Aposta", "Odd", "Valor", "Resultado", "Lucro"]
+
+
+@dataclass(frozen=True)
+class Feed:
+    """Um endpoint externo e o arquivo de fixture que o representa"""
+    name: str
+    base: str                 # Campo de Config com a base do feed (ex: 'odds_api_base_url')
+    path: str                 # Caminho da URL
+    fixture: str              # Arquivo em DATA_DIR
+    content_type: str = 'application/json'
+    match: Dict[str, str] = field(default_factory=dict)  # Parâmetros de query que distinguem o feed
+
+
+# Todos os endpoints chamados pelo data_fetcher, pelo store e pelas páginas
+FEEDS = [
+    Feed('odds', 'odds_api_base_url', '/v4/sports/basketball_nba/odds', 'odds_nba.json'),
+    Feed('nba_stats_base', 'nba_stats_base_url', '/stats/leaguedashteamstats', 'nba_leaguedash_base.json',
+         match={'MeasureType': 'Base'}),
+    Feed('nba_stats_advanced', 'nba_stats_base_url', '/stats/leaguedashteamstats', 'nba_leaguedash_advanced.json',
+         match={'MeasureType': 'Advanced'}),
+    Feed('gamelog', 'nba_stats_base_url', '/stats/playergamelog', 'nba_playergamelog.json'),
+    Feed('league_gamelog_team', 'nba_stats_base_url', '/stats/leaguegamelog', 'nba_leaguegamelog_team.json',
+         match={'PlayerOrTeam': 'T'}),
+    Feed('league_gamelog_player', 'nba_stats_base_url', '/stats/leaguegamelog', 'nba_leaguegamelog_player.json',
+         match={'PlayerOrTeam': 'P'}),
+    Feed('scoreboard', 'nba_cdn_base_url', '/static/json/liveData/scoreboard/todaysScoreboard_00.json',
+         'nba_scoreboard.json'),
+    Feed('news', 'espn_base_url', '/espn/rss/nba/news', 'espn_nba_news.xml', 'application/rss+xml; charset=utf-8'),
+    Feed('fbref', 'fbref_base_url', '/en/comps/9/Premier-League-Stats', 'fbref_pl.html', 'text/html; charset=utf-8'),
+]
+
+
+def load_odds() -> List[Dict]:
+    """Slate gravado (lista de jogos no formato da The Odds API v4)."""
+    with open(ODDS_FIXTURE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def large_slate(copies: int) -> List[Dict]:
+    """
+    Replica o slate gravado `copies` vezes com IDs de evento únicos.
+
+    Args:
+        copies: Número de cópias do slate
+
+    Returns:
+        Lista de jogos (len = copies × jogos do fixture)
+    """
+    base = load_odds()
+    games = []
+    for c in range(copies):
+        for game in base:
+            g = copy.deepcopy(game)
+            g['id'] = f"{game['id']}-{c}"
+            games.append(g)
+    return games
+
+
+def load_epl_stats() -> Dict[str, List[int]]:
+    """Tabela da Premier League no formato da página: {time: [jogos, GF, GA]}."""
+    df = pd.read_csv(EPL_TABLE)
+    return {row.Squad: [int(row.MP), int(row.GF), int(row.GA)] for row in df.itertuples()}
+
+
+def synthetic_ledger(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Histórico de apostas sintético com o mesmo esquema do bets_history.csv.
+
+    Args:
+        rows: Número de apostas
+        seed: Semente do gerador
+
+    Returns:
+        DataFrame com as colunas do ledger (últimas 5% pendentes)
+    """
+    from core.teams import NBA_TEAMS
+
+    rng = np.random.default_rng(seed)
+    names = np.array([t.name for t in NBA_TEAMS.teams.values()])
+    home = names[rng.integers(0, len(names), rows)]
+    away = names[rng.integers(0, len(names), rows)]
+    line = rng.choice(np.arange(-12.5, 13.0, 1.0), rows)
+    start = datetime(2024, 10, 22, 19, 0)
+    dates = [(start + timedelta(minutes=int(m))).strftime("%Y-%m-%d %H:%M")
+             for m in np.sort(rng.integers(0, 60 * 24 * 365, rows))]
+
+    odd = rng.uniform(1.80, 2.10, rows).round(2)
+    valor = rng.choice([25.0, 50.0, 75.0, 100.0], rows)
+    resultado = rng.choice(['Green', 'Red', 'Void'], rows, p=[0.52, 0.45, 0.03]).astype(object)
+    resultado[int(rows * 0.95):] = 'Pendente'
+    lucro = np.select(
+        [resultado == 'Green', resultado == 'Red'],
+        [valor * (odd - 1), -valor],
+        0.0
+    ).round(2)
+
+    return pd.DataFrame({
+        "Data": dates,
+        "Jogo": [f"{a} @ {h}" for a, h in zip(away, home)],
+        "Tipo": "Spread",
+        "Aposta": [f"{h} {p:+.1f}" for h, p in zip(home, line)],
+        "Odd": odd,
+        "Valor": valor,
+        "Resultado": resultado,
+        "Lucro": lucro
+    }, columns=LEDGER_COLUMNS)
+
+
+def synthetic_league_logs(n_games: int = 82, roster: int = 10, seed: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    LeagueGameLog sintético (times e jogadores) dos 30 times com impacto real conhecido.
+
+    Cada jogador tem um impacto verdadeiro (o primeiro de cada time é a
+    estrela, 4-7 pts) e falta 12% dos jogos; a margem do time cai o impacto
+    de quem estiver fora, mais ruído de 12 pts; o plus-minus em quadra carrega
+    o mesmo impacto.
+
+    Returns:
+        (team_log, player_log) com as colunas de core.star_impact e a coluna
+        extra TRUE_IMPACT no player_log
+    """
+    from core.teams import NBA_TEAMS
+
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 10, 22)
+    team_rows, player_rows = [], []
+    for t, abbr in enumerate(NBA_TEAMS.teams):
+        impact = np.concatenate([[rng.uniform(4, 7)], rng.uniform(0, 2.5, roster - 1)])
+        minutes = np.concatenate([[36.0], rng.uniform(14, 32, roster - 1)])
+        strength = rng.normal(0, 4)
+        for g in range(n_games):
+            game_id, day = f"0022400{t:02d}{g:03d}", (start + timedelta(days=2 * g)).strftime('%Y-%m-%d')
+            out = rng.random(roster) < 0.12
+            margin = int(round(strength - impact[out].sum() + rng.normal(0, 12)))
+            team_rows.append([abbr, game_id, day, margin])
+            for i in np.flatnonzero(~out):
+                # Em quadra o time rende `impacto × 48/min` a mais que com o reserva
+                pm = int(round(margin * minutes[i] / 48 + impact[i] * (48 - minutes[i]) / 48 + rng.normal(0, 4)))
+                player_rows.append([t * 100 + i, f"{abbr} Player {i}", abbr, game_id, day,
+                                    int(minutes[i]), pm, float(impact[i])])
+
+    team_log = pd.DataFrame(team_rows, columns=['TEAM_ABBREVIATION', 'GAME_ID', 'GAME_DATE', 'PLUS_MINUS'])
+    player_log = pd.DataFrame(player_rows, columns=['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'GAME_ID',
+                                                    'GAME_DATE', 'MIN', 'PLUS_MINUS', 'TRUE_IMPACT'])
+    return team_log, player_log
+
+
+def _synthetic_slate(n_games: int = 15, seed: int = 7) -> List[Dict]:
+    """Slate no formato v4 da The Odds API (h2h, spreads e totals por casa)."""
+    from core.teams import NBA_TEAMS
+
+    rng = np.random.default_rng(seed)
+    names = [t.name for t in NBA_TEAMS.teams.values()]
+    order = rng.permutation(len(names))
+    start = datetime(2025, 1, 15, 0, 0, tzinfo=timezone.utc)
+    games = []
+
+    for g in range(min(n_games, len(names) // 2)):
+        home, away = names[order[2 * g]], names[order[2 * g + 1]]
+        spread = float(rng.choice(np.arange(-13.5, 14.0, 0.5)))
+        total = float(rng.choice(np.arange(212.5, 241.0, 0.5)))
+        commence = (start + timedelta(minutes=30 * g)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        bookmakers = []
+        for book in SYNTHETIC_BOOKS:
+            sp = spread + float(rng.choice([-0.5, 0.0, 0.0, 0.5]))
+            tt = total + float(rng.choice([-1.0, -0.5, 0.0, 0.5, 1.0]))
+            p_home = 1 / (1 + 10 ** (sp / 13))
+            vig = 1.045 if book != 'pinnacle' else 1.025
+            updated = commence.replace('T00', 'T18')
+
+            def price(p):
+                return round(1 / (p * vig) + float(rng.normal(0, 0.01)), 2)
+
+            bookmakers.append({
+                'key': book,
+                'title': book.replace('_', ' ').title(),
+                'last_update': updated,
+                'markets': [
+                    {'key': 'h2h', 'last_update': updated, 'outcomes': [
+                        {'name': home, 'price': price(p_home)},
+                        {'name': away, 'price': price(1 - p_home)}
+                    ]},
+                    {'key': 'spreads', 'last_update': updated, 'outcomes': [
+                        {'name': home, 'price': price(0.5), 'point': sp},
+                        {'name': away, 'price': price(0.5), 'point': -sp}
+                    ]},
+                    {'key': 'totals', 'last_update': updated, 'outcomes': [
+                        {'name': 'Over', 'price': price(0.5), 'point': tt},
+                        {'name': 'Under', 'price': price(0.5), 'point': tt}
+                    ]}
+                ]
+            })
+        games.append({
+            'id': f"{rng.integers(0, 2**63):016x}",
+            'sport_key': 'basketball_nba',
+            'sport_title': 'NBA',
+            'commence_time': commence,
+            'home_team': home,
+            'away_team': away,
+            'bookmakers': bookmakers
+        })
+    return games
+
+
+def _nba_result_set(resource: str, name: str, headers: List[str], rows: List[List]) -> Dict:
+    """Envelope de resposta da stats.nba.com."""
+    return {'resource': resource, 'parameters': {},
+            'resultSets': [{'name': name, 'headers': headers, 'rowSet': rows}]}
+
+
+def _synthetic_league_dash(measure: str, seed: int = 11) -> Dict:
+    """LeagueDashTeamStats (Base ou Advanced) com os 30 times."""
+    from core.teams import NBA_TEAMS
+
+    rng = np.random.default_rng(seed)
+    teams = list(NBA_TEAMS.teams.values())
+    net = np.sort(rng.normal(0, 5, len(teams)))[::-1][rng.permutation(len(teams))].round(1)
+    gp = 41
+    rows = []
+    for team, n in zip(teams, net):
+        w = int(np.clip(round(gp * (0.5 + n / 30)), 5, gp - 5))
+        common = [team.source_id, team.name, gp, w, gp - w, round(w / gp, 3), 48.0 * gp]
+        if measure == 'Base':
+            pts = round(112 + n / 2 + rng.normal(0, 2), 1)
+            rows.append(common + [round(pts / 2.6, 1), round(pts / 1.2, 1), 0.47, 13.0, 36.0, 0.36,
+                                  17.0, 22.0, 0.78, 10.5, 33.5, 44.0, 26.0, 13.5, 7.5, 5.0, pts, round(n * gp, 1)])
+        else:
+            pace = round(float(rng.uniform(96, 104)), 1)
+            off = round(114 + n / 2, 1)
+            rows.append(common + [off, round(off - n, 1), float(n), 0.62, 0.26, 0.74, 0.50, 0.13,
+                                  round(0.54 + n / 200, 3), round(0.58 + n / 200, 3), pace, 0.5])
+    if measure == 'Base':
+        headers = ['TEAM_ID', 'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT', 'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A',
+                   'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'PTS', 'PLUS_MINUS']
+    else:
+        headers = ['TEAM_ID', 'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT', 'MIN', 'OFF_RATING', 'DEF_RATING', 'NET_RATING',
+                   'AST_PCT', 'OREB_PCT', 'DREB_PCT', 'REB_PCT', 'TM_TOV_PCT', 'EFG_PCT', 'TS_PCT', 'PACE', 'PIE']
+    return _nba_result_set('leaguedashteamstats', 'LeagueDashTeamStats', headers, rows)
+
+
+def _synthetic_gamelog(n_games: int = 60, seed: int = 13) -> Dict:
+    """PlayerGameLog de um jogador (mais recente primeiro)."""
+    from core.teams import NBA_TEAMS
+
+    rng = np.random.default_rng(seed)
+    opponents = list(NBA_TEAMS.teams)
+    start = datetime(2025, 3, 30)
+    headers = ['SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'FGM', 'FGA', 'FG_PCT',
+               'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK',
+               'TOV', 'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE']
+    rows = []
+    for g in range(n_games):
+        pts, reb, ast = (int(x) for x in (rng.poisson(26), rng.poisson(8), rng.poisson(5)))
+        fga = max(pts // 2 + 3, 1)
+        fgm = min(pts // 2 - 1, fga) if pts > 2 else 0
+        opp = opponents[g % len(opponents)]
+        rows.append(['22024', 1628369, f"00224{g:05d}", (start - timedelta(days=2 * g)).strftime('%b %d, %Y').upper(),
+                     f"BOS {'vs.' if g % 2 else '@'} {opp}", 'W' if rng.random() < 0.6 else 'L', int(rng.integers(30, 40)),
+                     fgm, fga, round(fgm / fga, 3), 3, 9, 0.333, 4, 5, 0.8, reb // 4, reb - reb // 4, reb, ast,
+                     1, 1, 3, 2, pts, int(rng.integers(-15, 16)), 1])
+    return _nba_result_set('playergamelog', 'PlayerGameLog', headers, rows)
+
+
+def _synthetic_league_gamelog(kind: str) -> Dict:
+    """LeagueGameLog da temporada ('T' = times, 'P' = jogadores) a partir de synthetic_league_logs."""
+    team_log, player_log = synthetic_league_logs()
+    df = team_log if kind == 'T' else player_log.drop(columns='TRUE_IMPACT')
+    df = df.assign(SEASON_ID='22024')[['SEASON_ID', *df.columns]]
+    return _nba_result_set('leaguegamelog', 'LeagueGameLog', list(df.columns), json.loads(df.to_json(orient='values')))
+
+
+def _synthetic_scoreboard(games: List[Dict]) -> Dict:
+    """todaysScoreboard_00 com os jogos do slate (agendado, ao vivo e finalizado)."""
+    from core.teams import NBA_TEAMS
+
+    out = []
+    for i, game in enumerate(games):
+        status = (1, 2, 3)[i % 3]
+        home, away = NBA_TEAMS.get(game['home_team']), NBA_TEAMS.get(game['away_team'])
+        period = 0 if status == 1 else (3 if status == 2 else 4)
+        score_h, score_a = (0, 0) if status == 1 else (78 + i, 74 + 2 * i) if status == 2 else (112 + i, 105 + i)
+        out.append({
+            'gameId': f"00224{i:05d}",
+            'gameStatus': status,
+            'gameStatusText': ('7:30 pm ET', 'Q3 5:12', 'Final')[status - 1],
+            'period': period,
+            'gameClock': 'PT05M12.00S' if status == 2 else '',
+            'gameTimeUTC': game['commence_time'],
+            'homeTeam': {'teamId': home.source_id, 'teamName': home.nickname, 'teamCity': home.name[:-len(home.nickname) - 1],
+                         'teamTricode': home.id, 'score': score_h},
+            'awayTeam': {'teamId': away.source_id, 'teamName': away.nickname, 'teamCity': away.name[:-len(away.nickname) - 1],
+                         'teamTricode': away.id, 'score': score_a},
+        })
+    return {'meta': {'version': 1, 'code': 200}, 'scoreboard': {'gameDate': games[0]['commence_time'][:10], 'games': out}}
+
+
+def _synthetic_news(n_items: int = 12) -> str:
+    """RSS 2.0 no formato do feed de NBA da ESPN."""
+    headlines = [
+        "Star guard ruled out with ankle injury", "Team completes trade for veteran forward",
+        "Coach praises defense after third straight win", "Center questionable for Friday's game",
+        "Rookie sets franchise record in overtime thriller", "Forward suspended one game for flagrant foul",
+    ]
+    start = datetime(2025, 1, 15, 18, 0, tzinfo=timezone.utc)
+    items = "".join(
+        f"<item><title><![CDATA[{headlines[i % len(headlines)]} ({i})]]></title>"
+        f"<link>https://www.espn.com/nba/story/_/id/{40000000 + i}</link>"
+        f"<pubDate>{format_datetime(start - timedelta(minutes=37 * i))}</pubDate></item>"
+        for i in range(n_items)
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{escape("www.espn.com - NBA")}</title><link>https://www.espn.com</link>{items}</channel></rss>')
+
+
+def _synthetic_fbref() -> str:
+    """Página da Premier League do fbref com a tabela de classificação (a partir do dados_pl.csv)."""
+    table = pd.read_csv(EPL_TABLE).to_html(index=False, table_id='results2024-2591_overall')
+    return f"<html><head><title>Premier League Stats | FBref.com</title></head><body>{table}</body></html>"
+
+
+def _write(feed: Feed, body) -> None:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATA_DIR / feed.fixture
+    if isinstance(body, (bytes, bytearray)):
+        path.write_bytes(body)
+    elif isinstance(body, str):
+        path.write_text(body, encoding='utf-8')
+    else:
+        path.write_text(json.dumps(body, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    print(f"[OK] {feed.name} gravado em {path}")
+
+
+def write_synthetic() -> None:
+    """Regrava todos os fixtures sintéticos (determinísticos)."""
+    feeds = {f.name: f for f in FEEDS}
+    games = _synthetic_slate()
+    _write(feeds['odds'], games)
+    _write(feeds['nba_stats_base'], _synthetic_league_dash('Base'))
+    _write(feeds['nba_stats_advanced'], _synthetic_league_dash('Advanced'))
+    _write(feeds['gamelog'], _synthetic_gamelog())
+    _write(feeds['league_gamelog_team'], _synthetic_league_gamelog('T'))
+    _write(feeds['league_gamelog_player'], _synthetic_league_gamelog('P'))
+    _write(feeds['scoreboard'], _synthetic_scoreboard(games))
+    _write(feeds['news'], _synthetic_news())
+    _write(feeds['fbref'], _synthetic_fbref())
+
+
+def record() -> int:
+    """
+    Grava as respostas atuais das fontes reais.
+
+    Odds usa a API key da config; stats.nba.com passa pelo nba_api.
+
+    Returns:
+        Número de feeds que falharam
+    """
+    import requests
+    from core.config import DEFAULT_BASE_URLS, get_config
+
+    config = get_config()
+    failures = 0
+    for feed in FEEDS:
+        try:
+            if feed.name == 'odds':
+                from core.data_fetcher import DEFAULT_BOOKMAKERS
+                params = {'api_key': config.require_odds_api_key(), 'regions': 'us,eu',
+                          'markets': 'h2h,spreads,totals', 'oddsFormat': 'decimal',
+                          'bookmakers': ','.join(DEFAULT_BOOKMAKERS)}
+            elif feed.name.startswith('nba_stats'):
+                from nba_api.stats.endpoints import leaguedashteamstats
+                _write(feed, leaguedashteamstats.LeagueDashTeamStats(
+                    season=config.nba_season, measure_type_detailed_defense=feed.match['MeasureType']).get_json())
+                continue
+            elif feed.name == 'gamelog':
+                from nba_api.stats.endpoints import playergamelog
+                _write(feed, playergamelog.PlayerGameLog(player_id=1628369, season=config.nba_season).get_json())
+                continue
+            elif feed.name.startswith('league_gamelog'):
+                from nba_api.stats.endpoints import leaguegamelog
+                _write(feed, leaguegamelog.LeagueGameLog(
+                    season=config.nba_season, player_or_team_abbreviation=feed.match['PlayerOrTeam']).get_json())
+                continue
+            else:
+                params = {}
+            base_key = feed.base.upper()
+            response = requests.get(f"{DEFAULT_BASE_URLS[base_key]}{feed.path}", params=params, timeout=20,
+                                    headers={'User-Agent': 'Mozilla/5.0'})
+            response.raise_for_status()
+            _write(feed, response.content)
+        except Exception as e:
+            print(f"[ERROR] {feed.name}: {e}")
+            failures += 1
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Regrava os fixtures dos feeds externos')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--record', action='store_true', help='Grava as respostas atuais das fontes reais')
+    group.add_argument('--synthetic', action='store_true', help='Grava os fixtures sintéticos determinísticos')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        write_synthetic()
+        return 0
+    return 1 if record() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark de Tempo de Import
+Mede o import a frio dos módulos leves do core com `python -X importtime`
+(um processo novo por rodada) e falha se o tempo passar do orçamento ou se
+alguma dependência pesada vazar para o import
+
+Uso:
+    python benchmarks/import_time.py            # tabela + exit 1 em regressão
+    python benchmarks/import_time.py --json     # saída para CI/cron
+    python benchmarks/import_time.py --runs 15 --scale 2.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dependências que a camada de matemática/CLI não pode puxar no import
+HEAVY = ('pandas', 'numpy', 'scipy', 'nba_api', 'streamlit', 'requests', 'feedparser', 'deep_translator')
+
+# Módulo -> (orçamento em ms, dependências proibidas)
+BUDGETS = {
+    'core.odds_engine': (40.0, HEAVY),
+    'core.star_impact': (20.0, HEAVY),
+    'core.teams': (30.0, HEAVY),
+    'core.config': (80.0, HEAVY),
+    'core.scan': (120.0, HEAVY),
+}
+
+
+def measure(module: str) -> Dict:
+    """
+    Importa o módulo em um processo novo com -X importtime.
+
+    Returns:
+        Dict com 'ms' (cumulativo dos imports de `core`) e 'modules' (todos os importados)
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append(name.strip())
+        # Linhas de nível 0 (sem indentação) de `core` já somam tudo que elas importam
+        if name[1:2] != ' ' and name.strip().split('.')[0] == 'core':
+            total_us += int(cumulative)
+    return {'ms': total_us / 1000, 'modules': modules}
+
+
+def run(runs: int = 7, scale: float = 1.0) -> List[Dict]:
+    """
+    Mede cada módulo de BUDGETS `runs` vezes e compara a mediana com o orçamento.
+
+    Args:
+        runs: Rodadas por módulo (processo novo em cada)
+        scale: Multiplicador dos orçamentos (ex: 2.0 em máquinas lentas)
+
+    Returns:
+        Lista de resultados por módulo
+    """
+    results = []
+    for module, (budget, forbidden) in BUDGETS.items():
+        samples = [measure(module) for _ in range(runs)]
+        leaked = sorted({
+            m.split('.')[0] for m in samples[0]['modules'] if m.split('.')[0] in forbidden
+        })
+        median_ms = statistics.median(s['ms'] for s in samples)
+        results.append({
+            'module': module,
+            'median_ms': round(median_ms, 2),
+            'min_ms': round(min(s['ms'] for s in samples), 2),
+            'budget_ms': budget * scale,
+            'leaked': leaked,
+            'ok': median_ms <= budget * scale and not leaked
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark de import a frio do core')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplicador dos orçamentos')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.scale)
+    if args.json:
+        print(json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2))
+    else:
+        for r in results:
+            status = '[OK]' if r['ok'] else '[FAIL]'
+            extra = f" | vazou: {', '.join(r['leaked'])}" if r['leaked'] else ''
+            print(f"{status} {r['module']:<20} {r['median_ms']:7.2f} ms (orçamento {r['budget_ms']:.0f} ms){extra}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
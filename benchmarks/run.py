@@ -0,0 +1,460 @@
+"""
+Suíte de Benchmarks Offline
+Mede os caminhos quentes do modelo (Poisson, odds_engine, parse de odds) e do
+backoffice (ledgers de 1k/100k/1M linhas) a partir dos fixtures em disco,
+grava JSON e compara com o baseline salvo
+
+Uso:
+    python benchmarks/run.py                          # roda tudo e compara com baseline.json
+    python benchmarks/run.py --quick                  # sem o ledger de 1M linhas
+    python benchmarks/run.py -k backoffice -o out.json
+    python benchmarks/run.py --save-baseline          # atualiza benchmarks/baseline.json
+    python benchmarks/run.py -k exposure --save-baseline   # atualiza só os casos filtrados
+
+Caso sem baseline conta como falha: quem adiciona (ou acelera) um caso grava
+o baseline dele no mesmo commit.
+"""
+import argparse
+import ast
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import fixtures  # também coloca a raiz do repositório no sys.path
+
+from core import backoffice, calibration, cards, clv, epl_table, exposure, live_model, odds_engine, portfolio, star_impact
+from core.data_fetcher import parse_market_odds, summarize_slate
+from core.teams import EPL_TEAMS
+from modelo_poisson import calcular_probabilidades_poisson
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'baseline.json'
+FOOTBALL_PAGE = fixtures.ROOT / 'pages' / '2_⚽_Futebol_Poisson.py'
+
+# Tempo alvo de cada rodada (o número de chamadas por rodada é ajustado a ele)
+TARGET_ROUND_S = 0.2
+
+# Tolerância padrão antes de acusar regressão (mediana / baseline - 1)
+DEFAULT_TOLERANCE = 0.30
+
+# Chamadas acima disso são medidas no máximo SLOW_MAX_REPEAT vezes
+SLOW_CALL_S = 1.0
+SLOW_MAX_REPEAT = 3
+
+LEDGER_SIZES = (1_000, 100_000, 1_000_000)
+
+
+@dataclass
+class Case:
+    """Um benchmark: `setup()` prepara os dados fora da medição e devolve a função medida"""
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    params: Dict = field(default_factory=dict)
+    repeat: int = 5
+
+    @property
+    def key(self) -> str:
+        if not self.params:
+            return self.name
+        args = ','.join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]"
+
+
+def _page_function(path: Path, name: str, namespace: Dict) -> Callable:
+    """
+    Compila só uma função de uma página Streamlit (sem executar a página).
+
+    Args:
+        path: Arquivo da página
+        name: Nome da função
+        namespace: Globais que a função usa
+
+    Returns:
+        A função definida no arquivo
+    """
+    tree = ast.parse(path.read_text(encoding='utf-8'))
+    node = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == name)
+    exec(compile(ast.Module(body=[node], type_ignores=[]), str(path), 'exec'), namespace)
+    return namespace[name]
+
+
+# --- CASOS ---
+
+def _poisson_model():
+    return lambda: calcular_probabilidades_poisson(1.65, 1.12)
+
+
+def _page_calcular_probs():
+    from scipy.stats import poisson
+    calcular_probs = _page_function(FOOTBALL_PAGE, 'calcular_probs', {'EPL_TEAMS': EPL_TEAMS, 'poisson': poisson})
+    stats = fixtures.load_epl_stats()
+    return lambda: calcular_probs('Arsenal', 'Man City', stats)
+
+
+def _epl_table_parse():
+    html = (fixtures.DATA_DIR / 'fbref_pl.html').read_text(encoding='utf-8')
+    return lambda: epl_table.table_stats(epl_table.parse_league_table(html))
+
+
+def _odds_engine():
+    # Um slate típico: 15 jogos por chamada
+    games = [(i % 7 - 3.0, 3 - i % 5, 97 + i % 6, 99 + i % 4) for i in range(15)]
+
+    def run():
+        for h_net, a_net, h_pace, a_pace in games:
+            fair = odds_engine.calculate_fair_spread(h_net, a_net)
+            odds_engine.calculate_fair_total(h_pace, a_pace, 115.0, 112.0, 111.0, 114.0)
+            edge = odds_engine.calculate_edge(fair, -3.5)
+            odds_engine.calculate_win_probability(fair)
+            odds_engine.kelly_stake(edge, 1.91)
+            odds_engine.get_stake_units(edge)
+            odds_engine.four_factors_advantage(0.55, 0.13, 0.26, 0.24, 0.53, 0.14, 0.24, 0.26)
+    return run
+
+
+def _slate_probabilities(n_games: int):
+    def setup():
+        import numpy as np
+        rng = np.random.default_rng(3)
+        fair, line = rng.normal(0, 6, n_games), rng.normal(0, 6, n_games).round() + 0.5
+        total = rng.normal(228, 8, n_games)
+        return lambda: calibration.slate_probabilities(fair, line, total, total.round() + 0.5)
+    return setup
+
+
+def _live_lines(n_games: int):
+    def setup():
+        import numpy as np
+        rng = np.random.default_rng(4)
+        args = (rng.normal(0, 6, n_games), rng.normal(228, 8, n_games), rng.integers(40, 110, n_games),
+                rng.integers(40, 110, n_games), rng.integers(1, 5, n_games), rng.uniform(0, 720, n_games))
+        return lambda: live_model.live_lines(*args)
+    return setup
+
+
+def _portfolio(n_bets: int):
+    def setup():
+        import numpy as np
+        rng = np.random.default_rng(6)
+        bets = [portfolio.Bet(f"b{i}", float(rng.uniform(0.53, 0.62)), 1.91, game=f"g{i // 2}", side=f"t{i % 7}")
+                for i in range(n_bets)]
+        return lambda: portfolio.optimize_stakes(bets)
+    return setup
+
+
+def _parse_market_odds(copies: int):
+    def setup():
+        games = fixtures.large_slate(copies)
+        return lambda: [parse_market_odds(g) for g in games]
+    return setup
+
+
+def _summarize_slate(copies: int):
+    def setup():
+        games = fixtures.large_slate(copies)
+        return lambda: summarize_slate(games)
+    return setup
+
+
+def _render_cards(cached: bool):
+    # 15 cards; cached=True mede um rerun em que nenhum jogo mudou
+    views = [cards.CardView(game_id=f"g{i}", home=f"Home {i}", away=f"Away {i}", tipoff='20:00',
+                            fair=-3.0 + i, market=-2.5 + i, pick=f"Home {i}" if i % 2 else None,
+                            line=-2.5 + i, price=1.91, book='fanduel')
+             for i in range(15)]
+
+    def setup():
+        warm = cards.CardRenderCache()
+        cards.batch_cards(views, warm)
+        if cached:
+            return lambda: cards.batch_cards(views, warm)
+        return lambda: cards.batch_cards(views, cards.CardRenderCache())
+    return setup
+
+
+def _star_impact():
+    team_log, player_log = fixtures.synthetic_league_logs()
+    return lambda: star_impact.impact_table(star_impact.estimate_impacts(team_log, player_log))
+
+
+class _Ledger:
+    """Ledger sintético gravado em um CSV temporário (gerado uma vez por tamanho)"""
+    _cache: Dict[int, Path] = {}
+    _tmp = tempfile.TemporaryDirectory(prefix='nba_bench_')
+
+    @classmethod
+    def path(cls, rows: int) -> Path:
+        if rows not in cls._cache:
+            path = Path(cls._tmp.name) / f'ledger_{rows}.csv'
+            fixtures.synthetic_ledger(rows).to_csv(path, index=False)
+            cls._cache[rows] = path
+        return cls._cache[rows]
+
+    @classmethod
+    def copy(cls, rows: int) -> Path:
+        """Cópia descartável do ledger (casos que gravam não alteram o arquivo dos demais)."""
+        fd, name = tempfile.mkstemp(suffix=f'_{rows}.csv', dir=cls._tmp.name)
+        os.close(fd)
+        shutil.copyfile(cls.path(rows), name)
+        return Path(name)
+
+
+def _ledger_load(rows: int):
+    def setup():
+        path = _Ledger.path(rows)
+        return lambda: backoffice.load_history(str(path))
+    return setup
+
+
+def _ledger_save(rows: int):
+    def setup():
+        path = _Ledger.copy(rows)
+        return lambda: backoffice.save_bet("Boston Celtics @ Miami Heat", "Spread", "Miami Heat +4.5", 1.91, 50.0, str(path))
+    return setup
+
+
+def _ledger_metrics(rows: int):
+    def setup():
+        df = backoffice.load_history(str(_Ledger.path(rows)))
+        return lambda: backoffice.calculate_metrics(df)
+    return setup
+
+
+def _ledger_update(rows: int):
+    def setup():
+        path = _Ledger.copy(rows)
+        df = backoffice.load_history(str(path))
+        return lambda: backoffice.update_results(df, str(path))
+    return setup
+
+
+def _exposure_rebuild(rows: int):
+    def setup():
+        df = backoffice.load_history(str(_Ledger.path(rows)))
+        return lambda: exposure.ExposureIndex.from_history(df)
+    return setup
+
+
+def _exposure_sync(rows: int):
+    # Edição/liquidação de 20 pendentes: o índice alterna entre os dois estados do histórico
+    def setup():
+        df = backoffice.load_history(str(_Ledger.path(rows)))
+        settled = df.copy()
+        settled.loc[df.index[df['Resultado'] == 'Pendente'][:20], 'Resultado'] = 'Green'
+        index = exposure.ExposureIndex.from_history(df)
+        frames = itertools.cycle((settled, df))
+        return lambda: index.sync(next(frames))
+    return setup
+
+
+def _clv_ledger(rows: int):
+    """Ledger com fechamento gravado em todas as apostas (edge e CLV sintéticos)."""
+    import numpy as np
+    df = backoffice.load_history(str(_Ledger.path(rows)))
+    rng = np.random.default_rng(1)
+    df['Edge'] = rng.uniform(0.0, 8.0, rows).round(1)
+    df['CLV_Pts'] = rng.normal(0.0, 1.5, rows).round(2)
+    df['CLV_Prob'] = rng.normal(0.0, 0.04, rows).round(4)
+    return df
+
+
+def _clv_rebuild(rows: int):
+    def setup():
+        df = _clv_ledger(rows)
+        return lambda: clv.CLVIndex.from_history(df)
+    return setup
+
+
+def _clv_settle(rows: int):
+    # Liquidação de 20 pendentes com CLV: só essas linhas trocam de estado no índice
+    def setup():
+        df = _clv_ledger(rows)
+        pending = df.loc[df.index[df['Resultado'] == 'Pendente'][:20]]
+        settled = pending.assign(Resultado='Green')
+        index = clv.CLVIndex.from_history(df)
+        steps = itertools.cycle(((pending, settled), (settled, pending)))
+
+        def run():
+            before, after = next(steps)
+            index.remove(before)
+            index.add(after)
+        return run
+    return setup
+
+
+def _exposure_check():
+    # 15 cards de valor consultando o índice de um ledger de 100k linhas
+    index = exposure.ExposureIndex.from_history(fixtures.synthetic_ledger(100_000))
+    limits = exposure.exposure_limits(1000.0)
+    bet = {"Jogo": "Boston Celtics @ Miami Heat", "Tipo": "Spread", "Aposta": "Miami Heat +4.5", "Odd": 1.91, "Valor": 50.0}
+    return lambda: [index.check(bet, limits) for _ in range(15)]
+
+
+def build_cases(ledger_sizes=LEDGER_SIZES) -> List[Case]:
+    cases = [
+        Case('poisson.calcular_probabilidades_poisson', _poisson_model),
+        Case('page.calcular_probs', _page_calcular_probs),
+        Case('epl_table.parse_league_table', _epl_table_parse),
+        Case('odds_engine.slate_15_games', _odds_engine),
+        Case('calibration.slate_probabilities', _slate_probabilities(15), {'games': 15}),
+        Case('calibration.slate_probabilities', _slate_probabilities(300), {'games': 300}),
+        Case('live_model.live_lines', _live_lines(15), {'games': 15}),
+        Case('portfolio.optimize_stakes', _portfolio(24), {'bets': 24}),
+        Case('star_impact.estimate_league', _star_impact, {'teams': 30}),
+        Case('cards.render_slate', _render_cards(False), {'games': 15}),
+        Case('cards.render_slate_cached', _render_cards(True), {'games': 15}),
+        Case('exposure.check', _exposure_check, {'cards': 15}),
+    ]
+    for copies in (1, 20):
+        n_games = copies * len(fixtures.load_odds())
+        cases.append(Case('data_fetcher.parse_market_odds', _parse_market_odds(copies), {'games': n_games}))
+        cases.append(Case('data_fetcher.summarize_slate', _summarize_slate(copies), {'games': n_games}))
+    for rows in ledger_sizes:
+        cases += [
+            Case('backoffice.load_history', _ledger_load(rows), {'rows': rows}),
+            Case('backoffice.save_bet', _ledger_save(rows), {'rows': rows}),
+            Case('backoffice.calculate_metrics', _ledger_metrics(rows), {'rows': rows}),
+            Case('backoffice.update_results', _ledger_update(rows), {'rows': rows}),
+            Case('exposure.rebuild', _exposure_rebuild(rows), {'rows': rows}),
+            Case('exposure.sync', _exposure_sync(rows), {'rows': rows}),
+            Case('clv.rebuild', _clv_rebuild(rows), {'rows': rows}),
+            Case('clv.settle', _clv_settle(rows), {'rows': rows}),
+        ]
+    return cases
+
+
+# --- MEDIÇÃO ---
+
+def measure(case: Case) -> Dict:
+    """
+    Mede um caso: calibra o número de chamadas por rodada e repete `case.repeat` vezes.
+
+    Returns:
+        Dict com key, median_s/min_s por chamada, number, repeat e ops_per_s
+    """
+    fn = case.setup()
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    number = max(1, int(TARGET_ROUND_S / first)) if first > 0 else 1000
+
+    # Casos lentos (> SLOW_CALL_S por chamada): a chamada de calibração já conta como amostra
+    samples, repeat = [], case.repeat
+    if first >= SLOW_CALL_S:
+        samples, repeat = [first], min(repeat, SLOW_MAX_REPEAT) - 1
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+
+    median_s = statistics.median(samples)
+    return {
+        'key': case.key,
+        'name': case.name,
+        'params': case.params,
+        'median_s': median_s,
+        'min_s': min(samples),
+        'number': number,
+        'repeat': len(samples),
+        'ops_per_s': 1.0 / median_s if median_s > 0 else None
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Compara cada resultado com o baseline (mesma key).
+
+    Returns:
+        Os resultados com 'baseline_s', 'ratio' e 'regression' preenchidos
+        (caso sem baseline = regressão: não passaria despercebido no gate)
+    """
+    base = {r['key']: r for r in baseline.get('results', [])}
+    for r in results:
+        ref = base.get(r['key'])
+        if ref is None:
+            r.update(baseline_s=None, ratio=None, regression=True)
+            continue
+        ratio = r['median_s'] / ref['median_s'] if ref['median_s'] > 0 else None
+        r.update(baseline_s=ref['median_s'], ratio=ratio, regression=ratio is not None and ratio > 1 + tolerance)
+    return results
+
+
+def _fmt(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def _report(results: List[Dict], tolerance: float) -> Dict:
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'tolerance': tolerance,
+        'results': results
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks offline dos caminhos quentes')
+    parser.add_argument('-k', '--filter', help='Roda só casos cujo nome contém o texto')
+    parser.add_argument('--quick', action='store_true', help='Pula o ledger de 1M linhas')
+    parser.add_argument('-o', '--output', help='Grava os resultados em JSON neste arquivo')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help='Baseline para comparação')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Regressão se mediana > baseline × (1 + tolerância)')
+    parser.add_argument('--save-baseline', action='store_true', help='Grava os resultados no baseline (só os casos medidos)')
+    args = parser.parse_args(argv)
+
+    sizes = tuple(s for s in LEDGER_SIZES if not (args.quick and s >= 1_000_000))
+    cases = [c for c in build_cases(sizes) if not args.filter or args.filter in c.key]
+
+    results = []
+    for case in cases:
+        r = measure(case)
+        results.append(r)
+        print(f"  {r['key']:<55} {_fmt(r['median_s'])}", file=sys.stderr)
+
+    baseline = {}
+    if Path(args.baseline).exists():
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+
+    if args.save_baseline:
+        # Casos medidos substituem os do baseline; os demais (fora do filtro/--quick) ficam
+        ran = {r['key'] for r in results}
+        kept = [r for r in baseline.get('results', []) if r['key'] not in ran]
+        baseline = _report(kept + [dict(r) for r in results], args.tolerance)
+        Path(args.baseline).write_text(json.dumps(baseline, indent=2), encoding='utf-8')
+        print(f"[OK] Baseline gravado em {args.baseline} ({len(results)} casos medidos, "
+              f"{len(baseline['results'])} no total)", file=sys.stderr)
+    results = compare(results, baseline, args.tolerance)
+    report = _report(results, args.tolerance)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    print(f"\n{'caso':<55} {'mediana':>11} {'baseline':>11} {'razão':>6}")
+    for r in results:
+        ratio = f"{r['ratio']:.2f}" if r['ratio'] is not None else '-'
+        flag = '  [SEM BASELINE]' if r['baseline_s'] is None else '  [REGRESSÃO]' if r['regression'] else ''
+        print(f"{r['key']:<55} {_fmt(r['median_s'])} {_fmt(r['baseline_s'])} {ratio:>6}{flag}")
+
+    return 1 if any(r['regression'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,41 @@
 # Core module initialization
-from .config import get_config, Config
-from .odds_engine import calculate_fair_spread, calculate_fair_total, calculate_edge, kelly_stake
-from .data_fetcher import get_team_stats, get_odds, get_live_scores, get_news
-from .backoffice import load_history, save_bet, calculate_metrics
-
-__all__ = [
-    'get_config', 'Config',
-    'calculate_fair_spread', 'calculate_fair_total', 'calculate_edge', 'kelly_stake',
-    'get_team_stats', 'get_odds', 'get_live_scores', 'get_news',
-    'load_history', 'save_bet', 'calculate_metrics'
-]
+#
+# Exports carregados sob demanda (PEP 562): `import core.odds_engine` não puxa
+# pandas/nba_api/requests, e `from core import get_odds` só importa o
+# data_fetcher no primeiro acesso.
+import importlib
+
+# Nome exportado -> submódulo que o define
+_EXPORTS = {
+    'get_config': 'config',
+    'reload_config': 'config',
+    'register_provider': 'config',
+    'Config': 'config',
+    'ConfigError': 'config',
+    'calculate_fair_spread': 'odds_engine',
+    'calculate_fair_total': 'odds_engine',
+    'calculate_edge': 'odds_engine',
+    'kelly_stake': 'odds_engine',
+    'get_team_stats': 'data_fetcher',
+    'get_odds': 'data_fetcher',
+    'get_live_scores': 'data_fetcher',
+    'get_news': 'data_fetcher',
+    'load_history': 'backoffice',
+    'save_bet': 'backoffice',
+    'calculate_metrics': 'backoffice',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # próximos acessos não passam mais por aqui
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,172 @@
+"""
+Scanner de Arbitragem e Middles
+Encontra surebets e janelas de middle (spread/total) entre todas as casas e
+mercados do slate a partir de índices de preço ordenados por outcome
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .data_fetcher import slate_frame
+from .tracing import traced
+
+_KEYS = ['event_id', 'market', 'line']
+
+
+def _with_line_key(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Chave de linha comum aos lados opostos do mesmo mercado.
+
+    Spread: perspectiva do mandante (home -3.5 e away +3.5 -> -3.5).
+    Total: o próprio ponto. H2H: 0.
+    """
+    line = df['point'].fillna(0.0)
+    line = np.where((df['market'] == 'spreads') & (df['side'] == 'away'), -line, line)
+    return df.assign(line=np.where(df['market'] == 'h2h', 0.0, line))
+
+
+def _best_prices(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Melhor preço por (keys, lado): ordena uma vez e fica com o topo de cada grupo."""
+    return (df.sort_values('price', ascending=False, kind='stable')
+              .drop_duplicates(keys + ['side']))
+
+
+def find_arbitrage(df: pd.DataFrame, min_roi: float = 0.0) -> pd.DataFrame:
+    """
+    Surebets: combinações de melhor preço por lado cuja soma de implícitas < 1.
+
+    Mercados de 2 vias (spread/total/H2H NBA) e 3 vias (1X2) são tratados
+    igualmente: uma oportunidade exige todos os lados do mercado na mesma linha.
+
+    Args:
+        df: Frame longo do slate (saída de slate_frame)
+        min_roi: Retorno garantido mínimo para reportar (0.01 = 1%)
+
+    Returns:
+        DataFrame com event_id, market, line, n_legs, implied_sum, roi e legs
+        (lista de (lado, casa, odd, fração da stake))
+    """
+    columns = _KEYS + ['n_legs', 'implied_sum', 'roi', 'legs']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    best = _best_prices(_with_line_key(df), _KEYS)
+
+    # Agregações por mercado/linha com bincount (sem groupby por grupo)
+    group, uniques = pd.MultiIndex.from_frame(best[_KEYS]).factorize()
+    inv = 1.0 / best['price'].to_numpy()
+    n_groups = len(uniques)
+    n_legs = np.bincount(group, minlength=n_groups)
+    implied_sum = np.bincount(group, weights=inv, minlength=n_groups)
+    has_draw = np.bincount(group, weights=(best['side'] == 'draw').to_numpy(), minlength=n_groups) > 0
+
+    # Lados exigidos: 3 para H2H com empate, 2 nos demais
+    expected = np.where(has_draw, 3, 2)
+    with np.errstate(divide='ignore'):
+        roi = 1.0 / implied_sum - 1.0
+    hits = np.flatnonzero((n_legs == expected) & (implied_sum < 1.0) & (roi > min_roi))
+    if hits.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Stake proporcional à implícita: o retorno é o mesmo qualquer que seja o vencedor
+    stake = inv / implied_sum[group]
+    legs = {g: [] for g in hits}
+    sides, books, prices = best['side'].to_numpy(), best['book'].to_numpy(), best['price'].to_numpy()
+    for i in np.flatnonzero(np.isin(group, hits)):
+        legs[group[i]].append((sides[i], books[i], prices[i], round(stake[i], 4)))
+
+    out = pd.DataFrame(list(uniques[hits]), columns=_KEYS)
+    out['n_legs'] = n_legs[hits]
+    out['implied_sum'] = implied_sum[hits]
+    out['roi'] = roi[hits]
+    out['legs'] = [legs[g] for g in hits]
+    return out.sort_values('roi', ascending=False)[columns]
+
+
+def find_middles(df: pd.DataFrame, min_width: float = 0.5) -> pd.DataFrame:
+    """
+    Middles: melhor linha de cada lado (casas diferentes) com janela em que ambos ganham.
+
+    A janela precisa conter um placar inteiro: +3.5 / -3 tem 0.5 de largura
+    mas em 3 só dá push no away, então não entra.
+
+    Spread: home +3.5 e away -2.5 -> ambos ganham se o mandante perder por 3.
+    Total: over 218.5 e under 221.5 -> ambos ganham com 219 a 221 pontos.
+
+    Args:
+        df: Frame longo do slate (saída de slate_frame)
+        min_width: Largura mínima da janela em pontos
+
+    Returns:
+        DataFrame com event_id, market, width, legs (lado, casa, linha, odd),
+        worst_case (retorno se só uma perna ganhar) e best_case (se ambas ganharem),
+        por unidade total apostada com stakes equalizadas
+    """
+    columns = ['event_id', 'market', 'width', 'legs', 'worst_case', 'best_case']
+    df = df[df['market'].isin(['spreads', 'totals'])]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Melhor linha por lado: maior ponto (spread/under) ou menor ponto (over); empate -> maior odd.
+    # Guarda as duas melhores casas de cada lado: se os dois topos são da mesma casa, o melhor
+    # par entre casas diferentes usa o segundo de um dos lados (largura = score_1 + score_2)
+    score = np.where(df['side'] == 'over', -df['point'], df['point'])
+    ranked = (df.assign(score=score)
+                .sort_values(['score', 'price'], ascending=False, kind='stable')
+                .drop_duplicates(['event_id', 'market', 'side', 'book']))
+    top = ranked[ranked.groupby(['event_id', 'market', 'side']).cumcount() < 2]
+
+    out = []
+    for market, (s1, s2) in (('spreads', ('home', 'away')), ('totals', ('over', 'under'))):
+        x = top[(top['market'] == market) & (top['side'] == s1)]
+        y = top[(top['market'] == market) & (top['side'] == s2)]
+        pair = x.merge(y, on='event_id', suffixes=('_1', '_2'))
+        pair = pair[pair['book_1'] != pair['book_2']]
+        if pair.empty:
+            continue
+        # Janela aberta (lo, hi) da margem em que as duas pernas ganham:
+        # spread = (fora - casa), total = pontos do jogo
+        if market == 'spreads':
+            lo, hi = -pair['point_2'], pair['point_1']
+        else:
+            lo, hi = pair['point_1'], pair['point_2']
+        # Placar é inteiro: só é middle se algum inteiro cai dentro (senão é push de um lado)
+        wins_both = np.floor(lo) + 1 < hi
+        pair = pair.assign(market=market, width=hi - lo, inv=1.0 / pair['price_1'] + 1.0 / pair['price_2'])
+        pair = pair[wins_both & (pair['width'] >= min_width)]
+        # Um middle por jogo e mercado: a maior janela (empate -> melhores odds)
+        out.append(pair.sort_values(['width', 'inv'], ascending=[False, True], kind='stable')
+                       .drop_duplicates('event_id'))
+
+    res = pd.concat(out, ignore_index=True) if out else pd.DataFrame()
+    if res.empty:
+        return pd.DataFrame(columns=columns)
+
+    res['worst_case'] = 1.0 / res['inv'] - 1.0
+    res['best_case'] = 2.0 / res['inv'] - 1.0
+    res['legs'] = [
+        [(r.side_1, r.book_1, r.point_1, r.price_1), (r.side_2, r.book_2, r.point_2, r.price_2)]
+        for r in res.itertuples()
+    ]
+    return res.sort_values('width', ascending=False)[columns]
+
+
+@traced('model.scan_slate')
+def scan_slate(games: List[Dict], min_roi: float = 0.0, min_width: float = 0.5) -> Dict[str, pd.DataFrame]:
+    """
+    Roda os dois scanners sobre o slate inteiro.
+
+    Args:
+        games: Lista de jogos da The Odds API
+        min_roi: Retorno garantido mínimo das surebets
+        min_width: Largura mínima dos middles
+
+    Returns:
+        Dict com 'arbs' e 'middles'
+    """
+    df = slate_frame(games)
+    return {
+        'arbs': find_arbitrage(df, min_roi),
+        'middles': find_middles(df, min_width)
+    }
@@ -3,12 +3,20 @@ Módulo de Backoffice
 Gerencia persistência de apostas, cálculo de métricas e histórico
 """
 import os
+import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
 from .config import get_config
+from .tracing import traced
+
+LEDGER_COLUMNS = ["Data", "Jogo", "Tipo", "Aposta", "Odd", "Valor", "Resultado", "Lucro"]
+
+# Edge do modelo na entrada e linha de fechamento/CLV (core.clv)
+CLV_COLUMNS = ["Edge", "Linha_Fech", "Odd_Fech", "CLV_Pts", "CLV_Prob"]
 
 
 @dataclass
@@ -27,6 +35,91 @@ class BetMetrics:
     current_streak: int  # Positivo = greens seguidos, Negativo = reds
 
 
+_SELECTION = r'^(?P<sel>.*?)(?:\s+(?P<line>[+-]?\d+(?:\.\d+)?))?\s*$'
+_SELECTION_RE = re.compile(_SELECTION)
+
+
+def parse_bet(jogo: str, tipo: str, aposta: str, data: str = '') -> Dict:
+    """
+    Versão escalar de `parse_bets` para uma aposta (sem pandas no caminho quente).
+
+    Returns:
+        Dict com game, home, away, market, team, side, line e day
+    """
+    from .teams import NBA_TEAMS
+
+    away_name, _, home_name = str(jogo).partition(' @ ')
+    away = NBA_TEAMS.resolve(away_name.strip()) if home_name else None
+    home = NBA_TEAMS.resolve(home_name.strip()) if home_name else None
+    m = _SELECTION_RE.match(str(aposta))
+    sel, line = (m.group('sel'), m.group('line')) if m else (str(aposta), None)
+    team = NBA_TEAMS.resolve(sel.strip())
+
+    side = sel.strip().lower() if sel.strip().lower() in ('over', 'under') else None
+    if team is not None and team in (home, away):
+        side = 'home' if team == home else 'away'
+    valid = home is not None and away is not None
+    return {
+        'game': f"{away}@{home}" if valid else None,
+        'home': home, 'away': away, 'market': str(tipo),
+        'team': team if side in ('home', 'away') else None,
+        'side': side,
+        'line': float(line) if line else float('nan'),
+        'day': str(data)[:10]
+    }
+
+
+def parse_bets(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Interpreta Jogo/Tipo/Aposta de cada linha do histórico (vetorizado).
+
+    Jogo "Away @ Home" vira a chave 'AWAY@HOME' (siglas); Aposta "Time +4.5",
+    "Over 225.5" ou "Time" (ML) vira lado + linha. Linhas fora desse formato
+    (ex: props) ficam com game/team/side vazios.
+
+    Args:
+        df: Linhas do histórico (Data, Jogo, Tipo, Aposta)
+
+    Returns:
+        DataFrame no mesmo índice com game, home, away, market, team,
+        side ('home'/'away'/'over'/'under'), line e day
+    """
+    from .teams import NBA_TEAMS
+
+    columns = ['game', 'home', 'away', 'market', 'team', 'side', 'line', 'day']
+    if df.empty:
+        return pd.DataFrame(columns=columns, index=df.index, dtype=object)
+
+    jogo = df['Jogo'].astype(str).str.split(' @ ', n=1, expand=True).reindex(columns=[0, 1])
+    names = pd.unique(pd.concat([jogo[0], jogo[1]]).dropna())
+    abbr = {n: NBA_TEAMS.resolve(n.strip()) for n in names}
+    away, home = jogo[0].map(abbr), jogo[1].map(abbr)
+
+    sel = df['Aposta'].astype(str).str.extract(_SELECTION)
+    sel_names = pd.unique(sel['sel'].dropna())
+    team = sel['sel'].map({n: NBA_TEAMS.resolve(n.strip()) for n in sel_names})
+    lower = sel['sel'].str.strip().str.lower()
+
+    side = pd.Series(None, index=df.index, dtype=object)
+    side[lower == 'over'] = 'over'
+    side[lower == 'under'] = 'under'
+    side[team.notna() & (team == home)] = 'home'
+    side[team.notna() & (team == away)] = 'away'
+
+    valid = home.notna() & away.notna()
+    return pd.DataFrame({
+        'game': (away + '@' + home).where(valid),
+        'home': home,
+        'away': away,
+        'market': df['Tipo'].astype(str),
+        'team': team.where(side.isin(['home', 'away'])),
+        'side': side,
+        'line': pd.to_numeric(sel['line'], errors='coerce'),
+        'day': df['Data'].astype(str).str[:10]
+    }, index=df.index)
+
+
+@traced('ledger.load')
 def load_history(filepath: Optional[str] = None) -> pd.DataFrame:
     """
     Carrega histórico de apostas do CSV.
@@ -40,30 +133,32 @@ def load_history(filepath: Optional[str] = None) -> pd.DataFrame:
     config = get_config()
     filepath = filepath or config.bets_history_file
     
-    columns = ["Data", "Jogo", "Tipo", "Aposta", "Odd", "Valor", "Resultado", "Lucro"]
+    columns = LEDGER_COLUMNS + CLV_COLUMNS
     
     if not os.path.exists(filepath):
         return pd.DataFrame(columns=columns)
     
     try:
         df = pd.read_csv(filepath)
-        # Garante que todas as colunas existem
-        for col in columns:
-            if col not in df.columns:
-                df[col] = None
+        # Histórico anterior ao esquema: colunas que faltam entram uma vez, numéricas (NaN)
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            df = df.reindex(columns=[*df.columns, *missing], fill_value=np.nan)
         return df
     except Exception as e:
         print(f"Erro ao carregar histórico: {e}")
         return pd.DataFrame(columns=columns)
 
 
+@traced('ledger.save')
 def save_bet(
     jogo: str,
     tipo: str,
     aposta: str,
     odd: float,
     valor: float,
-    filepath: Optional[str] = None
+    filepath: Optional[str] = None,
+    edge: Optional[float] = None
 ) -> bool:
     """
     Salva uma nova aposta no histórico.
@@ -75,6 +170,7 @@ def save_bet(
         odd: Odds decimais
         valor: Valor apostado em R$
         filepath: Caminho do arquivo
+        edge: Edge do modelo em pontos na entrada (agrupa o CLV por faixa)
     
     Returns:
         True se salvou com sucesso
@@ -83,8 +179,6 @@ def save_bet(
     filepath = filepath or config.bets_history_file
     
     try:
-        df = load_history(filepath)
-        
         new_row = pd.DataFrame([{
             "Data": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "Jogo": jogo,
@@ -93,11 +187,17 @@ def save_bet(
             "Odd": odd,
             "Valor": valor,
             "Resultado": "Pendente",
-            "Lucro": 0.0
+            "Lucro": 0.0,
+            "Edge": edge
         }])
         
-        df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(filepath, index=False)
+        if not append_rows(new_row, filepath):
+            df = pd.concat([load_history(filepath), new_row], ignore_index=True)
+            df.to_csv(filepath, index=False)
+
+        from . import clv, exposure
+        exposure.on_bets_added(filepath, new_row)
+        clv.on_bets_added(filepath)
         return True
         
     except Exception as e:
@@ -105,6 +205,58 @@ def save_bet(
         return False
 
 
+def append_rows(rows: pd.DataFrame, filepath: str) -> bool:
+    """
+    Acrescenta linhas ao fim do CSV sem reler o histórico.
+
+    As linhas seguem a ordem de colunas do cabeçalho do arquivo. Se o arquivo
+    não existir, não terminar em quebra de linha ou não tiver uma coluna
+    preenchida nas linhas novas (histórico anterior ao esquema), não grava nada.
+
+    Returns:
+        True se acrescentou, False se o chamador precisa regravar o arquivo
+    """
+    if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+        return False
+    with open(filepath, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            return False
+    columns = pd.read_csv(filepath, nrows=0).columns
+    if rows.columns.difference(columns).intersection(rows.columns[rows.notna().any()]).size:
+        return False
+    with open(filepath, 'a', encoding='utf-8', newline='') as f:
+        rows.reindex(columns=columns).to_csv(f, index=False, header=False)
+    return True
+
+
+def write_rows_from(df: pd.DataFrame, filepath: str, start: int) -> bool:
+    """
+    Regrava o CSV só a partir da linha posicional `start` (as anteriores ficam intactas).
+
+    As pendentes ficam no fim do histórico: liquidar uma noite reescreve a
+    cauda do arquivo em vez das 100k+ linhas. Se o arquivo não bater com o
+    frame (cabeçalho e número de linhas), cai na gravação completa.
+
+    Returns:
+        True se gravou só a cauda, False se precisou regravar tudo
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n'))
+    header = df.iloc[0:0].to_csv(index=False).encode('utf-8')
+    if len(newlines) != len(df) + 1 or not 0 <= start < len(df) or not data.startswith(header):
+        df.to_csv(filepath, index=False)
+        return False
+    offset = int(newlines[start]) + 1   # newlines[0] fecha o cabeçalho
+    with open(filepath, 'r+b') as f:
+        f.seek(offset)
+        f.truncate()
+        f.write(df.iloc[start:].to_csv(index=False, header=False).encode('utf-8'))
+    return True
+
+
+@traced('ledger.update')
 def update_results(df: pd.DataFrame, filepath: Optional[str] = None) -> pd.DataFrame:
     """
     Recalcula o lucro baseado nos resultados e salva.
@@ -119,19 +271,23 @@ def update_results(df: pd.DataFrame, filepath: Optional[str] = None) -> pd.DataF
     config = get_config()
     filepath = filepath or config.bets_history_file
     
-    for i, row in df.iterrows():
-        if row['Resultado'] == 'Green':
-            # Lucro = Valor * (Odd - 1)
-            df.at[i, 'Lucro'] = row['Valor'] * (row['Odd'] - 1)
-        elif row['Resultado'] == 'Red':
-            df.at[i, 'Lucro'] = -row['Valor']
-        else:  # Pendente ou Void
-            df.at[i, 'Lucro'] = 0.0
+    # Green: Valor * (Odd - 1) | Red: -Valor | Pendente ou Void: 0
+    valor = pd.to_numeric(df['Valor'], errors='coerce')
+    odd = pd.to_numeric(df['Odd'], errors='coerce')
+    resultado = df['Resultado']
+    df['Lucro'] = np.select([resultado == 'Green', resultado == 'Red'], [valor * (odd - 1), -valor], 0.0)
     
     df.to_csv(filepath, index=False)
+
+    # Liquidação/edição muda pendentes e lucros: exposição recebe só a diferença de pendentes,
+    # CLV é refeito do frame em memória (nenhum dos dois relê o CSV)
+    from . import clv, exposure
+    exposure.on_history_rewritten(filepath, df)
+    clv.on_history_rewritten(filepath, df)
     return df
 
 
+@traced('ledger.metrics')
 def calculate_metrics(df: pd.DataFrame) -> BetMetrics:
     """
     Calcula métricas de performance do histórico.
@@ -0,0 +1,273 @@
+"""
+Calibração de Probabilidades
+Mapeia spread/total justos em probabilidade de vitória, cobertura e over com
+um modelo normal (margem ~ N(a + b × linha justa, σ)) ajustado em resultados
+históricos; coeficientes pré-computados, avaliação escalar sem numpy e
+vetorizada para o slate inteiro, mais diagnóstico de confiabilidade
+
+Uso (reajuste com um CSV de resultados: fair_spread, margin[, fair_total, total]):
+    python -m core.calibration historico.csv            # ajusta e mostra a confiabilidade
+    python -m core.calibration historico.csv --save     # grava calibration.json
+"""
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+# Arquivo com coeficientes reajustados (ausente = DEFAULT_CALIBRATION)
+CALIBRATION_FILE = "calibration.json"
+
+_SQRT2 = math.sqrt(2.0)
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """
+    Coeficientes do modelo normal.
+
+    Margem do mandante ~ N(spread_intercept + spread_slope × (-fair_spread), spread_sigma)
+    Total de pontos   ~ N(total_intercept + total_slope × fair_total, total_sigma)
+    """
+    spread_intercept: float = 0.0
+    spread_slope: float = 1.0
+    spread_sigma: float = 12.0   # Desvio do resultado em torno da linha (NBA ≈ 12 pts)
+    total_intercept: float = 0.0
+    total_slope: float = 1.0
+    total_sigma: float = 18.5    # Desvio do total em torno da linha (NBA ≈ 18-19 pts)
+    n_games: int = 0
+    fitted_at: Optional[str] = None
+
+
+# Coeficientes embarcados (resíduos típicos de linhas de fechamento da NBA)
+DEFAULT_CALIBRATION = Calibration()
+
+_active: Optional[Calibration] = None
+
+
+def load_calibration(path: str = CALIBRATION_FILE) -> Calibration:
+    """
+    Lê coeficientes de um JSON gravado por `save_calibration`.
+
+    Returns:
+        Calibration do arquivo ou DEFAULT_CALIBRATION se ausente/inválido
+    """
+    if not os.path.exists(path):
+        return DEFAULT_CALIBRATION
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return Calibration(**json.load(f))
+    except Exception as e:
+        print(f"[WARN] Erro ao ler calibração: {e}")
+        return DEFAULT_CALIBRATION
+
+
+def save_calibration(cal: Calibration, path: str = CALIBRATION_FILE) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(asdict(cal), f, indent=2)
+    print(f"[OK] Calibração gravada em {path}")
+
+
+def get_calibration() -> Calibration:
+    """Calibração ativa do processo (lida do disco uma vez)."""
+    global _active
+    if _active is None:
+        _active = load_calibration()
+    return _active
+
+
+def set_calibration(cal: Optional[Calibration]) -> None:
+    """Troca a calibração ativa (None relê do disco no próximo acesso)."""
+    global _active
+    _active = cal
+
+
+# --- ESCALAR (sem numpy: usado pelo odds_engine) ---
+
+def _phi(z: float) -> float:
+    return 0.5 * math.erfc(-z / _SQRT2)
+
+
+def win_probability(fair_spread: float, cal: Optional[Calibration] = None) -> float:
+    """
+    Probabilidade de vitória do mandante dado o spread justo.
+
+    Args:
+        fair_spread: Spread justo do mandante (negativo = favorito)
+        cal: Coeficientes (usa get_calibration se não fornecido)
+    """
+    cal = cal or get_calibration()
+    mu = cal.spread_intercept - cal.spread_slope * fair_spread
+    return _phi(mu / cal.spread_sigma)
+
+
+def cover_probability(fair_spread: float, line: float, cal: Optional[Calibration] = None) -> float:
+    """
+    Probabilidade do mandante cobrir `line` (ex: -3.5 = vencer por 4+).
+
+    Args:
+        fair_spread: Spread justo do mandante
+        line: Linha do mandante no mercado
+    """
+    cal = cal or get_calibration()
+    mu = cal.spread_intercept - cal.spread_slope * fair_spread
+    return _phi((mu + line) / cal.spread_sigma)
+
+
+def over_probability(fair_total: float, line: float, cal: Optional[Calibration] = None) -> float:
+    """Probabilidade do total passar de `line`."""
+    cal = cal or get_calibration()
+    mu = cal.total_intercept + cal.total_slope * fair_total
+    return _phi((mu - line) / cal.total_sigma)
+
+
+def edge_probability(edge: float, market: str = 'spreads', cal: Optional[Calibration] = None) -> float:
+    """
+    Probabilidade de acerto de uma aposta `edge` pontos melhor que a linha justa.
+
+    Args:
+        edge: Vantagem em pontos (linha apostada - linha justa, a favor)
+        market: 'spreads' ou 'totals' (define σ)
+    """
+    cal = cal or get_calibration()
+    if market == 'totals':
+        return _phi(edge * cal.total_slope / cal.total_sigma)
+    return _phi(edge * cal.spread_slope / cal.spread_sigma)
+
+
+# --- VETORIZADO (slate inteiro) ---
+
+def slate_probabilities(
+    fair_spread,
+    spread_line=None,
+    fair_total=None,
+    total_line=None,
+    cal: Optional[Calibration] = None
+) -> Dict:
+    """
+    Probabilidades de todos os jogos do slate em expressões de array.
+
+    Args:
+        fair_spread: Array de spreads justos (perspectiva do mandante)
+        spread_line: Array de linhas de spread do mandante (opcional)
+        fair_total: Array de totais justos (opcional)
+        total_line: Array de linhas de total (opcional)
+
+    Returns:
+        Dict com 'home_win' e, se as linhas forem dadas, 'home_cover' e 'over'
+    """
+    import numpy as np
+    from scipy.special import ndtr
+
+    cal = cal or get_calibration()
+    mu = cal.spread_intercept - cal.spread_slope * np.asarray(fair_spread, dtype=float)
+    out = {'home_win': ndtr(mu / cal.spread_sigma)}
+    if spread_line is not None:
+        out['home_cover'] = ndtr((mu + np.asarray(spread_line, dtype=float)) / cal.spread_sigma)
+    if fair_total is not None and total_line is not None:
+        mu_t = cal.total_intercept + cal.total_slope * np.asarray(fair_total, dtype=float)
+        out['over'] = ndtr((mu_t - np.asarray(total_line, dtype=float)) / cal.total_sigma)
+    return out
+
+
+# --- AJUSTE E DIAGNÓSTICO ---
+
+def fit_calibration(fair_spread, margin, fair_total=None, total=None) -> Calibration:
+    """
+    Ajusta os coeficientes por mínimos quadrados (MLE do modelo normal).
+
+    Args:
+        fair_spread: Spreads justos pré-jogo (mandante)
+        margin: Margem final do mandante
+        fair_total: Totais justos pré-jogo (opcional)
+        total: Totais finais (opcional)
+
+    Returns:
+        Calibration ajustada (totais ficam no padrão se não fornecidos)
+    """
+    import numpy as np
+    from datetime import datetime
+
+    x = -np.asarray(fair_spread, dtype=float)
+    y = np.asarray(margin, dtype=float)
+    b, a = np.polyfit(x, y, 1)
+    sigma = float(np.sqrt(np.sum((y - (a + b * x)) ** 2) / max(len(y) - 2, 1)))
+    params = dict(spread_intercept=float(a), spread_slope=float(b), spread_sigma=sigma)
+
+    if fair_total is not None and total is not None:
+        xt = np.asarray(fair_total, dtype=float)
+        yt = np.asarray(total, dtype=float)
+        bt, at = np.polyfit(xt, yt, 1)
+        sigma_t = float(np.sqrt(np.sum((yt - (at + bt * xt)) ** 2) / max(len(yt) - 2, 1)))
+        params.update(total_intercept=float(at), total_slope=float(bt), total_sigma=sigma_t)
+
+    return Calibration(**params, n_games=int(len(y)), fitted_at=datetime.now().isoformat(timespec='seconds'))
+
+
+def reliability(prob, outcome, bins: int = 10) -> Dict:
+    """
+    Diagrama de confiabilidade e scores de uma previsão binária.
+
+    Args:
+        prob: Probabilidades previstas
+        outcome: Resultados observados (0/1)
+        bins: Número de faixas de probabilidade
+
+    Returns:
+        Dict com 'table' (DataFrame por faixa: n, mean_pred, observed, gap),
+        'brier', 'log_loss' e 'ece' (erro de calibração esperado)
+    """
+    import numpy as np
+    import pandas as pd
+
+    p = np.clip(np.asarray(prob, dtype=float), 1e-6, 1 - 1e-6)
+    y = np.asarray(outcome, dtype=float)
+    idx = np.minimum((p * bins).astype(int), bins - 1)
+
+    n = np.bincount(idx, minlength=bins)
+    mean_pred = np.bincount(idx, weights=p, minlength=bins) / np.maximum(n, 1)
+    observed = np.bincount(idx, weights=y, minlength=bins) / np.maximum(n, 1)
+    table = pd.DataFrame({
+        'bin': [f"{i / bins:.1f}-{(i + 1) / bins:.1f}" for i in range(bins)],
+        'n': n, 'mean_pred': mean_pred, 'observed': observed, 'gap': observed - mean_pred
+    })[n > 0].reset_index(drop=True)
+
+    return {
+        'table': table,
+        'brier': float(np.mean((p - y) ** 2)),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        'ece': float(np.sum(n * np.abs(observed - mean_pred)) / max(len(p), 1))
+    }
+
+
+def main(argv=None) -> int:
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Ajusta a calibração spread/total -> probabilidade')
+    parser.add_argument('history', help='CSV com fair_spread, margin[, fair_total, total]')
+    parser.add_argument('--bins', type=int, default=10)
+    parser.add_argument('--save', action='store_true', help=f'Grava em {CALIBRATION_FILE}')
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.history)
+    has_total = {'fair_total', 'total'} <= set(df.columns)
+    cal = fit_calibration(df['fair_spread'], df['margin'],
+                          df['fair_total'] if has_total else None, df['total'] if has_total else None)
+    print(json.dumps(asdict(cal), indent=2))
+
+    probs = slate_probabilities(df['fair_spread'], cal=cal)
+    for label, current in (('ajustada', cal), ('atual', get_calibration())):
+        p = probs['home_win'] if current is cal else slate_probabilities(df['fair_spread'], cal=current)['home_win']
+        diag = reliability(p, (df['margin'] > 0).astype(int), args.bins)
+        print(f"\n[{label}] vitória do mandante: brier {diag['brier']:.4f} | log loss {diag['log_loss']:.4f} | ECE {diag['ece']:.4f}")
+        print(diag['table'].round(3).to_string(index=False))
+
+    if args.save:
+        save_calibration(cal)
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
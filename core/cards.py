@@ -0,0 +1,186 @@
+"""
+Cards de Jogo (HTML)
+Templates do card NBA compilados uma vez no import, render de um card inteiro
+em uma única string e um cache por jogo que só refaz o HTML dos cards cujos
+dados mudaram
+"""
+import html
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _compile(source: str) -> str:
+    """Remove a indentação/quebras do template uma vez (markdown trata indentação como bloco de código)."""
+    return ''.join(line.strip() for line in source.strip().splitlines())
+
+
+_CARD = _compile("""
+    <div class="game-card {css_live}">
+        <div class="card-header">
+            <div>{badge}</div>
+            <div style="text-align:right">
+                <div class="team-row"><span class="team-name">{away}</span> <span class="team-score">{s_away}</span></div>
+                <div class="team-row"><span class="team-name">{home}</span> <span class="team-score">{s_home}</span></div>
+            </div>
+        </div>
+        <div class="card-body">
+            <div class="metric-col">
+                <div class="metric-lbl">{model_lbl}</div>
+                <div class="metric-val val-highlight">{fair}</div>
+            </div>
+            <div class="metric-col">
+                <div class="metric-lbl">MERCADO</div>
+                <div class="metric-val">{market}</div>
+            </div>
+        </div>
+        {note}{footer}
+    </div>
+""")
+
+_BADGE_LIVE = _compile("""<span class='status-badge live-badge'>🔴 Q{period} {clock}</span>""")
+_BADGE_TIME = _compile("""<span class='status-badge'>{tipoff}</span>""")
+
+_NOTE_LIVE = _compile("""
+    <div style="padding:0 24px 16px; display:flex; justify-content:space-between; color:#cbd5e1; font-size:0.8rem; font-weight:700;">
+        <span>VITÓRIA {home} <span style="color:#38bdf8">{home_win}</span></span>
+        <span>EDGE AO VIVO <span style="color:{edge_color}">{edge}</span></span>
+    </div>
+""")
+
+_FOOTER_VALUE = _compile("""
+    <div class="card-action">
+        <div>
+            <div class="value-tag">✨ VALOR ENCONTRADO</div>
+            <div class="bet-info">{pick} {line} @ {price} <span style="color:#94a3b8; font-size:0.8rem;">({book})</span></div>
+        </div>
+    </div>
+""")
+
+_FOOTER_EMPTY = _compile("""
+    <div style="padding:15px; text-align:center; color:#475569; font-size:0.8rem; font-style:italic;">Sem oportunidade de valor</div>
+""")
+
+
+@dataclass(frozen=True)
+class CardView:
+    """Tudo que o card de um jogo exibe (frozen: o próprio objeto é a assinatura do cache)"""
+    game_id: str
+    home: str
+    away: str
+    tipoff: str
+    fair: float
+    market: float
+    live: bool = False
+    period: int = 0
+    clock: str = ''
+    s_home: str = '-'
+    s_away: str = '-'
+    pick: Optional[str] = None
+    line: float = 0.0
+    price: float = 0.0
+    book: str = ''
+    win_prob: Optional[float] = None   # Ao vivo: probabilidade de vitória do mandante
+    live_edge: Optional[float] = None  # Ao vivo: melhor edge contra as cotações in-play (None = sem cotação recente)
+
+    @property
+    def has_value(self) -> bool:
+        return self.pick is not None
+
+
+def render_card(view: CardView) -> str:
+    """
+    HTML completo de um card (header, métricas e rodapé em um único bloco).
+
+    Args:
+        view: Dados do card
+
+    Returns:
+        String HTML pronta para um único st.markdown
+    """
+    esc = html.escape
+    if view.live:
+        badge = _BADGE_LIVE.format(period=view.period, clock=esc(view.clock))
+    else:
+        badge = _BADGE_TIME.format(tipoff=esc(view.tipoff))
+
+    if view.has_value:
+        footer = _FOOTER_VALUE.format(
+            pick=esc(view.pick), line=f"{view.line:+.1f}", price=f"{view.price:.2f}", book=esc(view.book)
+        )
+    else:
+        footer = _FOOTER_EMPTY
+
+    note = ''
+    if view.win_prob is not None:
+        # Sem cotação in-play recente não há edge ao vivo (live_edge None)
+        edge = view.live_edge
+        note = _NOTE_LIVE.format(
+            home=esc(view.home), home_win=f"{view.win_prob:.0%}",
+            edge=f"{edge:+.1f}" if edge is not None else "s/ cotação ao vivo",
+            edge_color="#4ade80" if edge is not None and edge > 0 else "#94a3b8"
+        )
+
+    return _CARD.format(
+        css_live="card-live" if view.live else "",
+        model_lbl="MODELO AO VIVO" if view.win_prob is not None else "MODELO (AJUSTADO)",
+        note=note,
+        badge=badge,
+        away=esc(view.away), home=esc(view.home),
+        s_away=esc(str(view.s_away)), s_home=esc(str(view.s_home)),
+        fair=f"{view.fair:+.1f}", market=f"{view.market:+.1f}",
+        footer=footer
+    )
+
+
+class CardRenderCache:
+    """
+    Último HTML renderizado por jogo.
+
+    Guardado no session_state: num rerun, cards com a mesma assinatura
+    reaproveitam a string anterior (o st.markdown do bloco continua sendo
+    emitido a cada rerun; o que se economiza é montar o HTML).
+    """
+
+    def __init__(self):
+        self._cards: Dict[str, Tuple[CardView, str]] = {}
+
+    def render(self, view: CardView) -> str:
+        """HTML do card, refeito só se os dados do jogo mudaram."""
+        cached = self._cards.get(view.game_id)
+        if cached is not None and cached[0] == view:
+            return cached[1]
+        out = render_card(view)
+        self._cards[view.game_id] = (view, out)
+        return out
+
+    def prune(self, game_ids: Iterable[str]) -> None:
+        """Descarta jogos que saíram do slate."""
+        keep = set(game_ids)
+        for gid in list(self._cards):
+            if gid not in keep:
+                del self._cards[gid]
+
+
+def batch_cards(views: List[CardView], cache: CardRenderCache) -> List[Tuple[str, Optional[CardView]]]:
+    """
+    Agrupa cards consecutivos de uma coluna em blocos de HTML.
+
+    Cards sem valor são concatenados no mesmo bloco; um card com valor fecha
+    o bloco (o botão de registro é um widget e precisa vir logo depois dele).
+
+    Args:
+        views: Cards de uma coluna, na ordem de exibição
+        cache: Cache de render do rerun
+
+    Returns:
+        Lista de (html do bloco, card com valor que fecha o bloco ou None)
+    """
+    blocks, buf = [], []
+    for view in views:
+        buf.append(cache.render(view))
+        if view.has_value:
+            blocks.append((''.join(buf), view))
+            buf = []
+    if buf:
+        blocks.append((''.join(buf), None))
+    return blocks
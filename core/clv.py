@@ -0,0 +1,370 @@
+"""
+Closing Line Value (CLV)
+Grava em cada aposta aberta a última linha antes do tip-off (Pinnacle, ou o
+consenso) e calcula o CLV em pontos e em probabilidade sem vig; o resumo por
+mercado e faixa de edge fica num índice pré-computado ao lado do histórico
+
+Uso (worker/cron, rodar perto dos horários de jogo):
+    python -m core.clv                 # captura o fechamento com as odds atuais
+    python -m core.clv --report        # só mostra o resumo do índice
+"""
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from .backoffice import load_history, parse_bets, write_rows_from
+from .calibration import get_calibration
+from .config import get_config
+from .exposure import file_signature, on_history_touched, sidecar_path
+from .settlement import MAX_BET_AGE_DAYS, MIN_BET_AGE_DAYS
+from .tracing import span, traced
+
+# Tipo do ledger -> mercado da The Odds API
+MARKETS = {'Spread': 'spreads', 'Total': 'totals', 'ML': 'h2h'}
+
+# Faixas de edge do modelo na entrada (pontos)
+EDGE_BUCKETS = [0.0, 1.5, 3.0, 5.0, np.inf]
+EDGE_LABELS = ['<1.5', '1.5-3', '3-5', '5+']
+
+
+def _event_keys(odds: List[Dict], now: datetime) -> pd.DataFrame:
+    """Jogos ainda não iniciados do snapshot: event_id por 'AWAY@HOME' e dia do jogo (calendário ET)."""
+    from .data_fetcher import NBA_TZ
+    from .teams import NBA_TEAMS
+
+    rows = []
+    for g in odds:
+        start = pd.to_datetime(g.get('commence_time'), utc=True, errors='coerce')
+        if pd.isna(start) or start <= now:
+            continue
+        home, away = NBA_TEAMS.resolve(g['home_team']), NBA_TEAMS.resolve(g['away_team'])
+        if home and away:
+            rows.append((f"{away}@{home}", g['id'], start.tz_convert(NBA_TZ).tz_localize(None).normalize()))
+    return pd.DataFrame(rows, columns=['game', 'event_id', 'day']).drop_duplicates('game').set_index('game')
+
+
+def closing_lines(df: pd.DataFrame, parsed: pd.DataFrame, odds: List[Dict],
+                  summary: Optional[pd.DataFrame] = None, now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Linha de fechamento e CLV das apostas pendentes de jogos ainda não iniciados.
+
+    CLV em pontos: spread/ML = linha apostada - linha atual do mesmo lado,
+    over = atual - apostada, under = apostada - atual. CLV em probabilidade:
+    chance sem vig de a aposta cobrir na linha apostada (prob. justa do
+    fechamento deslocada pela diferença de linha, modelo normal da
+    calibração) menos a probabilidade de empate da odd paga (1 / odd).
+
+    Args:
+        df: Linhas pendentes do histórico (Odd, Data)
+        parsed: parse_bets das mesmas linhas
+        odds: Snapshot de jogos da The Odds API
+        summary: summarize_slate(odds) já calculado (opcional)
+        now: Instante de referência (padrão: agora, UTC)
+
+    Returns:
+        DataFrame no índice das apostas casadas com Linha_Fech, Odd_Fech,
+        CLV_Pts e CLV_Prob
+    """
+    from .data_fetcher import summarize_slate
+
+    columns = ['Linha_Fech', 'Odd_Fech', 'CLV_Pts', 'CLV_Prob']
+    now = now or datetime.now(timezone.utc)
+    events = _event_keys(odds, now)
+    if events.empty or df.empty:
+        return pd.DataFrame(columns=columns)
+    summary = summary if summary is not None else summarize_slate(odds)
+
+    bet_day = pd.to_datetime(parsed['day'], errors='coerce')
+    age = (parsed['game'].map(events['day']) - bet_day).dt.days
+    keys = pd.MultiIndex.from_arrays([
+        parsed['game'].map(events['event_id']),
+        parsed['market'].map(MARKETS),
+        parsed['side']
+    ])
+    close = summary.reindex(keys)
+    point = close['pinnacle_point'].fillna(close['consensus_point']).to_numpy()
+    price = close['pinnacle_price'].fillna(close['consensus_price']).to_numpy()
+    fair = close['pinnacle_fair_prob'].fillna(close['consensus_fair_prob']).to_numpy()
+
+    side = parsed['side'].to_numpy()
+    line = parsed['line'].to_numpy(dtype=float)
+    is_ml = (parsed['market'] == 'ML').to_numpy()
+    clv_pts = np.select([side == 'over', side == 'under'], [point - line, line - point], line - point)
+    clv_pts = np.where(is_ml, 0.0, clv_pts)
+
+    cal = get_calibration()
+    sigma = np.where(parsed['market'] == 'Total', cal.total_sigma / cal.total_slope, cal.spread_sigma / cal.spread_slope)
+    p_line = ndtr(ndtri(np.clip(fair, 1e-6, 1 - 1e-6)) + clv_pts / sigma)
+    odd = pd.to_numeric(df['Odd'], errors='coerce').to_numpy()
+
+    out = pd.DataFrame({
+        'Linha_Fech': np.where(is_ml, np.nan, point),
+        'Odd_Fech': price,
+        'CLV_Pts': np.where(is_ml, np.nan, clv_pts).round(2),
+        'CLV_Prob': (p_line - 1.0 / odd).round(4)
+    }, index=df.index)
+    matched = ~np.isnan(fair) & age.between(MIN_BET_AGE_DAYS, MAX_BET_AGE_DAYS).to_numpy()
+    return out[matched]
+
+
+@traced('ledger.clv')
+def capture_closing(odds: List[Dict], filepath: Optional[str] = None,
+                    summary: Optional[pd.DataFrame] = None, now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Atualiza no histórico a linha de fechamento das apostas abertas.
+
+    Chamado a cada snapshot de odds: enquanto o jogo não começa a linha é
+    sobrescrita, então o valor que fica é o último antes do tip-off. Só a
+    cauda do CSV a partir da primeira aposta alterada é regravada.
+
+    Args:
+        odds: Snapshot de jogos da The Odds API
+        filepath: CSV do histórico (usa config se não fornecido)
+        summary: summarize_slate(odds) já calculado (opcional)
+        now: Instante de referência
+
+    Returns:
+        Linhas atualizadas
+    """
+    filepath = filepath or get_config().bets_history_file
+    df = load_history(filepath)
+    pending = df[(df['Resultado'] == 'Pendente') & df['Tipo'].isin(list(MARKETS))]
+    if pending.empty:
+        return pending
+
+    parsed = parse_bets(pending)
+    ok = parsed['game'].notna() & parsed['side'].notna()
+    closing = closing_lines(pending[ok], parsed[ok], odds, summary, now)
+    if closing.empty:
+        return closing
+
+    current = df.loc[closing.index, closing.columns].apply(pd.to_numeric, errors='coerce')
+    changed = ~((current == closing) | (current.isna() & closing.isna())).all(axis=1)
+    closing = closing[changed]
+    if closing.empty:
+        return closing
+
+    before = df.loc[closing.index]
+    for col in closing.columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df.loc[closing.index, closing.columns] = closing
+    start = int(df.index.get_indexer(closing.index).min())
+    with span('ledger.write', rows=len(df) - start):
+        write_rows_from(df, filepath, start)
+    # Índice de CLV recebe só as linhas alteradas; as pendentes não mudam (exposição)
+    _update(filepath, before, df.loc[closing.index], df)
+    on_history_touched(filepath)
+    return df.loc[closing.index]
+
+
+# --- ÍNDICE DE CLV ---
+
+class CLVIndex:
+    """
+    Somas de CLV por (mercado, faixa de edge), prontas para o relatório.
+
+    Guarda somas e contagens (não médias), então o resumo sai sem tocar no
+    histórico nem em snapshots de odds. Captura do fechamento e liquidação
+    aplicam só as linhas que mudaram (`add`/`remove`).
+    """
+
+    FIELDS = ('bets', 'clv_pts_sum', 'clv_pts_n', 'clv_prob_sum', 'beat_close', 'profit', 'settled')
+
+    def __init__(self):
+        self.groups: Dict[str, Dict[str, float]] = {}
+        self.signature: Optional[List] = None
+
+    @staticmethod
+    def _sums(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """Somas por 'Tipo|faixa' das linhas com CLV gravado (groupby vetorizado)."""
+        clv_prob = pd.to_numeric(df['CLV_Prob'], errors='coerce')
+        rows = df[clv_prob.notna()]
+        if rows.empty:
+            return {}
+
+        clv_prob = clv_prob[rows.index]
+        clv_pts = pd.to_numeric(rows['CLV_Pts'], errors='coerce')
+        edge = pd.to_numeric(rows['Edge'], errors='coerce').abs()
+        settled = rows['Resultado'].isin(['Green', 'Red', 'Void'])
+        bucket = pd.cut(edge, EDGE_BUCKETS, labels=EDGE_LABELS, right=False).astype(object).where(edge.notna(), 's/ edge')
+        frame = pd.DataFrame({
+            'key': rows['Tipo'].astype(str) + '|' + bucket.astype(str),
+            'bets': 1,
+            'clv_pts_sum': clv_pts.fillna(0.0),
+            'clv_pts_n': clv_pts.notna().astype(int),
+            'clv_prob_sum': clv_prob,
+            'beat_close': (clv_prob > 0).astype(int),
+            'profit': pd.to_numeric(rows['Lucro'], errors='coerce').fillna(0.0).where(settled, 0.0),
+            'settled': settled.astype(int)
+        })
+        agg = frame.groupby('key')[list(CLVIndex.FIELDS)].sum()
+        return {k: {f: float(v) for f, v in r.items()} for k, r in agg.to_dict('index').items()}
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> 'CLVIndex':
+        """Agrega as apostas com CLV gravado do histórico inteiro."""
+        index = cls()
+        index.groups = cls._sums(df)
+        return index
+
+    # --- ATUALIZAÇÃO INCREMENTAL ---
+
+    def _apply(self, df: pd.DataFrame, sign: int) -> None:
+        for key, sums in self._sums(df).items():
+            g = self.groups.setdefault(key, dict.fromkeys(self.FIELDS, 0.0))
+            for f in self.FIELDS:
+                g[f] += sign * sums[f]
+            if g['bets'] <= 0:
+                del self.groups[key]
+
+    def add(self, rows: pd.DataFrame) -> None:
+        """Soma linhas do histórico (as sem CLV não contam)."""
+        self._apply(rows, +1)
+
+    def remove(self, rows: pd.DataFrame) -> None:
+        """Tira linhas do histórico no estado em que foram somadas."""
+        self._apply(rows, -1)
+
+    def frame(self) -> pd.DataFrame:
+        """Resumo por mercado e faixa de edge (médias a partir das somas)."""
+        cols = ['Mercado', 'Edge', 'Apostas', 'CLV Pts', 'CLV Prob %', 'Bate Fech %', 'Lucro']
+        rows = []
+        for key, g in sorted(self.groups.items()):
+            market, bucket = key.split('|', 1)
+            rows.append([
+                market, bucket, int(g['bets']),
+                g['clv_pts_sum'] / g['clv_pts_n'] if g['clv_pts_n'] else np.nan,
+                g['clv_prob_sum'] / g['bets'] * 100,
+                g['beat_close'] / g['bets'] * 100,
+                g['profit']
+            ])
+        return pd.DataFrame(rows, columns=cols)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'signature': self.signature, 'groups': self.groups}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['CLVIndex']:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        index = cls()
+        index.signature = data.get('signature')
+        index.groups = data.get('groups', {})
+        return index
+
+
+_indexes: Dict[str, CLVIndex] = {}
+_lock = threading.Lock()
+
+
+def get_clv_index(filepath: Optional[str] = None) -> CLVIndex:
+    """
+    Índice de CLV do histórico (memória > arquivo .clv.json > rebuild).
+
+    Reconstruído só se o CSV mudou por fora das gravações que mantêm o índice.
+    """
+    filepath = filepath or get_config().bets_history_file
+    sig = file_signature(filepath)
+    with _lock:
+        index = _indexes.get(filepath)
+        if index is not None and index.signature == sig:
+            return index
+        index = CLVIndex.load(sidecar_path(filepath, 'clv'))
+        if index is None or index.signature != sig:
+            index = CLVIndex.from_history(load_history(filepath))
+            index.signature = sig
+            _persist(index, filepath)
+        _indexes[filepath] = index
+        return index
+
+
+def _persist(index: CLVIndex, filepath: str) -> None:
+    try:
+        index.save(sidecar_path(filepath, 'clv'))
+    except Exception as e:
+        print(f"[WARN] Erro ao gravar índice de CLV: {e}")
+
+
+def _update(filepath: str, before: Optional[pd.DataFrame], after: Optional[pd.DataFrame],
+            df: Optional[pd.DataFrame] = None) -> None:
+    """
+    Troca as linhas `before` por `after` no índice em memória e renova a assinatura.
+
+    Sem índice carregado, monta um a partir de `df` (histórico já gravado), se houver.
+    """
+    with _lock:
+        index = _indexes.get(filepath)
+        if index is None:
+            if df is None:
+                return
+            index = CLVIndex.from_history(df)
+        else:
+            if before is not None:
+                index.remove(before)
+            if after is not None:
+                index.add(after)
+        index.signature = file_signature(filepath)
+        _indexes[filepath] = index
+        _persist(index, filepath)
+
+
+def on_bets_added(filepath: str) -> None:
+    """Chamado depois de acrescentar apostas ao CSV (sem CLV ainda: só a assinatura muda)."""
+    _update(filepath, None, None)
+
+
+def on_bets_settled(filepath: str, settled: pd.DataFrame, df: Optional[pd.DataFrame] = None) -> None:
+    """
+    Chamado depois de liquidar apostas.
+
+    As linhas eram pendentes, e pendente não soma lucro: o estado anterior é
+    o mesmo frame com Resultado = 'Pendente'.
+    """
+    _update(filepath, settled.assign(Resultado='Pendente'), settled, df)
+
+
+def on_history_rewritten(filepath: str, df: pd.DataFrame) -> None:
+    """
+    Chamado depois de regravar o histórico inteiro (edição no admin).
+
+    Qualquer linha pode ter mudado: refaz as somas a partir do frame em
+    memória (um groupby, mais barato que diferenciar linha a linha).
+    """
+    with _lock:
+        index = CLVIndex.from_history(df)
+        index.signature = file_signature(filepath)
+        _indexes[filepath] = index
+        _persist(index, filepath)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Captura a linha de fechamento e mostra o CLV')
+    parser.add_argument('--history', help='CSV do histórico (padrão BETS_HISTORY_FILE)')
+    parser.add_argument('--report', action='store_true', help='Só mostra o resumo')
+    args = parser.parse_args(argv)
+
+    if not args.report:
+        from .data_fetcher import get_odds
+        # Fechamento de todos os mercados com CLV (spread, total e ML)
+        updated = capture_closing(get_odds(markets=','.join(MARKETS.values())), args.history)
+        print(f"[OK] Fechamento atualizado em {len(updated)} apostas")
+
+    report = get_clv_index(args.history).frame()
+    print(report.round(2).to_string(index=False) if not report.empty else "Nenhuma aposta com CLV ainda")
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -1,18 +1,42 @@
 """
 Módulo de Configuração
-Carrega variáveis de ambiente de forma segura usando python-dotenv
+Snapshot imutável da configuração, construído uma vez e recarregado quando o
+.env muda. Segredos vêm de provedores plugáveis (env, .env, st.secrets), sem
+depender do Streamlit para uso headless (workers, CLI)
 """
 import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from dotenv import load_dotenv
 from pathlib import Path
+from typing import Dict, List, Mapping, Optional
 
-# Carrega .env do diretório raiz do projeto
+from dotenv import dotenv_values
+
+# Caminho do .env na raiz do projeto
 _env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(_env_path)
 
+# Intervalo mínimo entre checagens do mtime do .env (segundos)
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+# Endpoints reais de cada feed externo (sobrescrevíveis por variável de ambiente)
+DEFAULT_BASE_URLS = {
+    'ODDS_API_BASE_URL': 'https://api.the-odds-api.com',
+    'NBA_STATS_BASE_URL': 'https://stats.nba.com',
+    'NBA_CDN_BASE_URL': 'https://cdn.nba.com',
+    'ESPN_BASE_URL': 'https://www.espn.com',
+    'FBREF_BASE_URL': 'https://fbref.com',
+}
+
+
+class ConfigError(ValueError):
+    """Configuração obrigatória ausente ou inválida"""
 
-@dataclass
+
+@dataclass(frozen=True)
 class Config:
     """Configurações centralizadas da aplicação"""
     odds_api_key: str
@@ -26,55 +50,220 @@ class Config:
     min_edge_spread: float = 1.5  # Edge mínimo para apostar em spread
     min_edge_total: float = 5.0   # Edge mínimo para apostar em total
     kelly_fraction: float = 0.25  # Fração do Kelly (mais conservador)
+    max_bet_fraction: float = 0.05  # Stake máxima por aposta no Kelly simultâneo (fração da banca)
+    max_exposure: float = 0.25      # Exposição máxima somada do slate (fração da banca)
+    max_game_exposure: float = 0.06  # Stake pendente máxima por jogo (fração da banca)
+    max_team_exposure: float = 0.08  # Stake pendente máxima por time (fração da banca)
     
     # Thresholds para Props
     fast_pace_threshold: float = 102.0
     bad_defense_threshold: float = 115.0
+    
+    # Base dos feeds externos (ex: servidor local de fixtures em benchmarks/fake_feeds.py)
+    odds_api_base_url: str = DEFAULT_BASE_URLS['ODDS_API_BASE_URL']
+    nba_stats_base_url: str = DEFAULT_BASE_URLS['NBA_STATS_BASE_URL']
+    nba_cdn_base_url: str = DEFAULT_BASE_URLS['NBA_CDN_BASE_URL']
+    espn_base_url: str = DEFAULT_BASE_URLS['ESPN_BASE_URL']
+    fbref_base_url: str = DEFAULT_BASE_URLS['FBREF_BASE_URL']
 
+    # Tracing de reruns ligado por padrão no processo (core.tracing)
+    trace_enabled: bool = False
 
-def get_config() -> Config:
+    @property
+    def has_odds_api_key(self) -> bool:
+        return bool(self.odds_api_key) and self.odds_api_key != 'your_api_key_here'
+
+    def require_odds_api_key(self) -> str:
+        """Retorna a API key ou levanta ConfigError (para quem não tem fallback)."""
+        if not self.has_odds_api_key:
+            raise ConfigError("ODDS_API_KEY não encontrada (.env, variável de ambiente ou st.secrets)")
+        return self.odds_api_key
+
+
+# --- PROVEDORES DE SEGREDOS ---
+
+class SecretProvider(ABC):
+    """Fonte de valores de configuração. `get` retorna None se não tiver a chave."""
+    name = 'base'
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def reload(self) -> None:
+        """Relê a fonte (chamado quando o snapshot é reconstruído)."""
+
+
+class EnvProvider(SecretProvider):
+    """Variáveis de ambiente do processo."""
+    name = 'env'
+
+    def get(self, key: str) -> Optional[str]:
+        return os.environ.get(key) or None
+
+
+class DotEnvProvider(SecretProvider):
+    """Arquivo .env (lido sem alterar os.environ)."""
+    name = 'dotenv'
+
+    def __init__(self, path: Path = _env_path):
+        self.path = Path(path)
+        self._values: Dict[str, Optional[str]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        self._values = dotenv_values(self.path) if self.path.exists() else {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key) or None
+
+
+class MappingProvider(SecretProvider):
+    """Valores fixos (testes, workers com segredos injetados)."""
+    name = 'mapping'
+
+    def __init__(self, values: Mapping[str, str]):
+        self.values = dict(values)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.values.get(key) or None
+
+
+class StreamlitSecretsProvider(SecretProvider):
     """
-    Retorna as configurações carregadas do .env (local) ou st.secrets (cloud).
+    st.secrets, apenas se o Streamlit já estiver carregado no processo.
+
+    Nunca importa o Streamlit: em workers/CLI o provedor simplesmente não responde.
     """
-    import streamlit as st
-    
-    # Tenta pegar do ambiente (local com .env) ou das secrets do Streamlit (cloud)
-    def get_var(key, default=None):
-        # 1. Tenta env var
-        val = os.getenv(key)
-        if val: return val
-        
-        # 2. Tenta st.secrets (se disponível e configurado)
+    name = 'streamlit'
+
+    def get(self, key: str) -> Optional[str]:
+        st = sys.modules.get('streamlit')
+        if st is None:
+            return None
         try:
             if key in st.secrets:
-                return st.secrets[key]
-        except:
+                return str(st.secrets[key])
+        except Exception:
             pass
-            
-        return default
+        return None
 
-    api_key = get_var('ODDS_API_KEY')
+
+# Ordem de prioridade: env > .env > st.secrets
+_providers: List[SecretProvider] = [EnvProvider(), DotEnvProvider(), StreamlitSecretsProvider()]
+
+_lock = threading.Lock()
+_snapshot: Optional[Config] = None
+_snapshot_mtime: Optional[float] = None
+_last_check = 0.0
+
+
+def register_provider(provider: SecretProvider, first: bool = True) -> None:
+    """
+    Adiciona um provedor de segredos e força a reconstrução do snapshot.
+
+    Args:
+        provider: Instância de SecretProvider
+        first: Se True, tem prioridade sobre os provedores existentes
+    """
+    with _lock:
+        if first:
+            _providers.insert(0, provider)
+        else:
+            _providers.append(provider)
+    reload_config()
+
+
+def _get_var(key: str, default: Optional[str] = None) -> Optional[str]:
+    for provider in _providers:
+        val = provider.get(key)
+        if val:
+            return val
+    return default
+
+
+def _env_mtime() -> Optional[float]:
+    try:
+        return _env_path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _build() -> Config:
+    for provider in _providers:
+        provider.reload()
     
-    if not api_key or api_key == 'your_api_key_here':
-        # Fallback silencioso para não quebrar no import se estiver apenas configurando
-        if os.getenv('CI'): return Config('', '', 0.0, 0.0, '')
-        
-        # Mensagem de erro amigável para UI
-        st.error("🔑 ODDS_API_KEY não encontrada!")
-        st.warning("Local: Verifique o arquivo .env\nCloud: Adicione nas 'Secrets' do Streamlit")
-        # Retorna config dummy para permitir que o app renderize a mensagem de erro na UI
-        # ao invés de crashar no hard stop
-        raise ValueError("API Key missing")
+    api_key = _get_var('ODDS_API_KEY', '')
+    if api_key == 'your_api_key_here':
+        api_key = ''
+    if not api_key:
+        print("[WARN] ODDS_API_KEY não encontrada (local: .env | cloud: Secrets do Streamlit)")
     
     return Config(
         odds_api_key=api_key,
-        bets_history_file=get_var('BETS_HISTORY_FILE', 'bets_history.csv'),
-        default_bankroll=float(get_var('DEFAULT_BANKROLL', '1000.0')),
-        default_unit_percent=float(get_var('DEFAULT_UNIT_PERCENT', '1.0')),
-        nba_season=get_var('NBA_SEASON', '2024-25')
+        bets_history_file=_get_var('BETS_HISTORY_FILE', 'bets_history.csv'),
+        default_bankroll=float(_get_var('DEFAULT_BANKROLL', '1000.0')),
+        default_unit_percent=float(_get_var('DEFAULT_UNIT_PERCENT', '1.0')),
+        nba_season=_get_var('NBA_SEASON', '2024-25'),
+        odds_api_base_url=_base_url('ODDS_API_BASE_URL'),
+        nba_stats_base_url=_base_url('NBA_STATS_BASE_URL'),
+        nba_cdn_base_url=_base_url('NBA_CDN_BASE_URL'),
+        espn_base_url=_base_url('ESPN_BASE_URL'),
+        fbref_base_url=_base_url('FBREF_BASE_URL'),
+        trace_enabled=_get_var('NBA_TRACE', '').lower() in ('1', 'true', 'yes')
     )
 
 
+def _base_url(key: str) -> str:
+    """Base de um feed: variável própria > FEEDS_BASE_URL (todos os feeds) > endpoint real."""
+    url = _get_var(key) or _get_var('FEEDS_BASE_URL') or DEFAULT_BASE_URLS[key]
+    return url.rstrip('/')
+
+
+def reload_config() -> Config:
+    """Reconstrói o snapshot imediatamente (relendo todos os provedores)."""
+    global _snapshot, _snapshot_mtime, _last_check
+    with _lock:
+        _snapshot_mtime = _env_mtime()
+        _snapshot = _build()
+        _last_check = time.monotonic()
+        return _snapshot
+
+
+def get_config() -> Config:
+    """
+    Retorna o snapshot de configuração (construído uma vez e reutilizado).
+    
+    O mtime do .env é checado no máximo a cada RELOAD_CHECK_INTERVAL segundos;
+    se mudou, o snapshot é reconstruído. Sem API key, o snapshot vem com
+    odds_api_key vazia: quem precisa dela usa `require_odds_api_key()`.
+    """
+    global _last_check
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _last_check < RELOAD_CHECK_INTERVAL:
+        return snapshot
+    
+    if snapshot is None or _env_mtime() != _snapshot_mtime:
+        return reload_config()
+    
+    _last_check = time.monotonic()
+    return snapshot
+
+
+def configure_nba_api(config: Optional[Config] = None) -> None:
+    """
+    Aponta o cliente do nba_api para `nba_stats_base_url`.
+    
+    Chamado pelos fetchers antes de cada endpoint (o nba_api só é importado aqui
+    dentro, no primeiro fetch).
+    """
+    from nba_api.stats.library.http import NBAStatsHTTP
+    
+    url = f"{(config or get_config()).nba_stats_base_url}/stats/{{endpoint}}"
+    if NBAStatsHTTP.base_url != url:
+        NBAStatsHTTP.base_url = url
+
+
 # Lista de jogadores estrela para Props (movido do arquivo principal)
 STAR_PLAYERS = {
     "Lakers": ["LeBron James", "Anthony Davis"],
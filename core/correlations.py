@@ -0,0 +1,263 @@
+"""
+Módulo de Correlações de Props
+Alinha gamelogs por Game_ID, mantém matrizes de correlação por time (com
+atualização incremental) e precifica combinações do mesmo jogo via simulação
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from .prop_pricing import PropDistribution, distribution_ppf
+
+# Estatísticas correlacionadas por padrão
+DEFAULT_STATS = ['PTS', 'REB', 'AST', 'FG3M']
+
+Label = Tuple[str, str]  # (jogador, estatística)
+
+
+@dataclass
+class PropLeg:
+    """Uma perna de uma combinação do mesmo jogo"""
+    player: str
+    stat: str
+    line: float
+    side: str = 'Over'  # 'Over' ou 'Under'
+
+    @property
+    def label(self) -> Label:
+        return (self.player, self.stat)
+
+
+def align_gamelogs(
+    gamelogs: Dict[str, pd.DataFrame],
+    stats: Sequence[str] = DEFAULT_STATS
+) -> pd.DataFrame:
+    """
+    Alinha os gamelogs de vários jogadores por Game_ID.
+
+    Args:
+        gamelogs: Dict {jogador: DataFrame do PlayerGameLog}
+        stats: Estatísticas a manter
+
+    Returns:
+        DataFrame indexado por Game_ID com colunas (jogador, estatística);
+        NaN onde o jogador não atuou
+    """
+    frames = {}
+    for player, df in gamelogs.items():
+        if df is None or df.empty:
+            continue
+        cols = [s for s in stats if s in df.columns]
+        frames[player] = df.drop_duplicates('Game_ID').set_index('Game_ID')[cols].astype(float)
+
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, axis=1)
+
+
+@dataclass
+class TeamCorrelation:
+    """
+    Estatísticas suficientes de correlação par-a-par de um grupo de jogadores.
+
+    Guarda somas acumuladas (n, Σx, Σx², Σxy) apenas sobre os jogos em que
+    ambos os pares atuaram, de modo que novos jogos são somados sem
+    reprocessar o histórico. `seen_games` registra os jogos já contados
+    de cada jogador.
+    """
+    labels: List[Label] = field(default_factory=list)
+    seen_games: Dict[str, Set[str]] = field(default_factory=dict)
+    n: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    sx: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    sxx: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    sxy: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    _corr: Optional[np.ndarray] = None
+    _index: Dict[Label, int] = field(default_factory=dict)
+
+    def _grow(self, new_labels: Sequence[Label]) -> None:
+        """Adiciona novos pares (jogador, stat) com somas zeradas."""
+        add = [lb for lb in new_labels if lb not in self._index]
+        if not add:
+            return
+        k_old = len(self.labels)
+        k_new = k_old + len(add)
+        for name in ('n', 'sx', 'sxx', 'sxy'):
+            grown = np.zeros((k_new, k_new))
+            grown[:k_old, :k_old] = getattr(self, name)
+            setattr(self, name, grown)
+        for lb in add:
+            self._index[lb] = len(self.labels)
+            self.labels.append(lb)
+
+    def update(self, aligned: pd.DataFrame) -> int:
+        """
+        Soma os jogos ainda não vistos às estatísticas suficientes.
+
+        Um jogo é novo por jogador: se um companheiro entra no grupo depois,
+        os pares dele com os jogos antigos também são incorporados. A
+        contribuição é (pares válidos agora) - (pares já contados antes).
+
+        Args:
+            aligned: Saída de align_gamelogs
+
+        Returns:
+            Número de jogos com dados novos incorporados
+        """
+        if aligned.empty:
+            return 0
+
+        games = aligned.index.astype(str)
+        players = aligned.columns.get_level_values(0)
+        old_games = np.column_stack([
+            games.isin(list(self.seen_games.get(p, ()))) for p in players
+        ])
+
+        x = aligned.to_numpy(dtype=float)
+        valid = ~np.isnan(x)
+        old = valid & old_games
+        new_cells = valid & ~old_games
+        rows = new_cells.any(axis=1)
+        if not rows.any():
+            return 0
+
+        labels = [tuple(c) for c in aligned.columns]
+        self._grow(labels)
+        idx = np.array([self._index[lb] for lb in labels])
+        sel = np.ix_(idx, idx)
+
+        x0 = np.where(valid, x, 0.0)[rows]
+        for mask, sign in ((valid[rows], 1.0), (old[rows], -1.0)):
+            mf = mask.astype(float)
+            xm = x0 * mf
+            self.n[sel] += sign * (mf.T @ mf)
+            self.sx[sel] += sign * (xm.T @ mf)
+            self.sxx[sel] += sign * ((xm ** 2).T @ mf)
+            self.sxy[sel] += sign * (xm.T @ xm)
+
+        for j, player in enumerate(players):
+            self.seen_games.setdefault(player, set()).update(games[valid[:, j]])
+        self._corr = None
+        return int(rows.sum())
+
+    @property
+    def corr(self) -> np.ndarray:
+        """Matriz de correlação (recalculada só quando há jogos novos)."""
+        if self._corr is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                n = self.n
+                mx = self.sx / n
+                my = mx.T
+                cov = self.sxy / n - mx * my
+                var_x = self.sxx / n - mx ** 2
+                var_y = var_x.T
+                corr = cov / np.sqrt(var_x * var_y)
+            corr = np.nan_to_num(corr, nan=0.0)
+            np.fill_diagonal(corr, 1.0)
+            self._corr = np.clip(corr, -1.0, 1.0)
+        return self._corr
+
+    def submatrix(self, labels: Sequence[Label]) -> np.ndarray:
+        """Correlações entre os pares pedidos (0 para pares sem histórico)."""
+        k = len(labels)
+        out = np.eye(k)
+        idx = [self._index.get(lb) for lb in labels]
+        known = [i for i, j in enumerate(idx) if j is not None]
+        if known:
+            pos = np.array([idx[i] for i in known])
+            out[np.ix_(known, known)] = self.corr[np.ix_(pos, pos)]
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """Matriz de correlação rotulada para exibição."""
+        index = pd.MultiIndex.from_tuples(self.labels, names=['player', 'stat'])
+        return pd.DataFrame(self.corr, index=index, columns=index)
+
+
+class CorrelationCache:
+    """Cache de correlações por time (ou por confronto, ex: 'BOS@NYK')."""
+
+    def __init__(self, stats: Sequence[str] = DEFAULT_STATS):
+        self.stats = list(stats)
+        self.teams: Dict[str, TeamCorrelation] = {}
+
+    def refresh(self, key: str, gamelogs: Dict[str, pd.DataFrame]) -> TeamCorrelation:
+        """
+        Atualiza a correlação de um grupo com os jogos novos dos gamelogs.
+
+        Args:
+            key: Chave do grupo (sigla do time ou confronto)
+            gamelogs: Dict {jogador: DataFrame do PlayerGameLog}
+
+        Returns:
+            TeamCorrelation atualizada
+        """
+        team = self.teams.setdefault(key, TeamCorrelation())
+        added = team.update(align_gamelogs(gamelogs, self.stats))
+        if added:
+            print(f"[CORR] {key}: +{added} jogos incorporados")
+        return team
+
+    def get(self, key: str) -> Optional[TeamCorrelation]:
+        return self.teams.get(key)
+
+
+def _nearest_psd(corr: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """Projeta a matriz para a semidefinida positiva mais próxima (autovalores >= eps)."""
+    vals, vecs = np.linalg.eigh(corr)
+    fixed = vecs @ np.diag(np.maximum(vals, eps)) @ vecs.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def price_same_game(
+    legs: Sequence[PropLeg],
+    dists: Dict[Label, PropDistribution],
+    team: Optional[TeamCorrelation] = None,
+    n_sims: int = 20000,
+    seed: Optional[int] = None
+) -> Dict[str, float]:
+    """
+    Precifica uma combinação do mesmo jogo via cópula gaussiana.
+
+    Sorteia normais correlacionadas, converte em uniformes e aplica a inversa
+    da distribuição ajustada de cada perna. Linhas inteiras com push contam
+    como perna perdida (conservador).
+
+    Args:
+        legs: Pernas da combinação
+        dists: Distribuições ajustadas por (jogador, stat)
+        team: Correlações do grupo (independência se None)
+        n_sims: Número de simulações
+        seed: Semente do gerador
+
+    Returns:
+        Dict com prob conjunta, prob assumindo independência, odd justa e lift
+    """
+    labels = [leg.label for leg in legs]
+    corr = team.submatrix(labels) if team is not None else np.eye(len(legs))
+    corr = _nearest_psd(corr)
+
+    rng = np.random.default_rng(seed)
+    z = rng.multivariate_normal(np.zeros(len(legs)), corr, size=n_sims)
+    u = np.clip(norm.cdf(z), 1e-12, 1 - 1e-12)
+
+    hits = np.empty((n_sims, len(legs)), dtype=bool)
+    p_legs = np.empty(len(legs))
+    for i, leg in enumerate(legs):
+        values = distribution_ppf(dists[leg.label], u[:, i])
+        hits[:, i] = values > leg.line if leg.side == 'Over' else values < leg.line
+        p_legs[i] = hits[:, i].mean()
+
+    p_joint = float(hits.all(axis=1).mean())
+    p_indep = float(np.prod(p_legs))
+
+    return {
+        'p_joint': p_joint,
+        'p_independent': p_indep,
+        'fair_odds': 1 / p_joint if p_joint > 0 else float('inf'),
+        'correlation_lift': p_joint / p_indep if p_indep > 0 else 0.0
+    }
@@ -4,64 +4,58 @@ Centraliza todas as chamadas de API e tratamento de dados
 """
 import os
 import json
-import requests
-import feedparser
+import numpy as np
+import pandas as pd
 from datetime import datetime
+from statistics import median
 from typing import Dict, List, Optional, Any
-from nba_api.stats.endpoints import leaguedashteamstats
-from deep_translator import GoogleTranslator
+from zoneinfo import ZoneInfo
 
 from .config import get_config
+from .devig import MULTIPLICATIVE, devig_frame
+from .team_stats_store import get_team_stats_store
+from .tracing import traced
+from .teams import NBA_TEAMS
 
 # Caminho do cache de odds
 ODDS_CACHE_FILE = "odds_cache.json"
 
+# Casas padrão em ordem de preferência (Pinnacle = referência de mercado afiado)
+DEFAULT_BOOKMAKERS = ['pinnacle', 'bet365', 'draftkings', 'fanduel']
 
+# Fuso do calendário da NBA: jogos da Costa Oeste começam depois da meia-noite UTC
+NBA_TZ = ZoneInfo('America/New_York')
+
+# Lados normalizados por mercado
+MARKET_SIDES = {
+    'spreads': ('home', 'away'),
+    'totals': ('over', 'under'),
+    'h2h': ('home', 'away', 'draw')
+}
+
+
+@traced('fetch.team_stats')
 def get_team_stats(season: Optional[str] = None) -> Dict[str, Dict]:
     """
     Busca estatísticas avançadas dos times da NBA.
     
+    Usa o store compartilhado: Base e Advanced são buscados no máximo uma vez
+    por janela de atualização, para todos os consumidores.
+    
     Args:
         season: Temporada no formato '2024-25' (usa config se não fornecido)
     
     Returns:
         Dict com nome do time como chave e estatísticas como valor
     """
-    config = get_config()
-    season = season or config.nba_season
-    
     try:
-        # Busca STATS AVANÇADOS (Ratings, Pace, eFG)
-        stats = leaguedashteamstats.LeagueDashTeamStats(
-            season=season,
-            measure_type_nullable='Advanced'
-        ).get_data_frames()[0]
-        
-        data = {}
-        for _, row in stats.iterrows():
-            # Net Rating já vem calculado no Advanced
-            net_rtg = row.get('NET_RATING', 0.0)
-            
-            data[row['TEAM_NAME']] = {
-                'pace': row['PACE'],
-                'off_rtg': row.get('OFF_RATING', 110.0),
-                'def_rtg': row.get('DEF_RATING', 110.0),
-                'net_rtg': net_rtg,
-                'efg': row.get('EFG_PCT', 0.54),
-                'tov': row.get('TM_TOV_PCT', 0.14),
-                'orb': row.get('OREB_PCT', 0.25),
-                'ftr': row.get('FTA_RATE', 0.25),
-                'wins': row['W'],
-                'losses': row['L'],
-                'win_pct': row['W_PCT']
-            }
-        return data
-        
+        return get_team_stats_store(season).by_name()
     except Exception as e:
         print(f"Erro ao buscar stats da NBA: {e}")
         return {}
 
 
+@traced('fetch.odds')
 def get_odds(regions: str = 'us,eu', markets: str = 'spreads,totals') -> List[Dict]:
     """
     Busca odds ao vivo da The Odds API com fallback para cache local.
@@ -75,18 +69,20 @@ def get_odds(regions: str = 'us,eu', markets: str = 'spreads,totals') -> List[Di
     Returns:
         Lista de jogos com odds
     """
+    import requests
+    
     config = get_config()
     
     try:
         # 1. Tenta buscar da API
         response = requests.get(
-            'https://api.the-odds-api.com/v4/sports/basketball_nba/odds',
+            f'{config.odds_api_base_url}/v4/sports/basketball_nba/odds',
             params={
-                'api_key': config.odds_api_key,
+                'api_key': config.require_odds_api_key(),
                 'regions': regions,
                 'markets': markets,
                 'oddsFormat': 'decimal',
-                'bookmakers': 'pinnacle,bet365,draftkings,fanduel'
+                'bookmakers': ','.join(DEFAULT_BOOKMAKERS)
             },
             timeout=5  # Timeout curto para falhar rápido
         )
@@ -112,20 +108,51 @@ def get_odds(regions: str = 'us,eu', markets: str = 'spreads,totals') -> List[Di
     except Exception as e:
         # 3. Fallback: usa cache local se disponível
         print(f"[WARN] Erro na API de Odds: {e}")
-        
-        if os.path.exists(ODDS_CACHE_FILE):
-            try:
-                with open(ODDS_CACHE_FILE, 'r', encoding='utf-8') as f:
-                    cached = json.load(f)
-                    cache_time = cached.get('timestamp', 'desconhecido')
-                    print(f"[CACHE] Usando cache de: {cache_time}")
-                    return cached.get('data', [])
-            except Exception as cache_read_error:
-                print(f"[ERROR] Erro ao ler cache: {cache_read_error}")
-                return []
-        else:
-            print("[ERROR] Nenhum cache disponivel")
-            return []
+        return load_cached_odds()
+
+
+def load_cached_odds() -> List[Dict]:
+    """
+    Lê as odds salvas no cache local (última resposta bem-sucedida da API).
+    
+    Returns:
+        Lista de jogos com odds ou lista vazia se não houver cache
+    """
+    if not os.path.exists(ODDS_CACHE_FILE):
+        print("[ERROR] Nenhum cache disponivel")
+        return []
+    
+    try:
+        with open(ODDS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+            cache_time = cached.get('timestamp', 'desconhecido')
+            print(f"[CACHE] Usando cache de: {cache_time}")
+            return cached.get('data', [])
+    except Exception as cache_read_error:
+        print(f"[ERROR] Erro ao ler cache: {cache_read_error}")
+        return []
+
+
+def game_day(utc_iso: Optional[str]) -> str:
+    """
+    Data do jogo no calendário da NBA (horário do leste).
+
+    Liquidação e CLV comparam esta data com a da aposta; a data em UTC de um
+    jogo que começa às 22h ET já cai no dia seguinte.
+
+    Args:
+        utc_iso: Início em ISO 8601 (gameTimeUTC / commence_time)
+
+    Returns:
+        'YYYY-MM-DD' ou '' se ausente/inválido
+    """
+    try:
+        start = datetime.fromisoformat(str(utc_iso).replace('Z', '+00:00'))
+    except ValueError:
+        return ''
+    if start.tzinfo is None:
+        return start.strftime('%Y-%m-%d')
+    return start.astimezone(NBA_TZ).strftime('%Y-%m-%d')
 
 
 def _clean_nba_clock(raw_clock: str) -> str:
@@ -142,16 +169,19 @@ def _clean_nba_clock(raw_clock: str) -> str:
         return raw_clock
 
 
+@traced('fetch.live_scores')
 def get_live_scores() -> Dict[str, Dict]:
     """
     Busca placares ao vivo da NBA.
     
     Returns:
-        Dict com nome do time como chave e info do jogo como valor
+        Dict com ID canônico do time (sigla) como chave e info do jogo como valor
     """
+    import requests
+    
     try:
         response = requests.get(
-            "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json",
+            f"{get_config().nba_cdn_base_url}/static/json/liveData/scoreboard/todaysScoreboard_00.json",
             timeout=10
         )
         data = response.json()
@@ -169,12 +199,15 @@ def get_live_scores() -> Dict[str, Dict]:
                 "s_away": game['awayTeam']['score'], # Fix: Renomeado para s_away
                 "home_team": game['homeTeam']['teamName'],
                 "away_team": game['awayTeam']['teamName'],
-                "game_id": game['gameId']
+                "home_id": NBA_TEAMS.resolve(game['homeTeam']['teamTricode']),
+                "away_id": NBA_TEAMS.resolve(game['awayTeam']['teamTricode']),
+                "game_id": game['gameId'],
+                "date": game_day(game.get('gameTimeUTC'))
             }
             
             # Indexa por ambos os times para facilitar busca
-            live_data[game['homeTeam']['teamName']] = info
-            live_data[game['awayTeam']['teamName']] = info
+            live_data[info['home_id']] = info
+            live_data[info['away_id']] = info
             
         return live_data
         
@@ -183,6 +216,7 @@ def get_live_scores() -> Dict[str, Dict]:
         return {}
 
 
+@traced('fetch.news')
 def get_news(max_items: int = 4, translate: bool = True) -> List[Dict]:
     """
     Busca notícias da NBA via ESPN RSS.
@@ -194,10 +228,13 @@ def get_news(max_items: int = 4, translate: bool = True) -> List[Dict]:
     Returns:
         Lista de notícias com título, hora e flag de alerta
     """
+    import feedparser
+    from deep_translator import GoogleTranslator
+    
     alert_keywords = ["injury", "out", "surgery", "suspended", "trade", "ruled out", "questionable"]
     
     try:
-        feed = feedparser.parse("https://www.espn.com/espn/rss/nba/news")
+        feed = feedparser.parse(f"{get_config().espn_base_url}/espn/rss/nba/news")
         noticias = []
         
         translator = GoogleTranslator(source='auto', target='pt') if translate else None
@@ -233,19 +270,109 @@ def get_news(max_items: int = 4, translate: bool = True) -> List[Dict]:
         return []
 
 
+def _outcome_side(outcome_name: str, home_team: str, away_team: str) -> Optional[str]:
+    """Normaliza o nome do outcome para home/away/over/under/draw."""
+    if outcome_name == home_team:
+        return 'home'
+    if outcome_name == away_team:
+        return 'away'
+    name = outcome_name.lower()
+    if name in ('over', 'under', 'draw'):
+        return name
+    return None
+
+
+def index_market_odds(game: Dict) -> Dict[tuple, Dict]:
+    """
+    Indexa todas as odds de um jogo em uma única passada.
+    
+    Args:
+        game: Objeto de jogo da The Odds API
+    
+    Returns:
+        Dict {(casa, mercado, lado): {'point', 'price'}}, com lado em
+        home/away/over/under/draw e point na perspectiva do próprio lado
+    """
+    home_team = game.get('home_team', '')
+    away_team = game.get('away_team', '')
+    index = {}
+    
+    for bookie in game.get('bookmakers', []):
+        for market in bookie.get('markets', []):
+            for outcome in market.get('outcomes', []):
+                side = _outcome_side(outcome.get('name', ''), home_team, away_team)
+                if side is None:
+                    continue
+                index[(bookie['key'], market['key'], side)] = {
+                    'point': outcome.get('point'),
+                    'price': outcome.get('price', 0.0)
+                }
+    
+    return index
+
+
+def _shop_score(side: str, point: Optional[float]) -> float:
+    """Quanto maior, melhor a linha para quem aposta no lado (Over prefere linha baixa)."""
+    if point is None:
+        return 0.0
+    return -point if side == 'over' else point
+
+
+def line_shopping(index: Dict[tuple, Dict], market: str, side: str) -> Dict:
+    """
+    Consenso, melhor linha/preço disponível e diferença para a Pinnacle em um lado.
+    
+    Args:
+        index: Saída de index_market_odds
+        market: 'spreads', 'totals' ou 'h2h'
+        side: Lado normalizado (home, away, over, under, draw)
+    
+    Returns:
+        Dict com consensus_point, consensus_price, best_point, best_price,
+        best_book, pinnacle_point, pinnacle_price, gap_points e n_books
+    """
+    quotes = [(book, q) for (book, mkt, sd), q in index.items() if mkt == market and sd == side]
+    result = {
+        'consensus_point': None, 'consensus_price': None,
+        'best_point': None, 'best_price': None, 'best_book': None,
+        'pinnacle_point': None, 'pinnacle_price': None,
+        'gap_points': 0.0, 'n_books': len(quotes)
+    }
+    if not quotes:
+        return result
+    
+    points = [q['point'] for _, q in quotes if q['point'] is not None]
+    if points:
+        result['consensus_point'] = median(points)
+    result['consensus_price'] = median(q['price'] for _, q in quotes)
+    
+    best_book, best = max(quotes, key=lambda bq: (_shop_score(side, bq[1]['point']), bq[1]['price']))
+    result.update(best_point=best['point'], best_price=best['price'], best_book=best_book)
+    
+    pin = index.get(('pinnacle', market, side))
+    if pin is not None:
+        result.update(pinnacle_point=pin['point'], pinnacle_price=pin['price'])
+        result['gap_points'] = _shop_score(side, best['point']) - _shop_score(side, pin['point'])
+    
+    return result
+
+
 def parse_market_odds(game: Dict, bookmaker_priority: List[str] = None) -> Dict:
     """
     Extrai odds de mercado de um jogo.
     
+    Além da linha da casa preferida, traz consenso e melhor linha disponível
+    de cada lado, a partir do mesmo índice (uma passada pelo jogo).
+    
     Args:
         game: Objeto de jogo da The Odds API
         bookmaker_priority: Lista de casas em ordem de preferência
     
     Returns:
-        Dict com spread e total do mercado
+        Dict com spread e total do mercado, mais consenso/melhor preço por lado
     """
     if bookmaker_priority is None:
-        bookmaker_priority = ['pinnacle', 'bet365', 'draftkings', 'fanduel']
+        bookmaker_priority = DEFAULT_BOOKMAKERS
     
     result = {
         'spread': 0.0,
@@ -256,40 +383,111 @@ def parse_market_odds(game: Dict, bookmaker_priority: List[str] = None) -> Dict:
         'bookmaker': None
     }
     
-    home_team = game.get('home_team', '')
+    index = index_market_odds(game)
     
-    for bookie in game.get('bookmakers', []):
-        if bookie['key'] in bookmaker_priority:
-            result['bookmaker'] = bookie['key']
-            
-            for market in bookie.get('markets', []):
-                if market['key'] == 'spreads':
-                    for outcome in market['outcomes']:
-                        if outcome['name'] == home_team:
-                            result['spread'] = outcome['point']
-                            result['spread_odds'] = outcome['price']
-                            break
-                            
-                elif market['key'] == 'totals':
-                    for outcome in market['outcomes']:
-                        if outcome['name'] == 'Over':
-                            result['total'] = outcome['point']
-                            result['total_over_odds'] = outcome['price']
-                        elif outcome['name'] == 'Under':
-                            result['total_under_odds'] = outcome['price']
-                            
-            if result['spread'] != 0.0:
-                break
+    for bookie in bookmaker_priority:
+        home = index.get((bookie, 'spreads', 'home'))
+        if not home or not home['point']:
+            continue
+        result['bookmaker'] = bookie
+        result['spread'] = home['point']
+        result['spread_odds'] = home['price']
+        
+        over = index.get((bookie, 'totals', 'over'))
+        under = index.get((bookie, 'totals', 'under'))
+        if over:
+            result['total'] = over['point']
+            result['total_over_odds'] = over['price']
+        if under:
+            result['total_under_odds'] = under['price']
+        break
+    
+    for market, sides in MARKET_SIDES.items():
+        for side in sides:
+            result[f'{market}_{side}'] = line_shopping(index, market, side)
     
     return result
 
 
+def slate_frame(games: List[Dict]) -> pd.DataFrame:
+    """
+    Frame longo com todas as cotações do slate (uma linha por jogo × casa × mercado × lado).
+    
+    Args:
+        games: Lista de jogos da The Odds API
+    
+    Returns:
+        DataFrame com event_id, market, side, book, point e price
+    """
+    rows = []
+    for game in games:
+        event_id = game.get('id')
+        for (book, market, side), q in index_market_odds(game).items():
+            rows.append((event_id, market, side, book, q['point'], q['price']))
+    
+    df = pd.DataFrame(rows, columns=['event_id', 'market', 'side', 'book', 'point', 'price'])
+    df['point'] = df['point'].astype(float)
+    df['price'] = df['price'].astype(float)
+    return df
+
+
+@traced('model.summarize_slate')
+def summarize_slate(games: List[Dict], devig_method: str = MULTIPLICATIVE) -> pd.DataFrame:
+    """
+    Consenso, melhor preço/linha e diferença para a Pinnacle de todo o slate.
+    
+    Monta um frame longo (jogo × casa × mercado × lado) em uma passada e
+    resolve tudo com groupby vetorizado. A margem de cada casa é removida
+    de uma vez para todo o slate.
+    
+    Args:
+        games: Lista de jogos da The Odds API
+        devig_method: Método de remoção de vig (ver core.devig)
+    
+    Returns:
+        DataFrame indexado por (event_id, market, side) com consensus_point,
+        consensus_price, consensus_fair_prob, best_point, best_price, best_book,
+        pinnacle_point, pinnacle_price, pinnacle_fair_prob, gap_points e n_books
+    """
+    df = slate_frame(games)
+    if df.empty:
+        return df.set_index(['event_id', 'market', 'side'])
+    
+    df['score'] = np.where(df['side'] == 'over', -df['point'], df['point'])
+    df['score'] = df['score'].fillna(0.0)
+    df['fair_prob'] = devig_frame(df, ('event_id', 'book', 'market'), method=devig_method)
+    keys = ['event_id', 'market', 'side']
+    
+    grouped = df.groupby(keys)
+    out = grouped.agg(
+        consensus_point=('point', 'median'),
+        consensus_price=('price', 'median'),
+        consensus_fair_prob=('fair_prob', 'median'),
+        n_books=('book', 'size')
+    )
+    
+    best = (df.sort_values(keys + ['score', 'price'], ascending=[True, True, True, False, False])
+              .drop_duplicates(keys)
+              .set_index(keys))
+    out['best_point'] = best['point']
+    out['best_price'] = best['price']
+    out['best_book'] = best['book']
+    
+    pin = df[df['book'] == 'pinnacle'].set_index(keys)
+    out['pinnacle_point'] = pin['point']
+    out['pinnacle_price'] = pin['price']
+    out['pinnacle_fair_prob'] = pin['fair_prob']
+    out['gap_points'] = (best['score'] - pin['score']).reindex(out.index).fillna(0.0)
+    
+    return out
+
+
 def find_team_stats(team_name: str, stats_dict: Dict) -> Dict:
     """
     Busca estatísticas de um time, lidando com variações de nome.
     
     Args:
-        team_name: Nome do time (pode ser parcial)
+        team_name: Nome do time em qualquer fonte (nome completo, apelido ou sigla)
         stats_dict: Dicionário de estatísticas
     
     Returns:
@@ -309,9 +507,9 @@ def find_team_stats(team_name: str, stats_dict: Dict) -> Dict:
     if team_name in stats_dict:
         return stats_dict[team_name]
     
-    # Busca parcial (ex: "Los Angeles Lakers" contém "Lakers")
-    for key, value in stats_dict.items():
-        if key in team_name or team_name in key:
-            return value
+    # Busca pelo ID canônico (ex: "Los Angeles Clippers" -> LAC -> "LA Clippers")
+    for alias in NBA_TEAMS.names(NBA_TEAMS.resolve(team_name)):
+        if alias in stats_dict:
+            return stats_dict[alias]
     
     return default_stats
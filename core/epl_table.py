@@ -0,0 +1,186 @@
+"""
+Tabela da Premier League (fbref)
+Baixa só a tabela de classificação da página do fbref com requisição
+condicional (ETag/Last-Modified), guarda em disco com max-age e usa o
+dados_pl.csv como carga inicial tipada quando ainda não há cache nem rede
+"""
+import html as _html
+import json
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from .config import get_config
+from .tracing import traced
+
+FBREF_PATH = "/en/comps/9/Premier-League-Stats"
+
+# Diretório do cache em disco (tabela + validadores HTTP)
+CACHE_DIR = "fbref_cache"
+
+# Idade máxima do cache antes de revalidar com o fbref (segundos)
+DEFAULT_MAX_AGE = 60 * 60
+
+# Carga inicial (mesmo esquema da tabela do fbref)
+WARM_FILE = Path(__file__).resolve().parent.parent / "dados_pl.csv"
+
+# Colunas usadas pelo modelo e seus tipos
+TABLE_DTYPES = {'Squad': 'string', 'MP': 'int64', 'GF': 'int64', 'GA': 'int64'}
+
+# Tabela de classificação geral (id="results2024-202591_overall" no fbref)
+_TABLE_RE = re.compile(r'<table\b[^>]*\bid="results[^"]*_overall"[^>]*>.*?</table>', re.S | re.I)
+_ROW_RE = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.S | re.I)
+_CELL_RE = re.compile(r'<t[hd]\b[^>]*>(.*?)</t[hd]>', re.S | re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+@dataclass
+class EPLTable:
+    """Tabela da liga e de onde ela veio"""
+    frame: pd.DataFrame
+    source: str              # 'online' (200/304), 'cache' (disco dentro do max-age), 'stale' (disco vencido, rede falhou), 'warm' (dados_pl.csv)
+    fetched_at: datetime     # Quando os dados foram obtidos/validados no fbref (mtime do arquivo para o warm)
+
+    @property
+    def is_live(self) -> bool:
+        return self.source in ('online', 'cache')
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Só as colunas do modelo, tipadas (linhas sem clube/números ficam de fora)."""
+    df = df[list(TABLE_DTYPES)].copy()
+    for col in ('MP', 'GF', 'GA'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=list(TABLE_DTYPES))
+    return df.astype(TABLE_DTYPES).reset_index(drop=True)
+
+
+def parse_league_table(html: str) -> pd.DataFrame:
+    """
+    Extrai só a tabela de classificação da página do fbref.
+
+    O HTML da tabela é recortado antes do parse e as células saem por regex,
+    então as outras dezenas de tabelas da página não são processadas.
+
+    Raises:
+        ValueError: Se a tabela não estiver na página
+    """
+    match = _TABLE_RE.search(html)
+    if match is None:
+        raise ValueError("tabela de classificação não encontrada")
+    rows = [
+        [_html.unescape(_TAG_RE.sub('', cell)).strip() for cell in _CELL_RE.findall(row)]
+        for row in _ROW_RE.findall(match.group(0))
+    ]
+    header = next((r for r in rows if 'Squad' in r), None)
+    if header is None:
+        raise ValueError("cabeçalho da tabela sem a coluna Squad")
+    body = [r for r in rows if len(r) == len(header) and r is not header]
+    return _typed(pd.DataFrame(body, columns=header))
+
+
+def load_warm_table(path: Union[str, Path] = WARM_FILE) -> pd.DataFrame:
+    """Tabela do dados_pl.csv (só as colunas do modelo, tipadas na leitura)."""
+    return _typed(pd.read_csv(path, usecols=list(TABLE_DTYPES), dtype={'Squad': 'string'}))
+
+
+def table_stats(df: pd.DataFrame) -> Dict[str, List[int]]:
+    """{clube: [jogos, gols feitos, gols sofridos]} no formato do modelo de Poisson."""
+    return {squad: [mp, gf, ga] for squad, mp, gf, ga in
+            zip(df['Squad'], df['MP'].tolist(), df['GF'].tolist(), df['GA'].tolist())}
+
+
+class EPLTableCache:
+    """
+    Cache em disco da tabela: `<root>/pl_table.csv` + `pl_table.json`
+    (ETag, Last-Modified e horário da última validação).
+    """
+
+    def __init__(self, root: Union[str, Path] = CACHE_DIR, max_age: float = DEFAULT_MAX_AGE):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.table_path = self.root / "pl_table.csv"
+        self.meta_path = self.root / "pl_table.json"
+
+    def _load(self):
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+            df = pd.read_csv(self.table_path, dtype={'Squad': 'string'})
+            return _typed(df), meta
+        except (OSError, ValueError, KeyError):
+            return None, {}
+
+    def _save(self, df: Optional[pd.DataFrame], meta: Dict) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if df is not None:
+                df.to_csv(self.table_path, index=False)
+            self.meta_path.write_text(json.dumps(meta), encoding='utf-8')
+        except OSError as e:
+            print(f"[WARN] Erro ao gravar cache do fbref: {e}")
+
+    @traced('fetch.fbref')
+    def get(self, force: bool = False) -> EPLTable:
+        """
+        Tabela da liga, indo à rede só quando o cache venceu.
+
+        Args:
+            force: Revalida com o fbref mesmo dentro do max-age
+
+        Returns:
+            EPLTable (nunca vazia: sem cache e sem rede usa o dados_pl.csv)
+        """
+        cached, meta = self._load()
+        age = time.time() - meta.get('fetched_at', 0)
+        if cached is not None and not force and age < self.max_age:
+            print("[CACHE] Tabela da Premier League do disco")
+            return EPLTable(cached, 'cache', datetime.fromtimestamp(meta['fetched_at']))
+
+        headers = dict(_HEADERS)
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            import requests
+
+            response = requests.get(f"{get_config().fbref_base_url}{FBREF_PATH}", headers=headers, timeout=6)
+            now = time.time()
+            if response.status_code == 304 and cached is not None:
+                self._save(None, {**meta, 'fetched_at': now})
+                print("[OK] Tabela da Premier League sem mudanças (304)")
+                return EPLTable(cached, 'online', datetime.fromtimestamp(now))
+            response.raise_for_status()
+            table = parse_league_table(response.text)
+            self._save(table, {'etag': response.headers.get('ETag'),
+                               'last_modified': response.headers.get('Last-Modified'), 'fetched_at': now})
+            print(f"[OK] Tabela da Premier League | {len(table)} clubes")
+            return EPLTable(table, 'online', datetime.fromtimestamp(now))
+        except Exception as e:
+            print(f"[WARN] fbref indisponível: {e}")
+
+        if cached is not None:
+            return EPLTable(cached, 'stale', datetime.fromtimestamp(meta['fetched_at']))
+        return EPLTable(load_warm_table(), 'warm', datetime.fromtimestamp(WARM_FILE.stat().st_mtime))
+
+
+_cache: Optional[EPLTableCache] = None
+
+
+def get_epl_table(force: bool = False) -> EPLTable:
+    """Tabela da Premier League pelo cache padrão do processo."""
+    global _cache
+    if _cache is None:
+        _cache = EPLTableCache()
+    return _cache.get(force)
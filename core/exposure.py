@@ -0,0 +1,361 @@
+"""
+Índice de Exposição
+Agrega as apostas pendentes (stake, pior e melhor caso) por jogo, time,
+mercado e dia em dicionários (lookup O(1)), atualizado a cada aposta salva ou
+liquidada e persistido ao lado do CSV para não reler o histórico no boot
+"""
+import atexit
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .backoffice import parse_bet, parse_bets
+
+DIMENSIONS = ('game', 'team', 'market', 'day')
+
+# Atraso da gravação do índice em disco: rajadas de apostas/edições viram uma gravação só
+PERSIST_DELAY_S = 2.0
+
+
+@dataclass
+class Exposure:
+    """Exposição agregada de um grupo de apostas pendentes"""
+    bets: int = 0
+    stake: float = 0.0   # Soma apostada (R$)
+    worst: float = 0.0   # P&L se todas perderem (= -stake)
+    best: float = 0.0    # P&L se todas ganharem
+
+
+def file_signature(filepath: str) -> Optional[List]:
+    """(mtime_ns, tamanho) do CSV: o índice persistido só vale para esse estado do arquivo."""
+    try:
+        st = os.stat(filepath)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def sidecar_path(filepath: str, kind: str = 'exposure') -> str:
+    """Arquivo do índice ao lado do CSV (ex: bets_history.exposure.json)."""
+    root, _ = os.path.splitext(filepath)
+    return f"{root}.{kind}.json"
+
+
+def _row_keys(bets: pd.DataFrame) -> Counter:
+    """Multiconjunto das apostas: uma tupla (Data, Jogo, Tipo, Aposta, Odd, Valor) por linha."""
+    text = [bets[c].astype(str).tolist() for c in ('Data', 'Jogo', 'Tipo', 'Aposta')]
+    odd = pd.to_numeric(bets['Odd'], errors='coerce').fillna(1.0).tolist()
+    valor = pd.to_numeric(bets['Valor'], errors='coerce').fillna(0.0).tolist()
+    return Counter(zip(*text, odd, valor))
+
+
+def _keys_frame(keys: Counter) -> pd.DataFrame:
+    return pd.DataFrame(list(keys.elements()), columns=['Data', 'Jogo', 'Tipo', 'Aposta', 'Odd', 'Valor'])
+
+
+class ExposureIndex:
+    """
+    Exposição pendente por dimensão: {dim: {chave: Exposure}}.
+
+    Chaves: game = 'AWAY@HOME' (siglas), team = sigla (totais contam para os
+    dois times), market = Spread/Total/ML/..., day = 'YYYY-MM-DD' da aposta.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, Dict[str, Exposure]] = {dim: {} for dim in DIMENSIONS}
+        self.signature: Optional[List] = None
+        # Pendentes que formam o índice (só em memória; None = desconhecidas, ex: lido do disco)
+        self._pending: Optional[Counter] = None
+
+    # --- CONSTRUÇÃO ---
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> 'ExposureIndex':
+        """Reconstrói o índice a partir do histórico (groupby vetorizado das pendentes)."""
+        index = cls()
+        pending = df[df['Resultado'] == 'Pendente']
+        index._pending = _row_keys(pending)
+        if pending.empty:
+            return index
+
+        parsed = parse_bets(pending)
+        valor = pd.to_numeric(pending['Valor'], errors='coerce').fillna(0.0)
+        odd = pd.to_numeric(pending['Odd'], errors='coerce').fillna(1.0)
+        base = pd.DataFrame({
+            'game': parsed['game'], 'market': parsed['market'], 'day': parsed['day'],
+            'stake': valor, 'best': valor * (odd - 1)
+        })
+        totals = parsed['market'] == 'Total'
+        teams = pd.concat([
+            base.assign(team=parsed['team']),
+            base.assign(team=parsed['home']).loc[totals],
+            base.assign(team=parsed['away']).loc[totals]
+        ])
+
+        for dim, frame in (('game', base), ('market', base), ('day', base), ('team', teams)):
+            agg = frame.dropna(subset=[dim]).groupby(dim).agg(bets=('stake', 'size'), stake=('stake', 'sum'),
+                                                               best=('best', 'sum'))
+            index._index[dim] = {
+                str(k): Exposure(int(r.bets), float(r.stake), -float(r.stake), float(r.best))
+                for k, r in zip(agg.index, agg.itertuples())
+            }
+        return index
+
+    # --- ATUALIZAÇÃO INCREMENTAL ---
+
+    @staticmethod
+    def _keys(row: Dict) -> List[Tuple[str, str]]:
+        keys = [('game', row['game']), ('market', row['market']), ('day', row['day']), ('team', row['team'])]
+        if row['market'] == 'Total':
+            keys += [('team', row['home']), ('team', row['away'])]
+        return [(dim, str(k)) for dim, k in keys if isinstance(k, str) and k]
+
+    def _apply(self, bets: pd.DataFrame, sign: int) -> None:
+        for bet in bets.to_dict('records'):
+            row = parse_bet(bet['Jogo'], bet['Tipo'], bet['Aposta'], bet.get('Data', ''))
+            valor = float(bet['Valor'])
+            best = valor * (float(bet['Odd']) - 1)
+            for dim, key in self._keys(row):
+                e = self._index[dim].setdefault(key, Exposure())
+                e.bets += sign
+                e.stake += sign * valor
+                e.worst -= sign * valor
+                e.best += sign * best
+                if e.bets <= 0:
+                    del self._index[dim][key]
+
+    def add(self, bets: pd.DataFrame) -> None:
+        """Soma apostas novas (pendentes) ao índice."""
+        self._apply(bets, +1)
+        if self._pending is not None:
+            self._pending.update(_row_keys(bets))
+
+    def remove(self, bets: pd.DataFrame) -> None:
+        """Tira apostas liquidadas do índice."""
+        self._apply(bets, -1)
+        if self._pending is not None:
+            self._pending = self._pending - _row_keys(bets)
+
+    def sync(self, df: pd.DataFrame) -> 'ExposureIndex':
+        """
+        Acompanha o histórico regravado aplicando só a diferença de pendentes.
+
+        Liquidar/editar algumas linhas custa o parse dessas linhas, não o
+        groupby do histórico inteiro. Sem as pendentes em memória (índice lido
+        do disco), reconstrói.
+
+        Returns:
+            O índice atualizado (self, ou um novo se precisou reconstruir)
+        """
+        if self._pending is None:
+            return ExposureIndex.from_history(df)
+        current = _row_keys(df[df['Resultado'] == 'Pendente'])
+        removed, added = self._pending - current, current - self._pending
+        if removed:
+            self._apply(_keys_frame(removed), -1)
+        if added:
+            self._apply(_keys_frame(added), +1)
+        self._pending = current
+        return self
+
+    # --- CONSULTA ---
+
+    def get(self, dim: str, key: str) -> Exposure:
+        """Exposição de uma chave (O(1)); Exposure vazia se não houver pendentes."""
+        return self._index[dim].get(key, Exposure())
+
+    def frame(self, dim: str) -> pd.DataFrame:
+        """Tabela de uma dimensão, maior stake primeiro."""
+        rows = [dict(key=k, **asdict(e)) for k, e in self._index[dim].items()]
+        df = pd.DataFrame(rows, columns=['key', 'bets', 'stake', 'worst', 'best'])
+        return df.sort_values('stake', ascending=False).reset_index(drop=True)
+
+    def check(self, bet: Dict, limits: Dict[str, float]) -> Tuple[float, List[str]]:
+        """
+        Verifica uma aposta nova contra os limites de exposição.
+
+        Args:
+            bet: Dict com Jogo, Tipo, Aposta, Odd, Valor (e Data opcional)
+            limits: Limite de stake pendente (R$) por dimensão ('game', 'team', 'day', ...)
+
+        Returns:
+            (valor máximo permitido, lista de avisos das dimensões estouradas)
+        """
+        from datetime import datetime
+
+        parsed = parse_bet(bet['Jogo'], bet['Tipo'], bet['Aposta'], bet.get('Data') or datetime.now().strftime('%Y-%m-%d'))
+        allowed, warnings = float(bet['Valor']), []
+        for dim, key in self._keys(parsed):
+            if dim not in limits:
+                continue
+            pending = self.get(dim, key).stake
+            room = limits[dim] - pending
+            if bet['Valor'] > room:
+                warnings.append(f"{dim} {key}: R$ {pending:.2f} pendente (limite R$ {limits[dim]:.2f})")
+                allowed = min(allowed, max(room, 0.0))
+        return allowed, warnings
+
+    # --- PERSISTÊNCIA ---
+
+    def save(self, path: str) -> None:
+        data = {'signature': self.signature,
+                'index': {dim: {k: asdict(e) for k, e in keys.items()} for dim, keys in self._index.items()}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ExposureIndex']:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        index = cls()
+        index.signature = data.get('signature')
+        for dim in DIMENSIONS:
+            index._index[dim] = {k: Exposure(**e) for k, e in data.get('index', {}).get(dim, {}).items()}
+        return index
+
+
+def exposure_limits(bankroll: float, config=None) -> Dict[str, float]:
+    """
+    Limites de stake pendente (R$) por dimensão a partir da banca.
+
+    Args:
+        bankroll: Banca atual em R$
+        config: Config (usa get_config se não fornecido)
+    """
+    from .config import get_config
+
+    config = config or get_config()
+    return {
+        'game': bankroll * config.max_game_exposure,
+        'team': bankroll * config.max_team_exposure,
+        'day': bankroll * config.max_exposure
+    }
+
+
+_indexes: Dict[str, ExposureIndex] = {}
+_lock = threading.Lock()
+
+
+def get_exposure_index(filepath: str) -> ExposureIndex:
+    """
+    Índice do histórico `filepath` (memória > arquivo .exposure.json > rebuild).
+
+    O índice persistido só é usado se a assinatura (mtime/tamanho) bater com o
+    CSV atual; caso contrário é reconstruído uma vez e regravado.
+    """
+    from .backoffice import load_history
+
+    sig = file_signature(filepath)
+    with _lock:
+        index = _indexes.get(filepath)
+        if index is not None and index.signature == sig:
+            return index
+        index = ExposureIndex.load(sidecar_path(filepath))
+        if index is None or index.signature != sig:
+            index = ExposureIndex.from_history(load_history(filepath))
+            index.signature = sig
+            _persist(index, filepath)
+        _indexes[filepath] = index
+        return index
+
+
+def _persist(index: ExposureIndex, filepath: str) -> None:
+    try:
+        index.save(sidecar_path(filepath))
+    except Exception as e:
+        print(f"[WARN] Erro ao gravar índice de exposição: {e}")
+
+
+_timers: Dict[str, threading.Timer] = {}
+
+
+def _schedule_persist(filepath: str) -> None:
+    """Grava o índice PERSIST_DELAY_S depois da última mudança (chamar com _lock)."""
+    timer = _timers.get(filepath)
+    if timer is not None:
+        timer.cancel()
+    timer = threading.Timer(PERSIST_DELAY_S, _flush, args=(filepath,))
+    timer.daemon = True
+    _timers[filepath] = timer
+    timer.start()
+
+
+def _flush(filepath: str) -> None:
+    with _lock:
+        _timers.pop(filepath, None)
+        index = _indexes.get(filepath)
+        if index is not None:
+            _persist(index, filepath)
+
+
+@atexit.register
+def flush_exposure() -> None:
+    """Grava já os índices com gravação agendada (saída do processo)."""
+    with _lock:
+        paths = list(_timers)
+        for timer in _timers.values():
+            timer.cancel()
+    for filepath in paths:
+        _flush(filepath)
+
+
+def _update(filepath: str, bets: pd.DataFrame, sign: int) -> None:
+    index = get_exposure_index_cached(filepath)
+    with _lock:
+        if index is not None:
+            if sign > 0:
+                index.add(bets)
+            else:
+                index.remove(bets)
+            index.signature = file_signature(filepath)
+            _schedule_persist(filepath)
+
+
+def on_bets_added(filepath: str, bets: pd.DataFrame) -> None:
+    """Chamado depois de gravar apostas novas no CSV."""
+    _update(filepath, bets, +1)
+
+
+def on_bets_settled(filepath: str, bets: pd.DataFrame) -> None:
+    """Chamado depois de liquidar apostas (só as linhas liquidadas saem do índice)."""
+    _update(filepath, bets, -1)
+
+
+def on_history_rewritten(filepath: str, df: pd.DataFrame) -> None:
+    """
+    Chamado depois de regravar o histórico (liquidação/edição).
+
+    O índice em memória recebe só a diferença de pendentes do frame; sem
+    índice carregado não há o que manter (a assinatura do .exposure.json não
+    bate mais e o próximo get_exposure_index reconstrói).
+    """
+    with _lock:
+        index = _indexes.get(filepath)
+        if index is None:
+            return
+        index = index.sync(df)
+        index.signature = file_signature(filepath)
+        _indexes[filepath] = index
+        _schedule_persist(filepath)
+
+
+def on_history_touched(filepath: str) -> None:
+    """CSV regravado sem mudar as pendentes (ex: CLV): só renova a assinatura do índice."""
+    index = get_exposure_index_cached(filepath)
+    with _lock:
+        if index is not None:
+            index.signature = file_signature(filepath)
+            _schedule_persist(filepath)
+
+
+def get_exposure_index_cached(filepath: str) -> Optional[ExposureIndex]:
+    """Índice já carregado em memória (None se ninguém consultou ainda: nada a manter)."""
+    return _indexes.get(filepath)
@@ -0,0 +1,139 @@
+"""
+Modelo Ao Vivo
+Combina a linha pré-jogo com o placar e o tempo restante (margem como
+movimento browniano com drift) para dar probabilidade de vitória, spread e
+total justos ao vivo de todos os jogos em andamento em uma passada vetorizada
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.special import ndtr
+
+from .calibration import Calibration, get_calibration
+
+# Duração (segundos) do tempo regulamentar, de cada quarto e de cada prorrogação
+GAME_SECONDS = 48 * 60
+PERIOD_SECONDS = 12 * 60
+OT_SECONDS = 5 * 60
+
+# Piso do tempo restante (fração do jogo) para não dividir por zero no estouro do relógio
+MIN_REMAINING = 1e-4
+
+
+def parse_clock(clock: str) -> float:
+    """
+    Segundos restantes no período a partir do relógio do scoreboard.
+
+    Aceita 'MM:SS' (clean_clock) e o ISO cru do CDN ('PT05M23.00S').
+    """
+    if not clock:
+        return 0.0
+    clock = str(clock)
+    try:
+        if clock.startswith('PT'):
+            minutes, _, seconds = clock[2:].rstrip('S').partition('M')
+            return float(minutes or 0) * 60 + float(seconds or 0)
+        minutes, _, seconds = clock.partition(':')
+        return float(minutes) * 60 + float(seconds or 0)
+    except ValueError:
+        return 0.0
+
+
+def remaining_fraction(period, clock_seconds):
+    """
+    Fração do jogo ainda por jogar (vetorizado).
+
+    Na prorrogação conta só o que resta da prorrogação atual (a fração fica
+    pequena, o que reflete a variância curta de 5 minutos).
+
+    Args:
+        period: Array de períodos (1-4, 5+ = prorrogação)
+        clock_seconds: Array de segundos restantes no período
+    """
+    period = np.asarray(period, dtype=float)
+    clock_seconds = np.asarray(clock_seconds, dtype=float)
+    regulation = (4 - np.minimum(period, 4)) * PERIOD_SECONDS + clock_seconds
+    seconds = np.where(period > 4, clock_seconds, regulation)
+    return np.maximum(seconds / GAME_SECONDS, MIN_REMAINING)
+
+
+def live_lines(
+    pregame_spread,
+    pregame_total,
+    home_score,
+    away_score,
+    period,
+    clock_seconds,
+    cal: Optional[Calibration] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Linhas justas ao vivo de todos os jogos de uma vez.
+
+    Margem final = margem atual + μ × r + σ × √r × Z, com r = fração restante
+    e μ = margem esperada pré-jogo (calibração). O total segue o mesmo modelo
+    com o total pré-jogo como drift.
+
+    Args:
+        pregame_spread: Spread justo pré-jogo do mandante
+        pregame_total: Total justo pré-jogo (NaN = sem total)
+        home_score, away_score: Placar atual
+        period: Período atual
+        clock_seconds: Segundos restantes no período
+        cal: Coeficientes (usa get_calibration se não fornecido)
+
+    Returns:
+        Dict de arrays: remaining, home_win, fair_spread (mandante), fair_total
+        e total_sigma (desvio do total restante, para precificar over/under)
+    """
+    cal = cal or get_calibration()
+    r = remaining_fraction(period, clock_seconds)
+    sqrt_r = np.sqrt(r)
+    margin = np.asarray(home_score, dtype=float) - np.asarray(away_score, dtype=float)
+    points = np.asarray(home_score, dtype=float) + np.asarray(away_score, dtype=float)
+
+    mu = cal.spread_intercept - cal.spread_slope * np.asarray(pregame_spread, dtype=float)
+    expected_margin = margin + mu * r
+    mu_t = cal.total_intercept + cal.total_slope * np.asarray(pregame_total, dtype=float)
+
+    return {
+        'remaining': r,
+        'home_win': ndtr(expected_margin / (cal.spread_sigma * sqrt_r)),
+        'fair_spread': -expected_margin,
+        'fair_total': points + mu_t * r,
+        'total_sigma': cal.total_sigma * sqrt_r
+    }
+
+
+def slate_live_lines(
+    live: Dict[str, Dict],
+    games: Sequence[Dict],
+    cal: Optional[Calibration] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Linhas ao vivo dos jogos em andamento do slate (uma chamada vetorizada).
+
+    Args:
+        live: Scoreboard por sigla (get_live_scores: live, period, clock, s_home, s_away)
+        games: Dicts com game_id, home_abbr, fair_spread e (opcional) fair_total
+        cal: Coeficientes
+
+    Returns:
+        {game_id: {'home_win', 'fair_spread', 'fair_total', 'remaining', 'total_sigma'}}
+    """
+    rows: List[Dict] = [g for g in games if (live.get(g['home_abbr']) or {}).get('live')]
+    if not rows:
+        return {}
+    info = [live[g['home_abbr']] for g in rows]
+    out = live_lines(
+        pregame_spread=[g['fair_spread'] for g in rows],
+        pregame_total=[g.get('fair_total', np.nan) for g in rows],
+        home_score=[float(i['s_home'] or 0) for i in info],
+        away_score=[float(i['s_away'] or 0) for i in info],
+        period=[int(i['period'] or 1) for i in info],
+        clock_seconds=[parse_clock(i['clock']) for i in info],
+        cal=cal
+    )
+    return {
+        g['game_id']: {k: float(v[j]) for k, v in out.items()}
+        for j, g in enumerate(rows)
+    }
@@ -5,6 +5,8 @@ Contém toda a lógica matemática para calcular linhas justas, edge e stakes
 from dataclasses import dataclass
 from typing import Optional
 
+from .calibration import edge_probability, win_probability
+
 
 @dataclass
 class TeamStats:
@@ -90,8 +92,9 @@ def calculate_fair_total(
     
     # Ajuste para confronto específico
     # Home ataca vs Away defesa, Away ataca vs Home defesa
-    home_adjusted_off = (home_off_rtg + (110 - away_def_rtg)) / 2
-    away_adjusted_off = (away_off_rtg + (110 - home_def_rtg)) / 2
+    # (média entre o ataque de um e a defesa do outro, ambos em pontos por 100 posses)
+    home_adjusted_off = (home_off_rtg + away_def_rtg) / 2
+    away_adjusted_off = (away_off_rtg + home_def_rtg) / 2
     
     home_pts = expected_pace * (home_adjusted_off / 100)
     away_pts = expected_pace * (away_adjusted_off / 100)
@@ -130,26 +133,24 @@ def calculate_edge(fair_line: float, market_line: float) -> float:
 def calculate_win_probability(spread: float) -> float:
     """
     Estima probabilidade de vitória baseado no spread.
-    Usando aproximação linear simplificada.
+    Usa a calibração normal (core.calibration): P = Φ(-spread / σ).
     
     Args:
         spread: Spread do jogo (negativo = favorito)
     
     Returns:
-        Probabilidade de vitória do favorito
+        Probabilidade de vitória do time cujo spread foi informado
     """
-    # Cada ponto de spread ≈ 3% de probabilidade
-    # Spread -7 ≈ 70% de chance
-    base_prob = 0.50
-    adjustment = (-spread) * 0.03
-    return min(0.95, max(0.05, base_prob + adjustment))
+    # Spread -7 ≈ 72% de chance (σ ≈ 12 pts)
+    return win_probability(spread)
 
 
 def kelly_stake(
     edge: float, 
     odds: float = 1.91, 
     fraction: float = 0.25,
-    max_stake: float = 3.0
+    max_stake: float = 3.0,
+    market: str = 'spreads'
 ) -> float:
     """
     Calcula stake usando Kelly Criterion fracionado.
@@ -165,14 +166,14 @@ def kelly_stake(
         odds: Odds decimais (default 1.91 para spread -110)
         fraction: Fração do Kelly a usar (0.25 = Quarter Kelly, mais conservador)
         max_stake: Stake máximo em unidades
+        market: 'spreads' ou 'totals' (desvio usado na calibração)
     
     Returns:
         Stake recomendado em unidades
     """
-    # Converte edge em probabilidade estimada
-    # Edge de 3 pontos ≈ 59% de probabilidade
-    prob = 0.50 + (edge / 20)
-    prob = min(0.75, max(0.52, prob))  # Limita entre 52% e 75%
+    # Converte edge em probabilidade calibrada
+    # Edge de 3 pontos no spread ≈ 60% de probabilidade
+    prob = edge_probability(edge, market)
     
     q = 1 - prob
     b = odds - 1
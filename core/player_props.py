@@ -1,24 +1,45 @@
+import time
+
+import numpy as np
 import pandas as pd
-from nba_api.stats.static import players
-from nba_api.stats.endpoints import playergamelog, leaguedashteamstats
+
+from .prop_pricing import fit_distribution, price_ladder, ladder_around
+from .correlations import CorrelationCache, price_same_game
+from .config import configure_nba_api, get_config
+from .team_stats_store import get_team_stats_store
+from .tracing import traced
+
+# Validade do gamelog em cache (jogos novos entram nas projecoes e correlacoes)
+GAMELOG_TTL = 6 * 60 * 60
+
+def previous_season(season):
+    """Temporada anterior no formato da NBA ('2024-25' -> '2023-24')."""
+    start = int(season[:4]) - 1
+    return f"{start}-{str(start + 1)[-2:]}"
 
 class PlayerPropsEngine:
     def __init__(self):
         self.cache = {}
-        self.team_defense = self._load_team_defense()
+        self.fetched_at = {}
+        self.correlations = CorrelationCache()
+
+    @property
+    def team_defense(self):
+        """
+        DefRtg de todos os times para ajuste de matchup.
 
-    def _load_team_defense(self):
-        """Carrega DefRtg de todos os times para ajuste de matchup."""
+        Lido do store compartilhado no primeiro uso (nao bloqueia o construtor)
+        e acompanha a janela de atualizacao do store.
+        """
         try:
-            stats = leaguedashteamstats.LeagueDashTeamStats(
-                season='2024-25', measure_type_detailed_defense='Base'
-            ).get_data_frames()[0]
             # Cria dicionario {TEAM_ABBREVIATION: DEFRTG}
-            return dict(zip(stats['TEAM_ABBREVIATION'], stats['DEF_RATING']))
+            return get_team_stats_store().def_rating_by_abbr()
         except:
             return {}
 
     def get_player_id(self, name):
+        from nba_api.stats.static import players
+
         try:
             nba_players = players.get_players()
             found = [p for p in nba_players if name.lower() in p['full_name'].lower()]
@@ -26,30 +47,53 @@ class PlayerPropsEngine:
         except:
             return None
 
-    def get_projection(self, player_name, opponent_abbr):
+    def get_gamelog(self, player_name):
+        """Busca o gamelog do jogador (temporada atual, ou anterior se vazia), com cache de GAMELOG_TTL."""
+        cached = self.cache.get(player_name)
+        if cached is not None and time.time() - self.fetched_at[player_name] < GAMELOG_TTL:
+            return cached
+
+        p_id = self.get_player_id(player_name)
+        if not p_id: return cached
+
+        df = self._fetch_gamelog(p_id)
+        if df is None or df.empty: return cached
+        self.cache[player_name] = df
+        self.fetched_at[player_name] = time.time()
+        return df
+
+    @traced('fetch.gamelog')
+    def _fetch_gamelog(self, p_id):
+        from nba_api.stats.endpoints import playergamelog
+
+        configure_nba_api()
+        season = get_config().nba_season
+        try:
+            gamelog = playergamelog.PlayerGameLog(player_id=p_id, season=season)
+            df = gamelog.get_data_frames()[0]
+
+            if df.empty:
+                 gamelog = playergamelog.PlayerGameLog(player_id=p_id, season=previous_season(season))
+                 df = gamelog.get_data_frames()[0]
+            return df
+        except Exception as e:
+            print(f"Erro prop engine: {e}")
+            return None
+
+    def get_projection(self, player_name, opponent_abbr, stat='PTS'):
         """
         Gera projecao de Pontos baseada em:
         - 40% Media da Temporada
         - 40% Ultimos 5 Jogos
         - 20% Fator Matchup (Defesa do Oponente)
         """
-        p_id = self.get_player_id(player_name)
-        if not p_id: return None
+        df = self.get_gamelog(player_name)
+        if df is None: return None
 
         try:
-            # Busca Logs
-            gamelog = playergamelog.PlayerGameLog(player_id=p_id, season='2024-25')
-            df = gamelog.get_data_frames()[0]
-            
-            if df.empty:
-                 gamelog = playergamelog.PlayerGameLog(player_id=p_id, season='2023-24')
-                 df = gamelog.get_data_frames()[0]
-            
-            if df.empty: return None
-
             # 1. Base Stats
-            season_avg = df['PTS'].mean()
-            last_5_avg = df.head(5)['PTS'].mean()
+            season_avg = df[stat].mean()
+            last_5_avg = df.head(5)[stat].mean()
 
             # 2. Matchup Adjustment
             # Se a defesa do oponente for ruim (> 115), ganha bonus. Se boa (< 110), perde.
@@ -64,6 +108,7 @@ class PlayerPropsEngine:
 
             return {
                 "player": player_name,
+                "stat": stat,
                 "projection": round(projection, 1),
                 "season_avg": round(season_avg, 1),
                 "last_5_avg": round(last_5_avg, 1),
@@ -74,3 +119,58 @@ class PlayerPropsEngine:
         except Exception as e:
             print(f"Erro prop engine: {e}")
             return None
+
+    def get_distribution(self, player_name, opponent_abbr, stat='PTS'):
+        """Ajusta a distribuicao da estatistica centrada na projecao (media + matchup)."""
+        proj = self.get_projection(player_name, opponent_abbr, stat)
+        if not proj: return None
+        df = self.get_gamelog(player_name)
+        return fit_distribution(df[stat], player=player_name, stat=stat, mean=proj['projection'])
+
+    def price_props(self, picks, over_odds=1.90, under_odds=1.90, steps=4):
+        """
+        Precifica a escada de linhas alternativas de varios jogadores de uma vez.
+
+        Args:
+            picks: Lista de tuplas (jogador, sigla_oponente, stat)
+            over_odds, under_odds: Odds de mercado (escalar ou array por linha)
+            steps: Linhas alternativas para cada lado da projecao
+
+        Returns:
+            DataFrame longo com uma linha por (jogador, linha)
+        """
+        dists = [self.get_distribution(p, opp, stat) for p, opp, stat in picks]
+        dists = [d for d in dists if d is not None]
+        if not dists: return pd.DataFrame()
+
+        lines = np.stack([ladder_around(d.mean, steps) for d in dists])
+        priced = price_ladder(dists, lines, over_odds, under_odds)
+
+        n_lines = lines.shape[1]
+        out = pd.DataFrame({k: v.ravel() for k, v in priced.items()})
+        out.insert(0, 'stat', np.repeat([d.stat for d in dists], n_lines))
+        out.insert(0, 'player', np.repeat([d.player for d in dists], n_lines))
+        return out
+
+    def get_correlations(self, team_key, player_names):
+        """Atualiza (incrementalmente) e retorna as correlacoes do grupo de jogadores."""
+        gamelogs = {p: self.get_gamelog(p) for p in player_names}
+        return self.correlations.refresh(team_key, gamelogs)
+
+    def price_same_game(self, team_key, legs, opponent_abbr, n_sims=20000):
+        """
+        Precifica uma combinacao do mesmo jogo.
+
+        Atualiza a matriz do grupo com os gamelogs das pernas a cada chamada:
+        jogadores novos entram no grupo e jogos novos sao somados (incremental,
+        sem reprocessar o historico). Usa as distribuicoes ajustadas de cada perna.
+        """
+        team = self.get_correlations(team_key, {leg.player for leg in legs})
+
+        dists = {}
+        for leg in legs:
+            dist = self.get_distribution(leg.player, opponent_abbr, leg.stat)
+            if dist is None: return None
+            dists[leg.label] = dist
+
+        return price_same_game(legs, dists, team, n_sims=n_sims)
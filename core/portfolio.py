@@ -0,0 +1,157 @@
+"""
+Kelly Simultâneo
+Dimensiona todas as apostas de valor do slate juntas: maximiza o crescimento
+esperado do log da banca sobre cenários correlacionados (cópula gaussiana)
+com scipy.optimize, sob limites de stake por aposta e de exposição total
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.special import ndtri
+
+# Correlações padrão entre resultados (cópula gaussiana)
+SAME_SIDE_CORR = 0.9    # Mesmo jogo e mesmo lado (ex: o mesmo time em duas casas/linhas)
+SAME_GAME_CORR = 0.2    # Mesmo jogo, outro mercado/lado (ex: spread + total)
+SAME_TEAM_CORR = 0.3    # Mesmo time em jogos diferentes
+
+# Cenários simulados (semente fixa: stakes estáveis entre refreshes)
+N_SCENARIOS = 4000
+
+
+@dataclass
+class Bet:
+    """Uma aposta candidata"""
+    key: str                  # Identificação (ex: 'event_id:spreads:Boston Celtics')
+    prob: float               # Probabilidade calibrada de ganhar
+    odds: float               # Odd decimal
+    game: str = ''            # event_id (correlação de mesmo jogo)
+    side: str = ''            # Time/lado apostado (correlação de mesmo lado/time)
+
+
+@dataclass
+class KellyResult:
+    """Stakes ótimas como fração da banca"""
+    keys: List[str]
+    stakes: np.ndarray                # Fração da banca por aposta (já com a fração de Kelly)
+    independent: np.ndarray           # Kelly isolado × fração, para comparação
+    growth: float                     # Crescimento esperado do log da banca por slate
+    exposure: float                   # Soma das stakes
+    converged: bool
+    message: str = ''
+    extra: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return dict(zip(self.keys, self.stakes.round(4).tolist()))
+
+
+def default_correlation(
+    bets: Sequence[Bet],
+    same_side: float = SAME_SIDE_CORR,
+    same_game: float = SAME_GAME_CORR,
+    same_team: float = SAME_TEAM_CORR
+) -> np.ndarray:
+    """
+    Matriz de correlação heurística entre os resultados das apostas.
+
+    Returns:
+        Matriz n × n (diagonal 1)
+    """
+    game = np.array([b.game for b in bets], dtype=object)
+    side = np.array([b.side for b in bets], dtype=object)
+    g_eq = (game[:, None] == game[None, :]) & (game[:, None] != '')
+    s_eq = (side[:, None] == side[None, :]) & (side[:, None] != '')
+    corr = np.where(g_eq & s_eq, same_side, np.where(g_eq, same_game, np.where(s_eq, same_team, 0.0)))
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def _nearest_psd(corr: np.ndarray) -> np.ndarray:
+    """Corta autovalores negativos (correlações heurísticas podem não ser PSD)."""
+    w, v = np.linalg.eigh(corr)
+    fixed = (v * np.maximum(w, 1e-6)) @ v.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def simulate_outcomes(probs: np.ndarray, corr: Optional[np.ndarray], n: int = N_SCENARIOS, seed: int = 0) -> np.ndarray:
+    """
+    Cenários de acerto (n × apostas, booleano) com as marginais `probs`.
+
+    Cópula gaussiana: Z ~ N(0, corr); a aposta i ganha se Z_i < Φ⁻¹(p_i).
+    """
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n, len(probs)))
+    if corr is not None and len(probs) > 1:
+        try:
+            chol = np.linalg.cholesky(corr)
+        except np.linalg.LinAlgError:
+            chol = np.linalg.cholesky(_nearest_psd(corr))
+        z = z @ chol.T
+    return z < ndtri(np.clip(probs, 1e-9, 1 - 1e-9))
+
+
+def optimize_stakes(
+    bets: Sequence[Bet],
+    corr: Optional[np.ndarray] = None,
+    fraction: float = 0.25,
+    max_bet: float = 0.05,
+    max_exposure: float = 0.25,
+    n_scenarios: int = N_SCENARIOS,
+    seed: int = 0
+) -> KellyResult:
+    """
+    Kelly simultâneo: max E[log(1 + Σ fᵢ rᵢ)] sobre os cenários simulados.
+
+    O ótimo de Kelly cheio é resolvido com os limites divididos pela fração
+    e depois escalado, então as stakes finais respeitam max_bet/max_exposure.
+
+    Args:
+        bets: Apostas candidatas
+        corr: Matriz de correlação (None = default_correlation)
+        fraction: Fração de Kelly (0.25 = Quarter Kelly)
+        max_bet: Stake máxima por aposta (fração da banca)
+        max_exposure: Soma máxima das stakes (fração da banca)
+        n_scenarios: Cenários simulados
+        seed: Semente dos cenários
+
+    Returns:
+        KellyResult com as stakes por aposta
+    """
+    n = len(bets)
+    keys = [b.key for b in bets]
+    if n == 0:
+        empty = np.zeros(0)
+        return KellyResult(keys, empty, empty, 0.0, 0.0, True, 'sem apostas')
+
+    probs = np.array([b.prob for b in bets], dtype=float)
+    net = np.array([b.odds for b in bets], dtype=float) - 1.0
+    single = np.clip((probs * net - (1 - probs)) / net, 0.0, None)
+    independent = np.minimum(single * fraction, max_bet)
+
+    corr = default_correlation(bets) if corr is None else np.asarray(corr, dtype=float)
+    wins = simulate_outcomes(probs, corr, n_scenarios, seed)
+    returns = np.where(wins, net, -1.0)   # Retorno por unidade apostada em cada cenário
+
+    cap_bet = min(max_bet / fraction, 1.0)
+    cap_total = min(max_exposure / fraction, 0.999)
+
+    def objective(f):
+        wealth = np.maximum(1.0 + returns @ f, 1e-9)
+        return -np.mean(np.log(wealth)), -(returns / wealth[:, None]).mean(axis=0)
+
+    x0 = np.minimum(single, cap_bet)
+    if x0.sum() > cap_total:
+        x0 *= cap_total / x0.sum()
+    res = minimize(
+        objective, x0, jac=True, method='SLSQP',
+        bounds=[(0.0, cap_bet)] * n,
+        constraints=[{'type': 'ineq', 'fun': lambda f: cap_total - f.sum(), 'jac': lambda f: -np.ones(n)}],
+        options={'maxiter': 200, 'ftol': 1e-10}
+    )
+    full = np.clip(res.x, 0.0, cap_bet)
+    stakes = full * fraction
+    growth = float(np.mean(np.log1p(returns @ stakes)))
+    return KellyResult(keys, stakes, independent, growth, float(stakes.sum()), bool(res.success), str(res.message),
+                       extra={'iterations': int(res.nit), 'scenarios': n_scenarios})
@@ -0,0 +1,240 @@
+"""
+Motor de Precificação de Props
+Ajusta uma distribuição por jogador/estatística a partir do gamelog e
+precifica uma escada inteira de linhas (Over/Under) em uma única operação vetorizada
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from scipy.stats import nbinom, norm, poisson
+
+# Famílias suportadas
+NBINOM = 'nbinom'    # Contagem com sobredispersão (var > média)
+POISSON = 'poisson'  # Contagem com var <= média
+NORMAL = 'normal'    # Normal com variância empírica
+
+
+@dataclass
+class PropDistribution:
+    """Distribuição ajustada para uma estatística de um jogador"""
+    player: str
+    stat: str
+    mean: float
+    var: float
+    n_games: int
+    family: str = NBINOM
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.var))
+
+
+def fit_distribution(
+    values: Sequence[float],
+    player: str = '',
+    stat: str = 'PTS',
+    mean: Optional[float] = None,
+    family: Optional[str] = None,
+    min_var: float = 1.0
+) -> Optional[PropDistribution]:
+    """
+    Ajusta a distribuição de uma estatística pelo método dos momentos.
+
+    Se `mean` for informado (ex: projeção com ajuste de matchup), a média é
+    deslocada para ele mantendo a razão variância/média observada.
+
+    Args:
+        values: Valores do gamelog (ex: coluna PTS)
+        player: Nome do jogador
+        stat: Estatística (PTS, REB, AST...)
+        mean: Média alvo (usa a média amostral se não fornecida)
+        family: Força a família ('nbinom', 'poisson', 'normal'); automática se None.
+                'nbinom' sem sobredispersão cai para Poisson
+        min_var: Variância mínima (evita distribuição degenerada com poucos jogos)
+
+    Returns:
+        PropDistribution ou None se não houver dados
+    """
+    arr = np.asarray(values, dtype=float)
+    arr = arr[~np.isnan(arr)]
+    if arr.size == 0:
+        return None
+
+    sample_mean = float(arr.mean())
+    sample_var = float(arr.var(ddof=1)) if arr.size > 1 else sample_mean
+    sample_var = max(sample_var, min_var)
+
+    target_mean = sample_mean if mean is None else float(mean)
+    target_mean = max(target_mean, 0.1)
+    if sample_mean > 0:
+        var = sample_var * (target_mean / sample_mean)
+    else:
+        var = sample_var
+    var = max(var, min_var)
+
+    if family is None:
+        family = NBINOM if var > target_mean else POISSON
+    elif family == NBINOM and var <= target_mean:
+        # Binomial negativa exige var > média (senão n e p saem NaN)
+        family = POISSON
+
+    return PropDistribution(
+        player=player,
+        stat=stat,
+        mean=target_mean,
+        var=var,
+        n_games=int(arr.size),
+        family=family
+    )
+
+
+def _pack(dists: Sequence[PropDistribution]) -> Dict[str, np.ndarray]:
+    """Empilha os parâmetros das distribuições em colunas (P, 1) para broadcast."""
+    mean = np.array([d.mean for d in dists], dtype=float)[:, None]
+    var = np.array([d.var for d in dists], dtype=float)[:, None]
+    family = np.array([d.family for d in dists])[:, None]
+    return {'mean': mean, 'var': var, 'family': family}
+
+
+def _over_under_probs(
+    mean: np.ndarray,
+    var: np.ndarray,
+    family: np.ndarray,
+    lines: np.ndarray
+) -> tuple:
+    """
+    Calcula P(Over) e P(Under) para todas as combinações jogador × linha.
+
+    Linhas inteiras geram push: P(Over) = P(X > k), P(Under) = P(X < k).
+    """
+    k_over = np.floor(lines)            # Over ganha se X > k_over
+    k_under = np.ceil(lines) - 1        # Under ganha se X <= k_under
+
+    p_over = np.empty(np.broadcast(mean, lines).shape)
+    p_under = np.empty_like(p_over)
+
+    fam = np.broadcast_to(family, p_over.shape)
+    mean_b = np.broadcast_to(mean, p_over.shape)
+    var_b = np.broadcast_to(var, p_over.shape)
+    ko = np.broadcast_to(k_over, p_over.shape)
+    ku = np.broadcast_to(k_under, p_over.shape)
+
+    m = fam == NBINOM
+    if m.any():
+        # Parametrização scipy: n = mu² / (var - mu), p = mu / var
+        mu, v = mean_b[m], var_b[m]
+        n = mu ** 2 / (v - mu)
+        p = mu / v
+        p_over[m] = nbinom.sf(ko[m], n, p)
+        p_under[m] = nbinom.cdf(ku[m], n, p)
+
+    m = fam == POISSON
+    if m.any():
+        mu = mean_b[m]
+        p_over[m] = poisson.sf(ko[m], mu)
+        p_under[m] = poisson.cdf(ku[m], mu)
+
+    m = fam == NORMAL
+    if m.any():
+        # Correção de continuidade para manter a mesma semântica de push
+        mu, sd = mean_b[m], np.sqrt(var_b[m])
+        p_over[m] = norm.sf(ko[m] + 0.5, mu, sd)
+        p_under[m] = norm.cdf(ku[m] + 0.5, mu, sd)
+
+    return p_over, p_under
+
+
+def price_ladder(
+    dists: Sequence[PropDistribution],
+    lines,
+    over_odds=1.90,
+    under_odds=1.90
+) -> Dict[str, np.ndarray]:
+    """
+    Precifica uma escada de linhas para vários jogadores em uma única chamada.
+
+    Todos os argumentos fazem broadcast para o formato (jogadores, linhas):
+    `lines` pode ser 1D (mesma escada para todos) ou 2D (uma escada por jogador),
+    e as odds podem ser escalares, 1D por linha ou 2D.
+
+    Edge = valor esperado por unidade apostada, com push devolvendo a stake:
+        EV = P(Win) × (Odd - 1) - P(Loss)
+
+    Args:
+        dists: Distribuições ajustadas (uma por jogador/estatística)
+        lines: Linhas a precificar
+        over_odds: Odds decimais do mercado para o Over
+        under_odds: Odds decimais do mercado para o Under
+
+    Returns:
+        Dict de arrays (P, L): lines, p_over, p_under, p_push,
+        fair_over, fair_under, edge_over, edge_under
+    """
+    params = _pack(dists)
+    lines = np.atleast_1d(np.asarray(lines, dtype=float))
+    if lines.ndim == 1:
+        lines = lines[None, :]
+
+    p_over, p_under = _over_under_probs(params['mean'], params['var'], params['family'], lines)
+    p_push = np.clip(1.0 - p_over - p_under, 0.0, 1.0)
+
+    over_odds = np.asarray(over_odds, dtype=float)
+    under_odds = np.asarray(under_odds, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Odd justa com push: P(W) × (o - 1) = P(L)  =>  o = 1 + P(L) / P(W)
+        fair_over = np.where(p_over > 0, 1.0 + p_under / p_over, np.inf)
+        fair_under = np.where(p_under > 0, 1.0 + p_over / p_under, np.inf)
+
+    edge_over = p_over * (over_odds - 1.0) - p_under
+    edge_under = p_under * (under_odds - 1.0) - p_over
+
+    return {
+        'lines': np.broadcast_to(lines, p_over.shape),
+        'p_over': p_over,
+        'p_under': p_under,
+        'p_push': p_push,
+        'fair_over': fair_over,
+        'fair_under': fair_under,
+        'edge_over': edge_over,
+        'edge_under': edge_under
+    }
+
+
+def ladder_around(center: float, steps: int = 4, step: float = 1.0) -> np.ndarray:
+    """
+    Gera uma escada de linhas .5 em torno de um valor central.
+
+    Args:
+        center: Valor central (ex: projeção)
+        steps: Linhas para cada lado
+        step: Distância entre linhas
+
+    Returns:
+        Array de linhas (ex: 22.5, 23.5, ... 29.5)
+    """
+    base = np.floor(center) + 0.5
+    offsets = np.arange(-steps, steps + 1) * step
+    return np.maximum(base + offsets, 0.5)
+
+
+def distribution_ppf(dist: PropDistribution, u) -> np.ndarray:
+    """
+    Quantil da distribuição ajustada (inversa da CDF), vetorizado em `u`.
+
+    Usado para mapear uniformes correlacionadas de volta à escala da estatística.
+
+    Args:
+        dist: Distribuição ajustada
+        u: Probabilidades em (0, 1)
+
+    Returns:
+        Valores da estatística nos quantis pedidos
+    """
+    u = np.asarray(u, dtype=float)
+    if dist.family == NBINOM:
+        return nbinom.ppf(u, dist.mean ** 2 / (dist.var - dist.mean), dist.mean / dist.var)
+    if dist.family == POISSON:
+        return poisson.ppf(u, dist.mean)
+    return norm.ppf(u, dist.mean, dist.std)
@@ -0,0 +1,257 @@
+"""
+Scanner de Slate (linha de comando)
+Busca (ou lê do cache) odds, stats e placares, roda o modelo de spread/total
+com ajuste de desfalques e grava os picks em JSON/CSV, sem sessão do Streamlit
+
+Uso:
+    python -m core.scan                       # online, JSON no stdout
+    python -m core.scan --offline -f csv -o picks.csv
+    python -m core.scan --out "DEN:Nikola Jokic" --out "BOS:Jayson Tatum"
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .calibration import edge_probability
+from .config import get_config, Config
+from .odds_engine import calculate_fair_spread, calculate_fair_total, kelly_stake
+from .star_impact import get_team_stars
+from .teams import NBA_TEAMS
+
+# pandas/data_fetcher/store são importados dentro das funções: `--help` e
+# erros de argumento respondem sem pagar o import da camada de dados
+
+# Colunas de saída (ordem do CSV)
+PICK_FIELDS = [
+    'event_id', 'commence_time', 'away', 'home', 'market', 'pick', 'line', 'price',
+    'book', 'fair', 'edge', 'prob', 'stake_units', 'stake_pct', 'penalty_home', 'penalty_away', 'live'
+]
+
+
+def _parse_missing(entries: Sequence[str]) -> Dict[str, List[str]]:
+    """Converte ['DEN:Nikola Jokic', ...] em {'DEN': ['Nikola Jokic'], ...}."""
+    missing: Dict[str, List[str]] = {}
+    for entry in entries or []:
+        team, _, player = entry.partition(':')
+        team_id = NBA_TEAMS.resolve(team.strip())
+        if team_id is None or not player.strip():
+            print(f"[WARN] Desfalque ignorado (use TIME:Jogador): {entry}", file=sys.stderr)
+            continue
+        missing.setdefault(team_id, []).append(player.strip())
+    return missing
+
+
+def star_penalty(team_id: str, missing: Dict[str, List[str]]) -> float:
+    """
+    Soma o impacto (em NetRtg) das estrelas ausentes de um time.
+
+    Args:
+        team_id: Sigla canônica do time
+        missing: Dict {sigla: [jogadores fora]}
+
+    Returns:
+        Penalidade total em pontos
+    """
+    stars = get_team_stars(team_id)
+    return sum(stars.get(player, 0.0) for player in missing.get(team_id, []))
+
+
+def scan_picks(
+    games: List[Dict],
+    stats: Dict[str, Dict],
+    live: Optional[Dict[str, Dict]] = None,
+    missing: Optional[Dict[str, List[str]]] = None,
+    config: Optional[Config] = None
+) -> List[Dict]:
+    """
+    Roda o modelo sobre o slate e devolve os picks com valor.
+
+    Spread: mesmo critério da página (edge contra a melhor linha de cada lado).
+    Total: Pace × Efficiency contra a melhor linha de over/under.
+
+    Args:
+        games: Lista de jogos da The Odds API
+        stats: Stats por nome de time (get_team_stats)
+        live: Placares ao vivo por sigla (get_live_scores)
+        missing: Desfalques {sigla: [jogadores]}
+        config: Configuração (usa get_config se não fornecida)
+
+    Returns:
+        Lista de dicts com os campos de PICK_FIELDS, ordenada por edge
+        (stake_pct = % da banca no Kelly simultâneo do slate)
+    """
+    import pandas as pd
+    from .data_fetcher import summarize_slate
+
+    config = config or get_config()
+    live = live or {}
+    missing = missing or {}
+    if not games:
+        return []
+
+    team_stats = NBA_TEAMS.index(stats)
+    slate = summarize_slate(games)
+    picks = []
+
+    for game in games:
+        h, a = game['home_team'], game['away_team']
+        h_id, a_id = NBA_TEAMS.resolve(h), NBA_TEAMS.resolve(a)
+        s_h, s_a = team_stats.get(h_id), team_stats.get(a_id)
+        if s_h is None or s_a is None:
+            print(f"[WARN] Sem stats para {a} @ {h}", file=sys.stderr)
+            continue
+
+        penalty_h, penalty_a = star_penalty(h_id, missing), star_penalty(a_id, missing)
+        linfo = live.get(h_id) or {}
+        base = {
+            'event_id': game.get('id'),
+            'commence_time': game.get('commence_time'),
+            'away': a,
+            'home': h,
+            'penalty_home': penalty_h,
+            'penalty_away': penalty_a,
+            'live': bool(linfo.get('live', False))
+        }
+
+        def add_pick(market: str, pick: str, row, fair: float, edge: float) -> None:
+            picks.append(dict(
+                base,
+                market=market,
+                pick=pick,
+                line=float(row['best_point']),
+                price=float(row['best_price']),
+                book=row['best_book'],
+                fair=round(fair, 2),
+                edge=round(edge, 2),
+                prob=round(edge_probability(edge, market), 4),
+                stake_units=kelly_stake(edge, float(row['best_price']), config.kelly_fraction, market=market)
+            ))
+
+        # --- SPREAD ---
+        fair = calculate_fair_spread(
+            s_h['net_rtg'] - penalty_h, s_a['net_rtg'] - penalty_a, config.home_advantage
+        )
+        try:
+            q_h = slate.loc[(game['id'], 'spreads', 'home')]
+            q_a = slate.loc[(game['id'], 'spreads', 'away')]
+        except KeyError:
+            q_h = q_a = None
+        if q_h is not None and pd.notna(q_h['best_point']) and pd.notna(q_a['best_point']):
+            edge_h = q_h['best_point'] - fair
+            edge_a = q_a['best_point'] + fair
+            if max(edge_h, edge_a) >= config.min_edge_spread:
+                if edge_h >= edge_a:
+                    add_pick('spreads', h, q_h, fair, edge_h)
+                else:
+                    add_pick('spreads', a, q_a, -fair, edge_a)
+
+        # --- TOTAL ---
+        fair_total = calculate_fair_total(
+            s_h['pace'], s_a['pace'], s_h['off_rtg'], s_a['off_rtg'], s_h['def_rtg'], s_a['def_rtg']
+        )
+        try:
+            q_o = slate.loc[(game['id'], 'totals', 'over')]
+            q_u = slate.loc[(game['id'], 'totals', 'under')]
+        except KeyError:
+            continue
+        if pd.isna(q_o['best_point']) or pd.isna(q_u['best_point']):
+            continue
+        edge_o = fair_total - q_o['best_point']
+        edge_u = q_u['best_point'] - fair_total
+        if max(edge_o, edge_u) >= config.min_edge_total:
+            if edge_o >= edge_u:
+                add_pick('totals', 'Over', q_o, fair_total, edge_o)
+            else:
+                add_pick('totals', 'Under', q_u, fair_total, edge_u)
+
+    # Kelly simultâneo: stakes conjuntas (correlação de mesmo jogo/time, exposição limitada)
+    from .portfolio import Bet, optimize_stakes
+
+    bets = [Bet(key=str(i), prob=p['prob'], odds=p['price'], game=p['event_id'] or '',
+                side=p['pick'] if p['market'] == 'spreads' else '') for i, p in enumerate(picks)]
+    stakes = optimize_stakes(bets, fraction=config.kelly_fraction, max_bet=config.max_bet_fraction,
+                             max_exposure=config.max_exposure).stakes
+    for p, stake in zip(picks, stakes):
+        p['stake_pct'] = round(float(stake) * 100, 2)
+
+    return sorted(picks, key=lambda p: p['edge'], reverse=True)
+
+
+def _load_offline(season: str):
+    """Odds do cache local + último snapshot de stats em disco; sem rede."""
+    from .data_fetcher import load_cached_odds
+    from .team_stats_snapshots import SnapshotArchive
+    from .team_stats_store import get_team_stats_store
+
+    games = load_cached_odds()
+    df = SnapshotArchive(season).latest()
+    if df is None or df.empty:
+        print("[WARN] Nenhum snapshot de stats em disco", file=sys.stderr)
+        return games, {}, {}
+    store = get_team_stats_store(season)
+    store.set_frame(df)
+    return games, store.by_name(), {}
+
+
+def _load_online(season: str):
+    from .data_fetcher import get_odds, get_team_stats, get_live_scores
+
+    return get_odds(), get_team_stats(season), get_live_scores()
+
+
+def write_picks(picks: List[Dict], fmt: str, stream) -> None:
+    """Grava os picks no stream em 'json' ou 'csv'."""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=PICK_FIELDS)
+        writer.writeheader()
+        writer.writerows(picks)
+    else:
+        json.dump({
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'n_picks': len(picks),
+            'picks': picks
+        }, stream, ensure_ascii=False, indent=2, default=str)
+        stream.write('\n')
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Ponto de entrada da linha de comando.
+
+    Returns:
+        0 em sucesso, 1 se não houver odds (API fora e sem cache)
+    """
+    parser = argparse.ArgumentParser(prog='python -m core.scan', description='Scanner de valor do slate NBA')
+    parser.add_argument('--offline', action='store_true', help='Usa apenas caches locais (odds e snapshot de stats)')
+    parser.add_argument('-o', '--output', help='Arquivo de saída (stdout se omitido)')
+    parser.add_argument('-f', '--format', choices=('json', 'csv'), default='json')
+    parser.add_argument('--season', help='Temporada (ex: 2024-25); usa config se omitido')
+    parser.add_argument('--out', action='append', default=[], metavar='TIME:JOGADOR',
+                        help='Desfalque (repetível), ex: --out "DEN:Nikola Jokic"')
+    args = parser.parse_args(argv)
+
+    # Logs de config/fetchers vão para stderr: stdout fica só com os picks
+    with contextlib.redirect_stdout(sys.stderr):
+        config = get_config()
+        season = args.season or config.nba_season
+        games, stats, live = _load_offline(season) if args.offline else _load_online(season)
+        if not games:
+            print("[ERROR] Nenhuma odd disponível")
+            return 1
+        picks = scan_picks(games, stats, live, _parse_missing(args.out), config)
+        print(f"[OK] {len(games)} jogos | {len(picks)} picks")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write_picks(picks, args.format, f)
+    else:
+        write_picks(picks, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Liquidação Automática
+Indexa as apostas pendentes de Spread/Total/ML por jogo e, quando o
+scoreboard marca o jogo como final (status 3), corrige todas as apostas
+afetadas numa passada vetorizada (push = Void), tocando só essas linhas
+
+Uso (worker/cron, mesmo caminho da página):
+    python -m core.settlement                 # liquida com o scoreboard de hoje
+    python -m core.settlement --dry-run       # só mostra o que seria liquidado
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backoffice import load_history, parse_bets, write_rows_from
+from .config import get_config
+from .tracing import span, traced
+
+# Mercados que o placar final resolve sozinho (props ficam para o manual)
+SETTLE_MARKETS = ('Spread', 'Total', 'ML')
+
+# Janela (dias) entre a data da aposta e a data do jogo final (calendário ET):
+# evita corrigir uma pendente antiga com o placar de outro confronto entre os
+# mesmos times. -1 aceita a aposta registrada num fuso à frente do ET (a data
+# local já virou, a rodada ainda não)
+MIN_BET_AGE_DAYS = -1
+MAX_BET_AGE_DAYS = 1
+
+
+def final_scores(scoreboard: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Placares finais do scoreboard por jogo.
+
+    Args:
+        scoreboard: get_live_scores() (por sigla; precisa de status, home_id, away_id)
+
+    Returns:
+        {'AWAY@HOME': {'home': pontos, 'away': pontos, 'date': 'YYYY-MM-DD'}}
+    """
+    finals = {}
+    for info in scoreboard.values():
+        if info.get('status') != 3 or not info.get('home_id') or not info.get('away_id'):
+            continue
+        finals[f"{info['away_id']}@{info['home_id']}"] = {
+            'home': float(info['s_home']), 'away': float(info['s_away']), 'date': info.get('date') or ''
+        }
+    return finals
+
+
+class PendingIndex:
+    """Rótulos das linhas pendentes liquidáveis por jogo ('AWAY@HOME')"""
+
+    def __init__(self, df: pd.DataFrame):
+        pending = df[(df['Resultado'] == 'Pendente') & df['Tipo'].isin(SETTLE_MARKETS)]
+        self.parsed = parse_bets(pending)
+        self.parsed = self.parsed[self.parsed['game'].notna() & self.parsed['side'].notna()]
+        self.by_game: Dict[str, pd.Index] = self.parsed.groupby('game').groups
+
+    def rows(self, games) -> pd.Index:
+        """Rótulos das pendentes dos jogos informados."""
+        hits = [self.by_game[g] for g in games if g in self.by_game]
+        return hits[0].append(hits[1:]) if hits else pd.Index([])
+
+
+def grade_bets(bets: pd.DataFrame, parsed: pd.DataFrame, finals: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Resultado e lucro de apostas de jogos finalizados (vetorizado).
+
+    Margem de cobertura: spread/ML do mandante = (casa - fora) + linha,
+    visitante = (fora - casa) + linha, over = total - linha, under = linha - total.
+    > 0 Green, < 0 Red, = 0 Void (push).
+
+    Args:
+        bets: Linhas do histórico (Odd, Valor, Data)
+        parsed: parse_bets das mesmas linhas
+        finals: final_scores() (date = dia do jogo no calendário ET)
+
+    Returns:
+        DataFrame no índice de `bets` com Resultado e Lucro (linhas fora da
+        janela de data ficam de fora)
+    """
+    scores = pd.DataFrame.from_dict(finals, orient='index')
+    home = parsed['game'].map(scores['home']).to_numpy(dtype=float)
+    away = parsed['game'].map(scores['away']).to_numpy(dtype=float)
+    side = parsed['side'].to_numpy()
+    line = parsed['line'].fillna(0.0).to_numpy(dtype=float)   # ML = linha 0
+
+    total = home + away
+    cover = np.select(
+        [side == 'home', side == 'away', side == 'over', side == 'under'],
+        [home - away + line, away - home + line, total - line, line - total],
+        np.nan
+    )
+
+    valor = pd.to_numeric(bets['Valor'], errors='coerce').fillna(0.0).to_numpy()
+    odd = pd.to_numeric(bets['Odd'], errors='coerce').fillna(1.0).to_numpy()
+    out = pd.DataFrame({
+        'Resultado': np.select([cover > 0, cover < 0], ['Green', 'Red'], 'Void'),
+        'Lucro': np.select([cover > 0, cover < 0], [valor * (odd - 1), -valor], 0.0).round(2)
+    }, index=bets.index)
+
+    game_date = pd.to_datetime(parsed['game'].map(scores['date']), errors='coerce')
+    bet_date = pd.to_datetime(parsed['day'], errors='coerce')
+    age = (game_date - bet_date).dt.days
+    valid = ~np.isnan(cover) & (game_date.isna() | age.between(MIN_BET_AGE_DAYS, MAX_BET_AGE_DAYS)).to_numpy()
+    return out[valid]
+
+
+@traced('ledger.settle')
+def settle_history(df: pd.DataFrame, finals: Dict[str, Dict],
+                   index: Optional[PendingIndex] = None) -> pd.DataFrame:
+    """
+    Liquida no lugar as pendentes de `df` cujos jogos estão em `finals`.
+
+    Args:
+        df: Histórico completo (alterado só nas linhas liquidadas)
+        finals: final_scores()
+        index: PendingIndex já construído para `df` (opcional)
+
+    Returns:
+        Linhas liquidadas (já com Resultado/Lucro novos)
+    """
+    index = index or PendingIndex(df)
+    rows = index.rows(finals)
+    if rows.empty:
+        return df.iloc[0:0]
+    graded = grade_bets(df.loc[rows], index.parsed.loc[rows], finals)
+    df.loc[graded.index, ['Resultado', 'Lucro']] = graded[['Resultado', 'Lucro']]
+    return df.loc[graded.index]
+
+
+def settle(filepath: Optional[str] = None, scoreboard: Optional[Dict[str, Dict]] = None,
+           dry_run: bool = False) -> pd.DataFrame:
+    """
+    Liquida o histórico em disco com os placares finais (página e worker).
+
+    Args:
+        filepath: CSV do histórico (usa config se não fornecido)
+        scoreboard: get_live_scores() (busca o de hoje se não fornecido)
+        dry_run: Não grava nada
+
+    Returns:
+        Linhas liquidadas
+    """
+    from . import clv, exposure
+
+    filepath = filepath or get_config().bets_history_file
+    if scoreboard is None:
+        from .data_fetcher import get_live_scores
+        scoreboard = get_live_scores()
+
+    finals = final_scores(scoreboard)
+    if not finals:
+        return pd.DataFrame()
+
+    df = load_history(filepath)
+    settled = settle_history(df, finals)
+    if settled.empty or dry_run:
+        return settled
+
+    start = int(df.index.get_indexer(settled.index).min())
+    with span('ledger.write', rows=len(df) - start):
+        write_rows_from(df, filepath, start)
+    exposure.on_bets_settled(filepath, settled)
+    clv.on_bets_settled(filepath, settled, df)
+    print(f"[OK] {len(settled)} apostas liquidadas ({len(finals)} jogos finais)")
+    return settled
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Liquida apostas pendentes com os placares finais')
+    parser.add_argument('--history', help='CSV do histórico (padrão BETS_HISTORY_FILE)')
+    parser.add_argument('--dry-run', action='store_true', help='Só mostra, não grava')
+    args = parser.parse_args(argv)
+
+    settled = settle(args.history, dry_run=args.dry_run)
+    if settled.empty:
+        print("Nenhuma aposta a liquidar")
+        return 0
+    print(settled[['Data', 'Jogo', 'Aposta', 'Resultado', 'Lucro']].to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Modelo de Slate (sessão)
+Guarda, por sessão, os ratings base e as cotações de spread de cada jogo do
+slate; a linha justa é memoizada por (jogo, conjunto de desfalques), então
+marcar um desfalque recalcula só aquele jogo. As linhas ao vivo de todos os
+jogos em andamento saem de uma passada vetorizada por placar novo
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .calibration import edge_probability
+from .odds_engine import calculate_fair_spread, calculate_fair_total
+from .star_impact import get_team_stars
+from .teams import NBA_TEAMS
+from .tracing import span
+
+# Idade máxima (s) da cotação para precificar edge ao vivo: poll de odds (ttl 300 s) + folga
+LIVE_QUOTE_MAX_AGE = 6 * 60
+
+
+@dataclass(frozen=True)
+class GameBase:
+    """Dados fixos de um jogo enquanto odds/stats não mudam"""
+    game_id: str
+    home: str
+    away: str
+    home_abbr: str
+    away_abbr: str
+    commence_time: str
+    home_net: float
+    away_net: float
+    market: float                      # Consenso do spread (perspectiva do mandante)
+    home_quote: Tuple[float, float, str]  # (melhor linha, odd, casa) do mandante
+    away_quote: Tuple[float, float, str]
+    fair_total: float = float('nan')   # Total justo pré-jogo (Pace × Efficiency)
+    quote_time: float = float('nan')   # Epoch do update mais antigo entre as duas melhores cotações de spread
+    home_stars: Dict[str, float] = field(default_factory=dict, hash=False, compare=False)
+    away_stars: Dict[str, float] = field(default_factory=dict, hash=False, compare=False)
+
+
+@dataclass(frozen=True)
+class FairLine:
+    """Linha justa de um jogo para um conjunto de desfalques"""
+    fair: float
+    market: float
+    edge_home: float
+    edge_away: float
+    penalty_home: float
+    penalty_away: float
+    pick: Optional[str] = None
+    line: float = 0.0
+    price: float = 0.0
+    book: str = ''
+    units: float = 0.0
+    prob: float = 0.5                  # Probabilidade calibrada do pick cobrir
+
+    @property
+    def edge(self) -> float:
+        return max(self.edge_home, self.edge_away)
+
+
+def odds_fingerprint(odds: List[Dict]) -> Tuple:
+    """Identifica um snapshot de odds (jogos + último update de cada casa)."""
+    return tuple(
+        (g.get('id'), tuple(b.get('last_update', '') for b in g.get('bookmakers', [])))
+        for g in odds
+    )
+
+
+def _epoch(iso: str) -> float:
+    """ISO 8601 da The Odds API ('2025-01-15T00:00:00Z') em epoch; NaN se vazio/inválido."""
+    try:
+        return datetime.fromisoformat(iso.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return float('nan')
+
+
+def spread_update_times(game: Dict) -> Dict[str, float]:
+    """Epoch do último update do mercado de spread de cada casa do jogo."""
+    times = {}
+    for book in game.get('bookmakers', []):
+        market = next((m for m in book.get('markets', []) if m.get('key') == 'spreads'), {})
+        times[book.get('key')] = _epoch(market.get('last_update') or book.get('last_update') or '')
+    return times
+
+
+def stats_fingerprint(stats: Dict[str, Dict]) -> Tuple:
+    """Identifica um snapshot de stats (Net Rating por sigla)."""
+    return tuple(sorted((k, s.get('net_rtg', 0.0)) for k, s in stats.items()))
+
+
+class SlateModel:
+    """
+    Modelo do slate mantido no session_state.
+
+    Construído uma vez por snapshot de odds/stats; `line()` memoiza a linha
+    justa por (game_id, frozenset de jogadores fora).
+    """
+
+    def __init__(
+        self,
+        odds: List[Dict],
+        stats: Dict[str, Dict],
+        home_advantage: float = 2.5,
+        min_edge: float = 1.5
+    ):
+        """
+        Args:
+            odds: Jogos da The Odds API
+            stats: Stats por sigla (NBA_TEAMS.index)
+            home_advantage: Vantagem de casa em pontos
+            min_edge: Edge mínimo (pontos) para marcar valor
+        """
+        from .data_fetcher import summarize_slate
+
+        self.home_advantage = home_advantage
+        self.min_edge = min_edge
+        self.fingerprint = (odds_fingerprint(odds), stats_fingerprint(stats))
+        self.odds = odds
+        self.summary = summarize_slate(odds)
+        self.games: Dict[str, GameBase] = {}
+        self._lines: Dict[Tuple[str, FrozenSet[str]], FairLine] = {}
+        self._scan = None
+        self._selected: Dict[str, FairLine] = {}   # Última linha pedida por jogo (desfalques atuais)
+        self._live_key: Optional[Tuple] = None
+        self._live: Dict[str, Dict[str, float]] = {}
+        self._live_picks: Dict[str, Optional[FairLine]] = {}   # Jogos em andamento: linha in-play (None = sem cotação)
+        self._portfolio_key: Optional[Tuple] = None
+        self._portfolio: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+        for game in odds:
+            base = self._game_base(game, stats)
+            if base is not None:
+                self.games[base.game_id] = base
+
+    def _game_base(self, game: Dict, stats: Dict[str, Dict]) -> Optional[GameBase]:
+        """Ratings e cotações do jogo; None se faltar mercado de spread."""
+        import pandas as pd
+
+        h, a = game['home_team'], game['away_team']
+        h_abbr, a_abbr = NBA_TEAMS.resolve(h) or "UNK", NBA_TEAMS.resolve(a) or "UNK"
+        try:
+            q_h = self.summary.loc[(game['id'], 'spreads', 'home')]
+            q_a = self.summary.loc[(game['id'], 'spreads', 'away')]
+        except KeyError:
+            return None
+        market = q_h['consensus_point']
+        if pd.isna(market) or market == 0.0:
+            return None
+        times = spread_update_times(game)
+        quote_time = min(times.get(q_h['best_book'], math.nan), times.get(q_a['best_book'], math.nan))
+
+        s_h, s_a = stats.get(h_abbr, {}), stats.get(a_abbr, {})
+        fair_total = float('nan')
+        if all(k in s for s in (s_h, s_a) for k in ('pace', 'off_rtg', 'def_rtg')):
+            fair_total = calculate_fair_total(s_h['pace'], s_a['pace'], s_h['off_rtg'], s_a['off_rtg'],
+                                              s_h['def_rtg'], s_a['def_rtg'])
+
+        return GameBase(
+            game_id=game['id'], home=h, away=a, home_abbr=h_abbr, away_abbr=a_abbr,
+            commence_time=game.get('commence_time', ''),
+            home_net=stats.get(h_abbr, {}).get('net_rtg', 0.0),
+            away_net=stats.get(a_abbr, {}).get('net_rtg', 0.0),
+            market=float(market),
+            home_quote=(float(q_h['best_point']), float(q_h['best_price']), q_h['best_book']),
+            away_quote=(float(q_a['best_point']), float(q_a['best_price']), q_a['best_book']),
+            fair_total=fair_total,
+            quote_time=quote_time,
+            home_stars=get_team_stars(h_abbr), away_stars=get_team_stars(a_abbr)
+        )
+
+    def matches(self, odds: List[Dict], stats: Dict[str, Dict]) -> bool:
+        """Se o modelo ainda corresponde a este snapshot de odds/stats."""
+        return self.fingerprint == (odds_fingerprint(odds), stats_fingerprint(stats))
+
+    def arbitrage(self) -> Dict:
+        """Scan de surebets/middles do slate (calculado uma vez por snapshot)."""
+        if self._scan is None:
+            from .arbitrage import scan_slate
+            self._scan = scan_slate(self.odds)
+        return self._scan
+
+    def line(self, game_id: str, missing: FrozenSet[str] = frozenset()) -> Optional[FairLine]:
+        """
+        Linha justa e edge do jogo com os desfalques informados (memoizada).
+
+        Args:
+            game_id: ID do jogo
+            missing: Jogadores fora (nomes de get_team_stars de qualquer dos times)
+
+        Returns:
+            FairLine ou None se o jogo não tem mercado de spread
+        """
+        key = (game_id, missing)
+        cached = self._lines.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._selected[game_id] = cached
+            return cached
+        base = self.games.get(game_id)
+        if base is None:
+            return None
+
+        self.misses += 1
+        with span('model.fair_spread', game=f"{base.away_abbr}@{base.home_abbr}"):
+            result = self._compute(base, missing)
+        self._lines[key] = result
+        self._selected[game_id] = result
+        return result
+
+    def _compute(self, base: GameBase, missing: FrozenSet[str]) -> FairLine:
+        penalty_h = sum(imp for p, imp in base.home_stars.items() if p in missing)
+        penalty_a = sum(imp for p, imp in base.away_stars.items() if p in missing)
+
+        # NetRtg Ajustado = NetRtg Base - Penalidade por Lesão
+        fair = calculate_fair_spread(base.home_net - penalty_h, base.away_net - penalty_a, self.home_advantage)
+        return self._price(base, fair, penalty_h, penalty_a)
+
+    def _price(self, base: GameBase, fair: float, penalty_h: float = 0.0, penalty_a: float = 0.0) -> FairLine:
+        """Edge de cada lado contra a melhor linha do mercado e o pick, se houver valor."""
+        edge_h = base.home_quote[0] - fair   # Ex: linha -3 vs justo -5 = 2 pts a favor da casa
+        edge_a = base.away_quote[0] + fair   # Ex: linha +6 vs justo +5 (= -fair) = 1 pt a favor do visitante
+        line = FairLine(fair=fair, market=base.market, edge_home=edge_h, edge_away=edge_a,
+                        penalty_home=penalty_h, penalty_away=penalty_a)
+        if line.edge < self.min_edge:
+            return line
+
+        pick, (point, price, book) = (base.home, base.home_quote) if edge_h >= edge_a else (base.away, base.away_quote)
+        return FairLine(fair=fair, market=base.market, edge_home=edge_h, edge_away=edge_a,
+                        penalty_home=penalty_h, penalty_away=penalty_a,
+                        pick=pick, line=point, price=price, book=book,
+                        units=1.5 if line.edge > 3 else 0.75, prob=edge_probability(line.edge))
+
+    def live(self, scoreboard: Dict[str, Dict], now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Linhas ao vivo dos jogos em andamento (memoizadas por placar).
+
+        Todos os jogos ao vivo saem de uma única chamada vetorizada; os cards
+        ao vivo do mesmo poll reaproveitam o resultado. Também reprecifica o
+        pick in-play de cada um (entra no `portfolio` no lugar do pré-jogo).
+
+        Args:
+            scoreboard: get_live_scores() (por sigla)
+            now: Epoch atual (frescor das cotações; padrão time.time())
+
+        Returns:
+            {game_id: {'home_win', 'fair_spread', 'fair_total', 'remaining', 'total_sigma'}}
+        """
+        from .live_model import slate_live_lines
+
+        rows = []
+        for gid, base in self.games.items():
+            selected = self._selected.get(gid) or self.line(gid)
+            rows.append({'game_id': gid, 'home_abbr': base.home_abbr,
+                         'fair_spread': selected.fair, 'fair_total': base.fair_total})
+        key = tuple(
+            (r['game_id'], r['fair_spread'], tuple(sorted((scoreboard.get(r['home_abbr']) or {}).items())))
+            for r in rows
+        )
+        if key != self._live_key:
+            with span('model.live_lines', games=len(rows)):
+                self._live = slate_live_lines(scoreboard, rows)
+            self._live_key = key
+        self._live_picks = {gid: self.live_line(gid, lines, now) for gid, lines in self._live.items()}
+        return self._live
+
+    def quotes_live(self, game_id: str, now: Optional[float] = None) -> bool:
+        """
+        Se as melhores cotações de spread do jogo são in-play: atualizadas depois
+        do tip-off e há no máximo LIVE_QUOTE_MAX_AGE segundos.
+        """
+        base = self.games.get(game_id)
+        if base is None or math.isnan(base.quote_time):
+            return False
+        now = time.time() if now is None else now
+        return base.quote_time >= _epoch(base.commence_time) and now - base.quote_time <= LIVE_QUOTE_MAX_AGE
+
+    def live_line(self, game_id: str, lines: Dict[str, float], now: Optional[float] = None) -> Optional[FairLine]:
+        """
+        FairLine com o spread justo ao vivo (edge contra as cotações in-play).
+
+        Returns:
+            None se o snapshot de odds ainda for pré-jogo (ou velho): a linha
+            que ele cota não existe mais e não há edge a mostrar nem registrar
+        """
+        base = self.games.get(game_id)
+        if base is None or not self.quotes_live(game_id, now):
+            return None
+        selected = self._selected.get(game_id)
+        penalty_h = selected.penalty_home if selected else 0.0
+        penalty_a = selected.penalty_away if selected else 0.0
+        return self._price(base, lines['fair_spread'], penalty_h, penalty_a)
+
+    def portfolio(self, fraction: float = 0.25, max_bet: float = 0.05, max_exposure: float = 0.25) -> Dict[str, float]:
+        """
+        Stakes do Kelly simultâneo para os picks atuais do slate (memoizado).
+
+        Jogos em andamento (última chamada de `live`) entram com o pick
+        in-play, ou ficam de fora se não houver cotação in-play recente.
+
+        Args:
+            fraction: Fração de Kelly
+            max_bet: Stake máxima por aposta (fração da banca)
+            max_exposure: Exposição total máxima (fração da banca)
+
+        Returns:
+            {game_id: fração da banca}
+        """
+        from .portfolio import Bet, optimize_stakes
+
+        current = {gid: self._live_picks.get(gid) if gid in self._live else fl for gid, fl in self._selected.items()}
+        picks = [(gid, fl) for gid, fl in current.items() if fl is not None and fl.pick is not None]
+        key = (tuple((gid, fl.pick, fl.line, fl.price, fl.prob) for gid, fl in picks), fraction, max_bet, max_exposure)
+        if key != self._portfolio_key:
+            bets = [Bet(key=gid, prob=fl.prob, odds=fl.price, game=gid, side=fl.pick) for gid, fl in picks]
+            with span('model.portfolio', bets=len(bets)):
+                result = optimize_stakes(bets, fraction=fraction, max_bet=max_bet, max_exposure=max_exposure)
+            self._portfolio = result.as_dict()
+            self._portfolio_key = key
+        return self._portfolio
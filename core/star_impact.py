@@ -1,83 +1,311 @@
-# Dicionario de Impacto de Estrelas no Spread (Estimativa)
-# Valores indicam quanto o time PIORA se o jogador nÃ£o jogar.
-
-STARS_IMPACT = {
-    # Boston Celtics
-    "BOS": {
-        "Jayson Tatum": 4.5,
-        "Jaylen Brown": 2.5,
-        "Kristaps Porzingis": 2.0
-    },
-    # Denver Nuggets
-    "DEN": {
-        "Nikola Jokic": 7.5,
-        "Jamal Murray": 3.0,
-        "Aaron Gordon": 1.5
-    },
-    # Milwaukee Bucks
-    "MIL": {
-        "Giannis Antetokounmpo": 6.5,
-        "Damian Lillard": 3.5,
-        "Khris Middleton": 1.5
-    },
-    # Philadelphia 76ers
-    "PHI": {
-        "Joel Embiid": 7.0,
-        "Tyrese Maxey": 3.0,
-        "Paul George": 2.5
-    },
-    # Phoenix Suns
-    "PHX": {
-        "Kevin Durant": 4.0,
-        "Devin Booker": 3.5,
-        "Bradley Beal": 2.0
-    },
-    # LA Lakers
-    "LAL": {
-        "LeBron James": 4.5,
-        "Anthony Davis": 5.0,
-        "Austin Reaves": 1.0
-    },
-    # Golden State Warriors
-    "GSW": {
-        "Stephen Curry": 6.0,
-        "Draymond Green": 2.5
-    },
-    # Dallas Mavericks
-    "DAL": {
-        "Luka Doncic": 7.0,
-        "Kyrie Irving": 3.0
-    },
-    # Oklahoma City Thunder
-    "OKC": {
-        "S. Gilgeous-Alexander": 6.0,
-        "Chet Holmgren": 2.5,
-        "Jalen Williams": 2.0
-    },
-    # Minnesota Timberwolves
-    "MIN": {
-        "Anthony Edwards": 4.5,
-        "Rudy Gobert": 2.5,
-        "Karl-Anthony Towns": 3.0
-    },
-     # New York Knicks
-    "NYK": {
-        "Jalen Brunson": 5.0,
-        "Julius Randle": 2.5,
-        "OG Anunoby": 2.0
-    },
-     # Miami Heat
-    "MIA": {
-        "Jimmy Butler": 4.0,
-        "Bam Adebayo": 3.0
-    },
-     # LA Clippers
-    "LAC": {
-        "Kawhi Leonard": 4.5,
-        "James Harden": 3.0
-    }
-}
-
-def get_team_stars(team_abbr: str):
-    """Retorna o dicionario de estrelas para um time, ou vazio se nao encontrado."""
-    return STARS_IMPACT.get(team_abbr, {})
+"""
+Impacto de Estrelas (On/Off)
+Estima, para cada jogador de rotação dos 30 times, quanto o Net Rating do time
+piora sem ele (jogos fora vs jogos em quadra, encolhido para um prior de
+plus-minus), a partir dos gamelogs da liga; cacheado por temporada em disco
+com atualização incremental diária
+
+`get_team_stars` continua sendo um lookup: lê a tabela pronta (JSON) uma vez
+por processo. pandas/nba_api só entram em `estimate_impacts`/`update`.
+"""
+import json
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Diretório do cache (um subdiretório por temporada)
+IMPACT_DIR = "star_impact"
+
+# Rotação: minutos médios e jogos mínimos em quadra
+MIN_MINUTES = 20.0
+MIN_GAMES = 10
+
+# Encolhimento: jogos fora "equivalentes" ao prior (peso do on/off bruto = fora / (fora + K))
+SHRINK_GAMES = 10.0
+
+# Peso do prior de plus-minus em quadra (ruidoso, conta pela metade)
+PRIOR_WEIGHT = 0.5
+
+# Tabela final: impacto mínimo (pontos) e jogadores por time
+MIN_IMPACT = 0.5
+MAX_PER_TEAM = 4
+
+# Colunas guardadas dos gamelogs (LeagueGameLog T/P)
+TEAM_LOG_COLUMNS = ['TEAM_ABBREVIATION', 'GAME_ID', 'GAME_DATE', 'PLUS_MINUS']
+PLAYER_LOG_COLUMNS = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'GAME_ID', 'GAME_DATE', 'MIN', 'PLUS_MINUS']
+
+
+def estimate_impacts(team_log, player_log):
+    """
+    Impacto on/off de todos os jogadores da liga de uma vez (vetorizado).
+
+    Para cada (jogador, time), os jogos "fora" são os do time entre a primeira
+    aparição do jogador e o último jogo do time (ou a última aparição, se ele
+    saiu do time) em que ele não entrou em quadra.
+
+        bruto = margem média com ele - margem média sem ele
+        prior = PRIOR_WEIGHT × (on/48 - off/48 em quadra) × minutos/48
+        impacto = w × bruto + (1 - w) × prior,  w = fora / (fora + SHRINK_GAMES)
+
+    Args:
+        team_log: LeagueGameLog por time (TEAM_LOG_COLUMNS)
+        player_log: LeagueGameLog por jogador (PLAYER_LOG_COLUMNS)
+
+    Returns:
+        DataFrame por (PLAYER_ID, TEAM_ABBREVIATION) com PLAYER_NAME, n_on,
+        n_off, minutes, raw, prior, impact e current (time atual do jogador)
+    """
+    import numpy as np
+    import pandas as pd
+
+    tg = (team_log[TEAM_LOG_COLUMNS]
+          .drop_duplicates(['TEAM_ABBREVIATION', 'GAME_ID'])
+          .sort_values(['TEAM_ABBREVIATION', 'GAME_DATE', 'GAME_ID'], kind='stable')
+          .reset_index(drop=True))
+    margin = tg['PLUS_MINUS'].to_numpy(dtype=float)
+    by_team = tg.groupby('TEAM_ABBREVIATION', sort=False)
+    tg['idx'] = by_team.cumcount()
+    cum = by_team['PLUS_MINUS'].cumsum().to_numpy(dtype=float)
+    # Posição global = início do time no frame ordenado + índice do jogo no time
+    team_start = pd.Series(np.arange(len(tg))).groupby(tg['TEAM_ABBREVIATION']).min()
+    team_last = by_team['idx'].max()
+
+    pl = player_log[PLAYER_LOG_COLUMNS].merge(
+        tg[['TEAM_ABBREVIATION', 'GAME_ID', 'idx', 'PLUS_MINUS']].rename(columns={'PLUS_MINUS': 'TEAM_PM'}),
+        on=['TEAM_ABBREVIATION', 'GAME_ID']
+    )
+    pl['MIN'] = pd.to_numeric(pl['MIN'], errors='coerce').fillna(0.0)
+    pl = pl[pl['MIN'] > 0]
+
+    g = pl.groupby(['PLAYER_ID', 'TEAM_ABBREVIATION'], sort=False).agg(
+        PLAYER_NAME=('PLAYER_NAME', 'last'),
+        n_on=('GAME_ID', 'size'),
+        sum_on=('TEAM_PM', 'sum'),
+        pm=('PLUS_MINUS', 'sum'),
+        min_sum=('MIN', 'sum'),
+        first=('idx', 'min'),
+        last=('idx', 'max'),
+        last_date=('GAME_DATE', 'max')
+    ).reset_index()
+
+    # Time atual = o da aparição mais recente do jogador
+    latest = g.groupby('PLAYER_ID')['last_date'].transform('max')
+    g['current'] = g['last_date'] == latest
+
+    teams = g['TEAM_ABBREVIATION']
+    end = np.where(g['current'], teams.map(team_last).to_numpy(), g['last'].to_numpy()).astype(int)
+    start = teams.map(team_start).to_numpy().astype(int)
+    first = g['first'].to_numpy().astype(int)
+    sum_window = cum[start + end] - cum[start + first] + margin[start + first]
+
+    n_on = g['n_on'].to_numpy(dtype=float)
+    n_off = (end - first + 1) - n_on
+    sum_off = sum_window - g['sum_on'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw = np.where(n_off > 0, g['sum_on'].to_numpy() / n_on - sum_off / n_off, 0.0)
+        min_sum = g['min_sum'].to_numpy()
+        on48 = 48 * g['pm'].to_numpy() / min_sum
+        off_min = 48 * n_on - min_sum
+        off48 = np.where(off_min > 0, 48 * (g['sum_on'].to_numpy() - g['pm'].to_numpy()) / off_min, 0.0)
+    minutes = min_sum / n_on
+    prior = PRIOR_WEIGHT * (on48 - off48) * minutes / 48
+    w = n_off / (n_off + SHRINK_GAMES)
+
+    g['n_off'] = n_off.astype(int)
+    g['minutes'] = minutes
+    g['raw'] = raw
+    g['prior'] = prior
+    g['impact'] = w * raw + (1 - w) * prior
+    return g.drop(columns=['sum_on', 'pm', 'min_sum', 'first', 'last'])
+
+
+def impact_table(impacts, min_minutes: float = MIN_MINUTES, min_games: int = MIN_GAMES,
+                 min_impact: float = MIN_IMPACT, max_per_team: int = MAX_PER_TEAM) -> Dict[str, Dict[str, float]]:
+    """
+    Tabela {sigla: {jogador: impacto}} dos jogadores de rotação no time atual.
+
+    Args:
+        impacts: Saída de estimate_impacts
+
+    Returns:
+        Dict {sigla: {jogador: pontos que o time piora sem ele}} (maiores impactos primeiro)
+    """
+    rot = impacts[impacts['current'] & (impacts['minutes'] >= min_minutes)
+                  & (impacts['n_on'] >= min_games) & (impacts['impact'] >= min_impact)]
+    rot = rot.sort_values('impact', ascending=False).groupby('TEAM_ABBREVIATION').head(max_per_team)
+    table: Dict[str, Dict[str, float]] = {}
+    for team, name, value in zip(rot['TEAM_ABBREVIATION'], rot['PLAYER_NAME'], rot['impact']):
+        table.setdefault(team, {})[name] = round(float(value), 1)
+    return table
+
+
+class StarImpactCache:
+    """
+    Cache de uma temporada em `<root>/<season>/`: gamelogs (Parquet) e a
+    tabela de impactos (impacts.json).
+
+    `update()` busca só os jogos a partir da última data em disco e recalcula
+    a tabela da liga inteira (a conta vetorizada custa milissegundos).
+    """
+
+    def __init__(self, season: str, root: Union[str, Path] = IMPACT_DIR):
+        self.season = season
+        self.path = Path(root) / season
+
+    @property
+    def table_file(self) -> Path:
+        return self.path / "impacts.json"
+
+    def load_table(self) -> Dict:
+        """Lê a tabela pronta ({'updated', 'through', 'teams'}) ou {} se não existir."""
+        if not self.table_file.exists():
+            return {}
+        try:
+            with open(self.table_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[WARN] Erro ao ler tabela de impacto: {e}")
+            return {}
+
+    def _read_log(self, kind: str):
+        import pandas as pd
+
+        f = self.path / f"{kind}_log.parquet"
+        return pd.read_parquet(f) if f.exists() else None
+
+    def _fetch(self, kind: str, date_from: Optional[date]):
+        """LeagueGameLog da temporada ('T' = times, 'P' = jogadores), a partir de date_from."""
+        from nba_api.stats.endpoints import leaguegamelog
+
+        from .config import configure_nba_api
+
+        configure_nba_api()
+        df = leaguegamelog.LeagueGameLog(
+            season=self.season,
+            player_or_team_abbreviation=kind,
+            date_from_nullable=date_from.strftime('%m/%d/%Y') if date_from else ''
+        ).get_data_frames()[0]
+        print(f"[OK] LeagueGameLog {kind} | {len(df)} linhas desde {date_from or 'o início'}")
+        return df
+
+    def update(self, full: bool = False, today: Optional[date] = None) -> Dict:
+        """
+        Atualização incremental: busca os jogos novos, grava os gamelogs e a tabela.
+
+        Args:
+            full: Rebaixa a temporada inteira (ignora o que está em disco)
+            today: Data de referência (hoje se não fornecida)
+
+        Returns:
+            Tabela gravada ({'updated', 'through', 'teams'})
+        """
+        import pandas as pd
+
+        today = today or date.today()
+        current = self.load_table()
+        if not full and current.get('updated') == today.isoformat():
+            return current
+
+        logs = {}
+        for kind, key, columns in (('T', 'team', TEAM_LOG_COLUMNS), ('P', 'player', PLAYER_LOG_COLUMNS)):
+            old = None if full else self._read_log(key)
+            since = None
+            if old is not None and not old.empty:
+                # Refaz o último dia em disco (pode ter sido gravado com jogos em andamento)
+                since = datetime.strptime(str(old['GAME_DATE'].max())[:10], '%Y-%m-%d').date()
+            new = self._fetch(kind, since)[columns]
+            if old is not None and since is not None:
+                old = old[old['GAME_DATE'].astype(str).str[:10] < since.isoformat()]
+                new = pd.concat([old, new], ignore_index=True)
+            logs[key] = new.reset_index(drop=True)
+
+        impacts = estimate_impacts(logs['team'], logs['player'])
+        table = {
+            'updated': today.isoformat(),
+            'through': str(logs['team']['GAME_DATE'].max())[:10] if not logs['team'].empty else None,
+            'teams': impact_table(impacts)
+        }
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        for key, df in logs.items():
+            df.to_parquet(self.path / f"{key}_log.parquet", index=False)
+        with open(self.table_file, 'w', encoding='utf-8') as f:
+            json.dump(table, f, ensure_ascii=False, indent=1)
+        print(f"[OK] Impacto de estrelas {self.season}: {len(table['teams'])} times até {table['through']}")
+        return table
+
+
+_tables: Dict[str, Dict[str, Dict[str, float]]] = {}
+_lock = threading.Lock()
+
+
+def _season(season: Optional[str]) -> str:
+    if season:
+        return season
+    from .config import get_config
+    return get_config().nba_season
+
+
+def refresh_star_impact(season: Optional[str] = None, full: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Atualiza o cache da temporada (incremental, no máximo uma vez por dia) e
+    recarrega a tabela em memória. Falhas de rede mantêm a tabela anterior.
+
+    Returns:
+        Tabela {sigla: {jogador: impacto}}
+    """
+    season = _season(season)
+    cache = StarImpactCache(season)
+    try:
+        teams = cache.update(full=full).get('teams', {})
+    except Exception as e:
+        print(f"[WARN] Erro ao atualizar impacto de estrelas: {e}")
+        teams = cache.load_table().get('teams', {})
+    with _lock:
+        _tables[season] = teams
+    return teams
+
+
+def load_star_impact(season: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Tabela da temporada em memória (lida do disco no primeiro acesso, sem rede)."""
+    season = _season(season)
+    table = _tables.get(season)
+    if table is None:
+        with _lock:
+            table = _tables.get(season)
+            if table is None:
+                table = _tables[season] = StarImpactCache(season).load_table().get('teams', {})
+                if not table:
+                    print("[WARN] Sem tabela de impacto em disco; ajuste de desfalques desligado até o primeiro update")
+    return table
+
+
+def get_team_stars(team_abbr: str, season: Optional[str] = None) -> Dict[str, float]:
+    """
+    Retorna o dicionario de estrelas para um time, ou vazio se nao encontrado.
+
+    Lookup na tabela estimada da temporada. Um time sem jogador acima de
+    MIN_IMPACT, ou qualquer time enquanto não houver tabela (sem cache em
+    disco e sem rede), fica sem estrelas.
+    """
+    return load_star_impact(season).get(team_abbr, {})
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Atualiza a tabela de impacto on/off (rodar 1x por noite)')
+    parser.add_argument('--season', help='Temporada (ex: 2024-25); padrão NBA_SEASON')
+    parser.add_argument('--full', action='store_true', help='Rebaixa a temporada inteira')
+    args = parser.parse_args(argv)
+
+    teams = refresh_star_impact(args.season, args.full)
+    for team in sorted(teams):
+        print(f"{team}: " + ", ".join(f"{p} {v:+.1f}" for p, v in teams[team].items()))
+    return 0 if teams else 1
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
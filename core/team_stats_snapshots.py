@@ -0,0 +1,138 @@
+"""
+Arquivo de Snapshots de Estatísticas de Times
+Guarda um snapshot diário do frame de stats em Parquet (colunar, compacto),
+permite consulta "as of date" em O(1) e aquece o cache no boot
+"""
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Diretório padrão do arquivo (um subdiretório por temporada)
+SNAPSHOT_DIR = "team_stats_snapshots"
+
+DateLike = Union[str, date, datetime]
+
+
+def _to_date(day: DateLike) -> date:
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return datetime.strptime(str(day)[:10], "%Y-%m-%d").date()
+
+
+class SnapshotArchive:
+    """
+    Snapshots diários `<root>/<season>/<YYYY-MM-DD>.parquet`.
+
+    O índice é um array denso com uma posição por dia entre o primeiro e o
+    último snapshot, apontando para o snapshot vigente naquele dia; assim a
+    consulta "as of" é um acesso direto ao array, sem busca.
+    """
+
+    def __init__(self, season: str, root: Union[str, Path] = SNAPSHOT_DIR):
+        self.season = season
+        self.path = Path(root) / season
+        self._dates: List[date] = []
+        self._lookup: np.ndarray = np.empty(0, dtype=np.int32)
+        self._frames: Dict[date, pd.DataFrame] = {}
+        self._indexed = False
+
+    def _reindex(self) -> None:
+        """Relê a lista de snapshots do disco e reconstrói o índice denso."""
+        dates = []
+        if self.path.exists():
+            for f in self.path.glob("*.parquet"):
+                try:
+                    dates.append(_to_date(f.stem))
+                except ValueError:
+                    continue
+        self._dates = sorted(dates)
+
+        if self._dates:
+            first = self._dates[0]
+            span = (self._dates[-1] - first).days + 1
+            marks = np.full(span, -1, dtype=np.int32)
+            for i, d in enumerate(self._dates):
+                marks[(d - first).days] = i
+            # Propaga o último snapshot disponível para os dias sem snapshot
+            self._lookup = np.maximum.accumulate(marks)
+        else:
+            self._lookup = np.empty(0, dtype=np.int32)
+        self._indexed = True
+
+    @property
+    def dates(self) -> List[date]:
+        if not self._indexed:
+            self._reindex()
+        return self._dates
+
+    def save(self, df: pd.DataFrame, day: Optional[DateLike] = None) -> Optional[Path]:
+        """
+        Grava o snapshot do dia (sobrescreve o do mesmo dia).
+
+        Args:
+            df: Frame unificado de stats (índice TEAM_ID)
+            day: Data do snapshot (hoje se não fornecida)
+
+        Returns:
+            Caminho gravado ou None em caso de erro
+        """
+        day = _to_date(day or datetime.now())
+        target = self.path / f"{day.isoformat()}.parquet"
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            df.to_parquet(tmp, compression="zstd")
+            os.replace(tmp, target)
+        except Exception as e:
+            print(f"[WARN] Erro ao salvar snapshot de stats: {e}")
+            return None
+
+        self._frames[day] = df
+        self._reindex()
+        return target
+
+    def _load(self, day: date) -> pd.DataFrame:
+        if day not in self._frames:
+            self._frames[day] = pd.read_parquet(self.path / f"{day.isoformat()}.parquet")
+        return self._frames[day]
+
+    def as_of(self, day: DateLike, inclusive: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Retorna o snapshot vigente em uma data.
+
+        Para backtests sem vazamento de jogos do próprio dia, use inclusive=False
+        (considera apenas snapshots de dias anteriores).
+
+        Args:
+            day: Data de referência
+            inclusive: Se aceita o snapshot do próprio dia
+
+        Returns:
+            Frame do snapshot ou None se não houver snapshot até a data
+        """
+        dates = self.dates
+        if not dates:
+            return None
+
+        day = _to_date(day)
+        offset = (day - dates[0]).days - (0 if inclusive else 1)
+        if offset < 0:
+            return None
+        if offset >= len(self._lookup):
+            return self._load(dates[-1])
+        return self._load(dates[self._lookup[offset]])
+
+    def latest(self) -> Optional[pd.DataFrame]:
+        """Snapshot mais recente, ou None se o arquivo estiver vazio."""
+        dates = self.dates
+        return self._load(dates[-1]) if dates else None
+
+    def latest_date(self) -> Optional[date]:
+        dates = self.dates
+        return dates[-1] if dates else None
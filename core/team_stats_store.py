@@ -0,0 +1,248 @@
+"""
+Store Compartilhado de Estatísticas de Times
+Busca cada measure type do LeagueDashTeamStats no máximo uma vez por janela
+de atualização e mantém as visões Base e Advanced em um único DataFrame por TEAM_ID
+"""
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+
+from .config import configure_nba_api, get_config
+from .team_stats_snapshots import SnapshotArchive
+from .teams import NBA_TEAMS
+from .tracing import mark_miss, traced
+
+# Measure types mantidos no frame unificado
+DEFAULT_MEASURES = ('Base', 'Advanced')
+
+# Janela padrão de atualização (segundos)
+DEFAULT_TTL = 6 * 60 * 60
+
+# Snapshot em disco mais velho que isso não conta como fresco no boot (dias)
+WARM_MAX_AGE_DAYS = 1
+
+# Colunas que se repetem entre measure types (mantém a do primeiro measure buscado)
+_SHARED_COLUMNS = {'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT', 'MIN', 'CFID', 'CFPARAMS'}
+
+
+class TeamStatsStore:
+    """
+    Frame unificado de estatísticas de times, carregado sob demanda.
+
+    Nada é buscado no construtor: o primeiro acesso a `frame()` dispara o
+    download, e acessos seguintes reutilizam o resultado até o TTL expirar.
+
+    Com um arquivo de snapshots, o primeiro acesso aquece a partir do snapshot
+    mais recente (sem rede se ele for de hoje/ontem) e cada busca completa
+    grava o snapshot do dia.
+    """
+
+    def __init__(
+        self,
+        season: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        measures: Sequence[str] = DEFAULT_MEASURES,
+        archive: Optional[SnapshotArchive] = None
+    ):
+        self._season = season
+        self.ttl = ttl
+        self.measures = tuple(measures)
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._merged: Optional[pd.DataFrame] = None
+        self._snapshot: Optional[pd.DataFrame] = None   # Frame unificado do disco (camada de baixo do merge)
+        self._archive = archive
+        self._warmed = False
+        self._lock = threading.Lock()
+
+    @property
+    def season(self) -> str:
+        if self._season is None:
+            self._season = get_config().nba_season
+        return self._season
+
+    @property
+    def archive(self) -> SnapshotArchive:
+        if self._archive is None:
+            self._archive = SnapshotArchive(self.season)
+        return self._archive
+
+    @traced('fetch.nba_stats')
+    def _fetch(self, measure: str) -> pd.DataFrame:
+        """Busca um measure type na stats.nba.com."""
+        from nba_api.stats.endpoints import leaguedashteamstats
+
+        mark_miss()
+        configure_nba_api()
+        df = leaguedashteamstats.LeagueDashTeamStats(
+            season=self.season,
+            measure_type_detailed_defense=measure
+        ).get_data_frames()[0]
+        print(f"[OK] LeagueDashTeamStats {measure} | {len(df)} times")
+        return df
+
+    def _is_fresh(self, measure: str, now: float) -> bool:
+        return measure in self._fetched_at and now - self._fetched_at[measure] < self.ttl
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Retorna o frame unificado (índice TEAM_ID), buscando o que estiver vencido.
+
+        Se a busca de um measure falhar, mantém a versão anterior (se houver).
+
+        Returns:
+            DataFrame com colunas Base + Advanced e TEAM_ABBREVIATION
+        """
+        with self._lock:
+            now = time.time()
+            if not self._warmed:
+                self._warm_from_archive(now)
+
+            changed = False
+            for measure in self.measures:
+                if self._is_fresh(measure, now):
+                    continue
+                try:
+                    self._frames[measure] = self._fetch(measure)
+                    self._fetched_at[measure] = now
+                    changed = True
+                except Exception as e:
+                    print(f"[WARN] Erro ao buscar stats {measure}: {e}")
+
+            if changed or self._merged is None:
+                self._merged = self._merge()
+            if changed and all(self._is_fresh(m, now) for m in self.measures):
+                self.archive.save(self._merged)
+            return self._merged
+
+    def _warm_from_archive(self, now: float) -> None:
+        """Carrega o snapshot mais recente; fresco se tiver até WARM_MAX_AGE_DAYS."""
+        self._warmed = True
+        try:
+            df = self.archive.latest()
+        except Exception as e:
+            print(f"[WARN] Erro ao ler snapshot de stats: {e}")
+            return
+        if df is None or df.empty:
+            return
+
+        age = (date.today() - self.archive.latest_date()).days
+        fetched_at = now if age <= WARM_MAX_AGE_DAYS else 0.0
+        self._install(df, fetched_at)
+        print(f"[CACHE] Stats de times do snapshot {self.archive.latest_date()}")
+
+    def _install(self, df: pd.DataFrame, fetched_at: float) -> None:
+        """
+        Usa um frame unificado como dados atuais de todos os measures.
+
+        Ele não sabe de qual measure veio cada coluna: fica como camada de
+        baixo do merge, e cada measure buscado depois sobrescreve só as
+        próprias colunas (um Base que falha não prende o Advanced antigo).
+        """
+        self._snapshot = df
+        self._merged = df
+        self._frames.clear()
+        for measure in self.measures:
+            self._fetched_at[measure] = fetched_at
+
+    def _merge(self) -> pd.DataFrame:
+        """Junta os measure types por TEAM_ID (por cima do snapshot, se houver)."""
+        merged = self._snapshot
+        seen = set()   # Colunas já vindas de um measure buscado (o primeiro vence)
+        for measure in self.measures:
+            df = self._frames.get(measure)
+            if df is None or df.empty:
+                continue
+            df = df.set_index('TEAM_ID')
+            cols = [c for c in df.columns if c not in seen and not (seen and c in _SHARED_COLUMNS)]
+            seen.update(df.columns)
+            if merged is None:
+                merged = df
+            else:
+                merged = merged.drop(columns=[c for c in cols if c in merged.columns]).join(df[cols], how='outer')
+
+        if merged is None:
+            return pd.DataFrame()
+
+        merged = merged.drop(columns=[c for c in merged.columns if c.endswith('_RANK')])
+        if 'TEAM_ABBREVIATION' not in merged.columns:
+            merged['TEAM_ABBREVIATION'] = [NBA_TEAMS.resolve(int(tid)) for tid in merged.index]
+        return merged
+
+    def set_frame(self, df: pd.DataFrame) -> None:
+        """
+        Injeta um frame já unificado (ex: snapshot em disco) como dados atuais.
+
+        Args:
+            df: Frame no mesmo formato de `frame()`
+        """
+        with self._lock:
+            self._warmed = True
+            self._install(df, time.time())
+
+    def invalidate(self) -> None:
+        """Força nova busca no próximo acesso."""
+        with self._lock:
+            self._fetched_at.clear()
+
+    def by_name(self) -> Dict[str, Dict]:
+        """
+        Visão legada {TEAM_NAME: stats} usada pelo modelo de spread/total.
+
+        Returns:
+            Dict com nome do time como chave e estatísticas como valor
+        """
+        df = self.frame()
+        data = {}
+        for _, row in df.iterrows():
+            data[row['TEAM_NAME']] = {
+                'pace': row.get('PACE', 100.0),
+                'off_rtg': row.get('OFF_RATING', 110.0),
+                'def_rtg': row.get('DEF_RATING', 110.0),
+                'net_rtg': row.get('NET_RATING', 0.0),
+                'efg': row.get('EFG_PCT', 0.54),
+                'tov': row.get('TM_TOV_PCT', 0.14),
+                'orb': row.get('OREB_PCT', 0.25),
+                'ftr': row.get('FTA_RATE', 0.25),
+                'wins': row.get('W', 0),
+                'losses': row.get('L', 0),
+                'win_pct': row.get('W_PCT', 0.0)
+            }
+        return data
+
+    def def_rating_by_abbr(self) -> Dict[str, float]:
+        """
+        DefRtg por sigla, usado no ajuste de matchup dos props.
+
+        Returns:
+            Dict {TEAM_ABBREVIATION: DEF_RATING}
+        """
+        df = self.frame()
+        if df.empty or 'DEF_RATING' not in df.columns:
+            return {}
+        return dict(zip(df['TEAM_ABBREVIATION'], df['DEF_RATING']))
+
+
+_stores: Dict[str, TeamStatsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_team_stats_store(season: Optional[str] = None) -> TeamStatsStore:
+    """
+    Retorna o store compartilhado da temporada (um por processo).
+
+    Args:
+        season: Temporada no formato '2024-25' (usa config se não fornecido)
+
+    Returns:
+        TeamStatsStore da temporada
+    """
+    season = season or get_config().nba_season
+
+    with _stores_lock:
+        if season not in _stores:
+            _stores[season] = TeamStatsStore(season)
+        return _stores[season]
@@ -0,0 +1,166 @@
+"""
+Registro Canônico de Times
+Um ID por time (sigla) e mapas de hash pré-computados de todos os nomes usados
+pelas fontes (The Odds API, stats.nba.com, cdn.nba.com, fbref, ESPN) para esse ID
+"""
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Team:
+    """Identidade canônica de um time"""
+    id: str                   # Sigla canônica (ex: 'BOS', 'MCI')
+    name: str                 # Nome completo de exibição
+    nickname: str = ''        # Apelido (ex: 'Celtics')
+    source_id: Optional[int] = None  # ID numérico da fonte oficial (TEAM_ID da NBA)
+    aliases: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def _normalize(name: str) -> str:
+    """Minúsculas, sem acentos, pontuação ou espaços repetidos."""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    name = re.sub(r"[^a-z0-9 ]+", ' ', name.lower())
+    return ' '.join(name.split())
+
+
+class TeamRegistry:
+    """
+    Índice nome → ID canônico.
+
+    Todos os aliases (e suas formas normalizadas) são carregados em dicts na
+    construção; cada busca é um acesso direto, sem varredura de substring.
+    Aliases ambíguos (ex: 'Los Angeles') nunca são registrados.
+    """
+
+    def __init__(self, teams: Iterable[Team]):
+        self.teams: Dict[str, Team] = {}
+        self._raw: Dict[str, str] = {}
+        self._norm: Dict[str, str] = {}
+        self._by_source_id: Dict[int, str] = {}
+
+        for team in teams:
+            self.teams[team.id] = team
+            if team.source_id is not None:
+                self._by_source_id[team.source_id] = team.id
+            for alias in (team.id, team.name, team.nickname) + tuple(team.aliases):
+                if not alias:
+                    continue
+                self._raw[alias] = team.id
+                self._norm[_normalize(alias)] = team.id
+
+    def resolve(self, name) -> Optional[str]:
+        """
+        Converte qualquer nome/sigla/ID numérico conhecido no ID canônico.
+
+        Args:
+            name: Nome do time em qualquer fonte, sigla ou TEAM_ID numérico
+
+        Returns:
+            ID canônico ou None se desconhecido
+        """
+        if isinstance(name, (int,)) and not isinstance(name, bool):
+            return self._by_source_id.get(name)
+        team_id = self._raw.get(name)
+        if team_id is None and name:
+            team_id = self._norm.get(_normalize(name))
+        return team_id
+
+    def get(self, name) -> Optional[Team]:
+        """Retorna o Team canônico de qualquer alias."""
+        team_id = self.resolve(name)
+        return self.teams.get(team_id) if team_id else None
+
+    def names(self, team_id: str) -> List[str]:
+        """Todos os nomes conhecidos do time (útil para consultar dicts legados)."""
+        team = self.teams.get(team_id)
+        if team is None:
+            return []
+        return [team.name, team.nickname, team.id, *team.aliases]
+
+    def index(self, mapping: Dict[str, object]) -> Dict[str, object]:
+        """
+        Re-indexa um dict {nome_da_fonte: valor} pelo ID canônico.
+
+        Chaves que não resolvem são descartadas.
+        """
+        out = {}
+        for key, value in mapping.items():
+            team_id = self.resolve(key)
+            if team_id is not None:
+                out[team_id] = value
+        return out
+
+
+# --- NBA ---
+# (sigla, TEAM_ID, nome completo, apelido, aliases extras)
+_NBA_TABLE = [
+    ('ATL', 1610612737, 'Atlanta Hawks', 'Hawks', ()),
+    ('BOS', 1610612738, 'Boston Celtics', 'Celtics', ()),
+    ('CLE', 1610612739, 'Cleveland Cavaliers', 'Cavaliers', ('Cavs',)),
+    ('NOP', 1610612740, 'New Orleans Pelicans', 'Pelicans', ('NO',)),
+    ('CHI', 1610612741, 'Chicago Bulls', 'Bulls', ()),
+    ('DAL', 1610612742, 'Dallas Mavericks', 'Mavericks', ('Mavs',)),
+    ('DEN', 1610612743, 'Denver Nuggets', 'Nuggets', ()),
+    ('GSW', 1610612744, 'Golden State Warriors', 'Warriors', ('GS', 'Golden State')),
+    ('HOU', 1610612745, 'Houston Rockets', 'Rockets', ()),
+    ('LAC', 1610612746, 'Los Angeles Clippers', 'Clippers', ('LA Clippers',)),
+    ('LAL', 1610612747, 'Los Angeles Lakers', 'Lakers', ('LA Lakers',)),
+    ('MIA', 1610612748, 'Miami Heat', 'Heat', ()),
+    ('MIL', 1610612749, 'Milwaukee Bucks', 'Bucks', ()),
+    ('MIN', 1610612750, 'Minnesota Timberwolves', 'Timberwolves', ('Wolves',)),
+    ('BKN', 1610612751, 'Brooklyn Nets', 'Nets', ('BRK', 'BK')),
+    ('NYK', 1610612752, 'New York Knicks', 'Knicks', ('NY',)),
+    ('ORL', 1610612753, 'Orlando Magic', 'Magic', ()),
+    ('IND', 1610612754, 'Indiana Pacers', 'Pacers', ()),
+    ('PHI', 1610612755, 'Philadelphia 76ers', '76ers', ('Sixers',)),
+    ('PHX', 1610612756, 'Phoenix Suns', 'Suns', ('PHO',)),
+    ('POR', 1610612757, 'Portland Trail Blazers', 'Trail Blazers', ('Blazers',)),
+    ('SAC', 1610612758, 'Sacramento Kings', 'Kings', ()),
+    ('SAS', 1610612759, 'San Antonio Spurs', 'Spurs', ('SA',)),
+    ('OKC', 1610612760, 'Oklahoma City Thunder', 'Thunder', ()),
+    ('TOR', 1610612761, 'Toronto Raptors', 'Raptors', ()),
+    ('UTA', 1610612762, 'Utah Jazz', 'Jazz', ('UTAH',)),
+    ('MEM', 1610612763, 'Memphis Grizzlies', 'Grizzlies', ()),
+    ('WAS', 1610612764, 'Washington Wizards', 'Wizards', ('WSH',)),
+    ('DET', 1610612765, 'Detroit Pistons', 'Pistons', ()),
+    ('CHA', 1610612766, 'Charlotte Hornets', 'Hornets', ('CHO',)),
+]
+
+NBA_TEAMS = TeamRegistry(
+    Team(id=abbr, name=name, nickname=nick, source_id=tid, aliases=extra)
+    for abbr, tid, name, nick, extra in _NBA_TABLE
+)
+
+
+# --- PREMIER LEAGUE ---
+# (sigla, nome completo, aliases: fbref, backup, The Odds API, abreviações comuns)
+_EPL_TABLE = [
+    ('ARS', 'Arsenal', ()),
+    ('AVL', 'Aston Villa', ('Villa',)),
+    ('BOU', 'Bournemouth', ('AFC Bournemouth',)),
+    ('BRE', 'Brentford', ()),
+    ('BHA', 'Brighton', ('Brighton and Hove Albion', 'Brighton & Hove Albion')),
+    ('CHE', 'Chelsea', ()),
+    ('CRY', 'Crystal Palace', ('Palace',)),
+    ('EVE', 'Everton', ()),
+    ('FUL', 'Fulham', ()),
+    ('IPS', 'Ipswich Town', ('Ipswich',)),
+    ('LEI', 'Leicester City', ('Leicester',)),
+    ('LIV', 'Liverpool', ()),
+    ('MCI', 'Manchester City', ('Man City',)),
+    ('MUN', 'Manchester United', ('Manchester Utd', 'Man Utd', 'Man United')),
+    ('NEW', 'Newcastle United', ('Newcastle Utd', 'Newcastle')),
+    ('NFO', 'Nottingham Forest', ("Nott'm Forest", "Nott'ham Forest", 'Forest')),
+    ('SOU', 'Southampton', ()),
+    ('TOT', 'Tottenham Hotspur', ('Tottenham', 'Spurs')),
+    ('WHU', 'West Ham United', ('West Ham',)),
+    ('WOL', 'Wolverhampton Wanderers', ('Wolves',)),
+]
+
+EPL_TEAMS = TeamRegistry(
+    Team(id=abbr, name=name, aliases=extra)
+    for abbr, name, extra in _EPL_TABLE
+)
@@ -0,0 +1,279 @@
+"""
+Módulo de Tracing
+Spans leves (context manager e decorator) para medir fetches, passos do
+modelo, operações do ledger e blocos de render; um trace por rerun da página,
+gravado em JSONL rotativo
+
+Sem trace ativo (padrão), `span()` devolve um objeto nulo compartilhado e
+`traced` só testa uma contextvar: custo de uma chamada de função. Ligue para
+o processo com NBA_TRACE=1 (env/.env/st.secrets, via get_config) ou por
+rerun com `start_trace(..., enabled=True)`.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Arquivo JSONL dos traces (um objeto por rerun) e rotação
+TRACE_FILE = os.path.join("traces", "rerun_trace.jsonl")
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Liga/desliga só no contexto atual (thread do rerun de uma sessão); None = padrão da config
+_enabled: contextvars.ContextVar = contextvars.ContextVar("nba_trace_enabled", default=None)
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("nba_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("nba_span", default=None)
+_write_lock = threading.Lock()
+
+
+def enable(on: bool = True) -> None:
+    """Liga/desliga o tracing no contexto atual (outras sessões/threads não mudam)."""
+    _enabled.set(bool(on))
+
+
+def is_enabled() -> bool:
+    """Flag do contexto atual ou, se ninguém ligou/desligou, NBA_TRACE da config."""
+    on = _enabled.get()
+    if on is None:
+        from .config import get_config
+        return get_config().trace_enabled
+    return on
+
+
+class _NullSpan:
+    """Span usado com tracing desligado (ou fora de um trace): não faz nada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Um trecho medido do rerun.
+
+    Com cached=True, o span registra 'miss' se a função cacheada chamou
+    `mark_miss()` (o corpo dela executou) e 'hit' caso contrário.
+    """
+    __slots__ = ('trace', 'name', 'attrs', 'cached', 'missed', 'parent', 'depth',
+                 'start', 'duration', 'error', '_token')
+
+    def __init__(self, trace: 'Trace', name: str, cached: bool, attrs: Dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.cached = cached
+        self.missed = False
+        self.error = None
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self.depth = self.parent.depth + 1 if self.parent is not None else 0
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.trace.spans.append(self)
+        return False
+
+    def set(self, **attrs) -> None:
+        """Anexa atributos ao span (ex: número de linhas, status HTTP)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict:
+        data = {
+            'name': self.name,
+            'parent': self.parent.name if self.parent is not None else None,
+            'depth': self.depth,
+            'start_ms': round((self.start - self.trace.start) * 1000, 3),
+            'ms': round(self.duration * 1000, 3),
+        }
+        if self.cached:
+            data['cache'] = 'miss' if self.missed else 'hit'
+        if self.error:
+            data['error'] = self.error
+        if self.attrs:
+            data['attrs'] = self.attrs
+        return data
+
+
+class Trace:
+    """Todos os spans de um rerun"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.now().isoformat(timespec='milliseconds')
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Span] = []
+
+    def records(self) -> List[Dict]:
+        """Spans em ordem de início (pais antes dos filhos)."""
+        return [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)]
+
+    def summary(self) -> List[Dict]:
+        """
+        Latência agregada por nome de span.
+
+        Returns:
+            Lista de dicts com name, calls, total_ms, max_ms, hits e misses,
+            ordenada por total_ms
+        """
+        agg: Dict[str, Dict] = {}
+        for s in self.spans:
+            row = agg.setdefault(s.name, {'name': s.name, 'calls': 0, 'total_ms': 0.0,
+                                          'max_ms': 0.0, 'hits': 0, 'misses': 0})
+            ms = s.duration * 1000
+            row['calls'] += 1
+            row['total_ms'] += ms
+            row['max_ms'] = max(row['max_ms'], ms)
+            if s.cached:
+                row['misses' if s.missed else 'hits'] += 1
+        return sorted(agg.values(), key=lambda r: r['total_ms'], reverse=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'total_ms': round(self.duration * 1000, 3),
+            'spans': self.records()
+        }
+
+
+def span(name: str, cached: bool = False, **attrs):
+    """
+    Context manager que mede um trecho.
+
+    Args:
+        name: Nome do estágio (ex: 'fetch.odds', 'render.card')
+        cached: Se o trecho chama uma função cacheada (hit/miss via mark_miss)
+        **attrs: Atributos livres gravados com o span
+
+    Returns:
+        Span (ou span nulo se o tracing estiver desligado/sem trace ativo)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return Span(trace, name, cached, attrs)
+
+
+def mark_miss() -> None:
+    """
+    Chamado no corpo de uma função cacheada: o span cached=True mais próximo
+    registra 'miss' (sem o flag, o span conta como 'hit').
+    """
+    s = _current_span.get()
+    while s is not None and not s.cached:
+        s = s.parent
+    if s is not None:
+        s.missed = True
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator que mede cada chamada da função como um span.
+
+    Em funções com @st.cache_data, aplique por baixo do cache: o span só
+    existe quando a função realmente executa (miss).
+
+    Args:
+        name: Nome do span (padrão: módulo.função)
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with Span(trace, span_name, False, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(label: str, enabled: Optional[bool] = None) -> Optional[Trace]:
+    """
+    Abre o trace do rerun atual (descarta um trace anterior não fechado).
+
+    Args:
+        label: Identificação (ex: nome da página)
+        enabled: Liga/desliga só para este contexto (ex: toggle da sessão);
+                 None usa `is_enabled()`
+
+    Returns:
+        Trace aberto ou None se o tracing estiver desligado
+    """
+    if enabled is not None:
+        enable(enabled)
+    if not is_enabled():
+        _current_trace.set(None)
+        return None
+    trace = Trace(label)
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+
+def end_trace(path: Optional[str] = TRACE_FILE) -> Optional[Trace]:
+    """
+    Fecha o trace do rerun e grava uma linha no JSONL.
+
+    Args:
+        path: Arquivo JSONL (None para não gravar)
+
+    Returns:
+        Trace fechado ou None se não havia trace ativo
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    trace.duration = time.perf_counter() - trace.start
+    _current_trace.set(None)
+    if path:
+        write_trace(trace, path)
+    return trace
+
+
+def _rotate(path: str) -> None:
+    """path -> path.1 -> ... -> path.N (o mais antigo é descartado)."""
+    for i in range(TRACE_BACKUPS - 1, 0, -1):
+        src, dst = f"{path}.{i}", f"{path}.{i + 1}"
+        if os.path.exists(src):
+            os.replace(src, dst)
+    os.replace(path, f"{path}.1")
+
+
+def write_trace(trace: Trace, path: str = TRACE_FILE) -> None:
+    """Acrescenta o trace ao JSONL, rotacionando ao passar de TRACE_MAX_BYTES."""
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str) + "\n"
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > TRACE_MAX_BYTES:
+                _rotate(path)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except Exception as e:
+        print(f"[WARN] Erro ao gravar trace: {e}")
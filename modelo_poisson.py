@@ -7,6 +7,8 @@ usando a distribuição de Poisson.
 import numpy as np
 from scipy.stats import poisson
 
+from core.devig import SHIN, devig
+
 
 def calcular_probabilidades_poisson(media_gols_casa: float, media_gols_visitante: float, max_gols: int = 5) -> dict:
     """
@@ -93,6 +95,29 @@ def calcular_valor_esperado(prob_modelo: float, odd_mercado: float) -> dict:
     }
 
 
+def calcular_probabilidades_sem_vig(odd_casa: float, odd_empate: float, odd_visitante: float,
+                                    metodo: str = SHIN) -> dict:
+    """
+    Remove a margem da casa das odds 1X2 para comparar com o modelo.
+
+    Args:
+        odd_casa: Odd de mercado para vitória casa
+        odd_empate: Odd de mercado para empate
+        odd_visitante: Odd de mercado para vitória visitante
+        metodo: Método de devig (multiplicative, additive, power, shin)
+
+    Returns:
+        Dicionário com as probabilidades justas do mercado
+    """
+    p_casa, p_empate, p_visitante = devig([[odd_casa, odd_empate, odd_visitante]], metodo)[0]
+
+    return {
+        'prob_vitoria_casa': p_casa,
+        'prob_empate': p_empate,
+        'prob_vitoria_visitante': p_visitante
+    }
+
+
 def analisar_partida(media_gols_casa: float, media_gols_visitante: float,
                      odd_mercado_casa: float, odd_mercado_empate: float,
                      odd_mercado_visitante: float) -> None:
@@ -139,6 +164,16 @@ def analisar_partida(media_gols_casa: float, media_gols_visitante: float,
     print(f"Empate:           {odd_mercado_empate:.2f}")
     print(f"Vitória Visitante: {odd_mercado_visitante:.2f}")
 
+    # Probabilidades de mercado sem a margem da casa
+    probs_mercado = calcular_probabilidades_sem_vig(odd_mercado_casa, odd_mercado_empate, odd_mercado_visitante)
+
+    print("\n" + "-" * 40)
+    print("PROBABILIDADES DE MERCADO (SEM VIG)")
+    print("-" * 40)
+    print(f"Vitória Casa:     {probs_mercado['prob_vitoria_casa'] * 100:.2f}%")
+    print(f"Empate:           {probs_mercado['prob_empate'] * 100:.2f}%")
+    print(f"Vitória Visitante: {probs_mercado['prob_vitoria_visitante'] * 100:.2f}%")
+
     # Calcular EV para cada resultado
     ev_casa = calcular_valor_esperado(probs['prob_vitoria_casa'], odd_mercado_casa)
     ev_empate = calcular_valor_esperado(probs['prob_empate'], odd_mercado_empate)
@@ -16,12 +16,31 @@ except Exception as e:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import plotly.express as px
 import requests
 import feedparser
 import textwrap 
+from dataclasses import replace
+from datetime import datetime
+from itertools import groupby
 
 from core.player_props import PlayerPropsEngine
-from core.star_impact import get_team_stars
+from core.prop_pricing import price_ladder, ladder_around
+from core.correlations import PropLeg
+from core.team_stats_store import get_team_stats_store
+from core.teams import NBA_TEAMS
+from core.data_fetcher import DEFAULT_BOOKMAKERS, game_day
+from core.cards import CardView, CardRenderCache, batch_cards
+from core.slate_model import SlateModel, odds_fingerprint
+from core.star_impact import refresh_star_impact
+from core.backoffice import load_history, save_bet, update_results
+from core.exposure import get_exposure_index, exposure_limits
+from core.settlement import final_scores, settle
+from core.clv import capture_closing, get_clv_index
+from core.config import get_config
+from core import tracing
+from core.tracing import mark_miss, span, traced
 
 # --- 1. CONFIGURAÇÃO & ESTADO ---
 st.set_page_config(page_title="NBA Terminal Pro", page_icon="🏀", layout="wide")
@@ -31,6 +50,11 @@ HISTORY_FILE = Path(__file__).parent.parent / "bets_history.csv"
 
 if 'banca' not in st.session_state: st.session_state.banca = 1000.0
 if 'unidade_pct' not in st.session_state: st.session_state.unidade_pct = 1.0
+if 'trace_on' not in st.session_state: st.session_state.trace_on = tracing.is_enabled()
+
+# Um trace por rerun (painel "Timings" na sidebar; desligado = custo ~zero).
+# O toggle vale só para esta sessão: a flag fica na contextvar da thread do rerun
+tracing.start_trace("nba_pro", enabled=st.session_state.trace_on)
 
 # --- 2. CSS "GLASS-NEON" ---
 st.markdown("""
@@ -82,52 +106,61 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 3. FUNÇÕES ---
-def load_history():
-    if not os.path.exists(HISTORY_FILE): return pd.DataFrame(columns=["Data", "Jogo", "Tipo", "Aposta", "Odd", "Valor", "Resultado", "Lucro"])
-    return pd.read_csv(HISTORY_FILE)
-
-def save_bet(jogo, tipo, aposta, odd, valor):
-    df = load_history()
-    new_row = pd.DataFrame([{"Data": datetime.now().strftime("%Y-%m-%d %H:%M"), "Jogo": jogo, "Tipo": tipo, "Aposta": aposta, "Odd": odd, "Valor": valor, "Resultado": "Pendente", "Lucro": 0.0}])
-    df = pd.concat([df, new_row], ignore_index=True)
-    df.to_csv(HISTORY_FILE, index=False)
-    st.toast(f"✅ Registrado: {aposta}")
-
-@st.cache_data(ttl=86400)
+def register_bet(jogo, tipo, aposta, odd, valor, edge=None):
+    # Ledger do core (append + índice de exposição); o toast confirma só se gravou
+    if save_bet(jogo, tipo, aposta, odd, valor, filepath=str(HISTORY_FILE), edge=edge):
+        st.toast(f"✅ Registrado: {aposta}")
+    else:
+        st.toast(f"⚠️ Erro ao registrar: {aposta}")
+
 def get_advanced_team_stats():
-    try:
-        stats = leaguedashteamstats.LeagueDashTeamStats(season='2024-25', measure_type_detailed_defense='Base').get_data_frames()[0]
-        data = {}
-        for _, row in stats.iterrows():
-            data[row['TEAM_NAME']] = {'net_rtg': row['PTS'] - row['OPP_PTS']}
-        return data
+    # Store compartilhado com core.data_fetcher e PlayerPropsEngine (Net Rating real do Advanced)
+    try: return get_team_stats_store().by_name()
     except: return {}
 
+@st.cache_data(ttl=12*60*60)
+def refresh_star_table():
+    # Atualização incremental do on/off da liga (no máximo 1x por dia; falha = tabela em disco)
+    mark_miss()
+    refresh_star_impact()
+    return True
+
 def clean_clock(raw):
     if not raw: return ""
     if "M" in raw: return f"{raw.replace('PT','').split('M')[0]}:{raw.split('M')[1].replace('S','').split('.')[0]}"
     return raw
 
 @st.cache_data(ttl=20)
+@traced('fetch.live_scores')
 def get_live_scores():
+    mark_miss()
     try:
-        data = requests.get("https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json").json()
+        data = requests.get(f"{get_config().nba_cdn_base_url}/static/json/liveData/scoreboard/todaysScoreboard_00.json").json()
         live = {}
         for g in data['scoreboard']['games']:
-            info = {"live": g['gameStatus'] == 2, "period": g['period'], "clock": clean_clock(g['gameClock']), 
-                    "s_home": g['homeTeam']['score'], "s_away": g['awayTeam']['score']}
-            live[g['homeTeam']['teamName']] = info; live[g['awayTeam']['teamName']] = info
+            h_id, a_id = NBA_TEAMS.resolve(g['homeTeam']['teamTricode']), NBA_TEAMS.resolve(g['awayTeam']['teamTricode'])
+            info = {"live": g['gameStatus'] == 2, "status": g['gameStatus'], "period": g['period'], "clock": clean_clock(g['gameClock']), 
+                    "s_home": g['homeTeam']['score'], "s_away": g['awayTeam']['score'],
+                    "home_id": h_id, "away_id": a_id, "date": game_day(g.get('gameTimeUTC'))}
+            live[h_id] = info; live[a_id] = info
         return live
     except: return {}
 
+@st.cache_data(ttl=300)
+@traced('fetch.odds')
 def get_odds(api_key):
-    try: return requests.get(f'https://api.the-odds-api.com/v4/sports/basketball_nba/odds', params={'api_key': api_key, 'markets': 'spreads', 'bookmakers': 'pinnacle'}).json()
+    mark_miss()
+    # O modelo usa só spreads; totals entram no scanner de arbitragem/middles e os três
+    # mercados (spread/total/ML) na captura do fechamento para o CLV
+    try: return requests.get(f'{get_config().odds_api_base_url}/v4/sports/basketball_nba/odds', params={'api_key': api_key, 'markets': 'spreads,totals,h2h', 'bookmakers': ','.join(DEFAULT_BOOKMAKERS)}).json()
     except: return []
 
 @st.cache_data(ttl=600)
+@traced('fetch.news')
 def get_news():
+    mark_miss()
     try:
-        feed = feedparser.parse("https://www.espn.com/espn/rss/nba/news")
+        feed = feedparser.parse(f"{get_config().espn_base_url}/espn/rss/nba/news")
         noticias = []
         trans = GoogleTranslator(source='auto', target='pt')
         for e in feed.entries[:3]:
@@ -137,6 +170,73 @@ def get_news():
         return noticias
     except: return []
 
+def kelly_units(model, val_unid):
+    # Kelly simultâneo sobre todos os picks do slate (pré-jogo + ao vivo com cotação in-play),
+    # com stake máxima e exposição total limitadas
+    cfg = get_config()
+    stakes = model.portfolio(cfg.kelly_fraction, cfg.max_bet_fraction, cfg.max_exposure)
+    if val_unid <= 0: return {}
+    return {gid: round(f * st.session_state.banca / val_unid, 2) for gid, f in stakes.items()}
+
+def register_button(view, units, val_unid):
+    if units <= 0:
+        st.caption("Kelly simultâneo: sem stake (limite de exposição/correlação do slate)")
+        return
+    bet_value = val_unid * units
+    # Exposição pendente (jogo/time/dia) já registrada: corta a stake ao espaço restante
+    bet = {"Jogo": f"{view.away} @ {view.home}", "Tipo": "Spread", "Aposta": f"{view.pick} {view.line:+.1f}", "Odd": view.price, "Valor": bet_value}
+    allowed, avisos = get_exposure_index(str(HISTORY_FILE)).check(bet, exposure_limits(st.session_state.banca))
+    if avisos:
+        st.caption("⚠️ Exposição: " + " | ".join(avisos))
+        if allowed < 0.01:
+            return
+        bet_value = round(allowed, 2)
+        units = round(bet_value / val_unid, 2)
+    if st.button(f"📥 REGISTRAR (R$ {bet_value:.2f})", key=f"b_{view.home}", type="secondary", use_container_width=True):
+         st.toast(f"💰 Apostando: R$ {bet_value:.2f} ({units}u)")
+         # Edge na entrada (pontos) para o CLV por faixa: linha do pick contra o justo do mesmo lado
+         edge = view.line - view.fair if view.pick == view.home else view.line + view.fair
+         register_bet(f"{view.away} @ {view.home}", "Spread", f"{view.pick} {view.line:+.1f}", view.price, bet_value, round(edge, 1))
+
+# Jogos ao vivo: cada card é um fragmento que relê o placar cacheado (ttl=20) e
+# se redesenha sozinho, sem rerun da página (props e carteira ficam intactos)
+LIVE_REFRESH_S = 20
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def live_card(view, units, val_unid):
+    scoreboard = get_live_scores()
+    linfo = scoreboard.get(NBA_TEAMS.resolve(view.home))
+    if linfo and linfo['live']:
+        # O pick pré-jogo não vale com a bola rolando: só volta com cotação in-play recente
+        view = replace(view, period=linfo['period'], clock=linfo['clock'],
+                       s_home=str(linfo['s_home']), s_away=str(linfo['s_away']), pick=None, live_edge=None)
+        # Linha justa ao vivo: todos os jogos em andamento numa passada só, memoizada por placar
+        model = st.session_state.get('slate_model')
+        lines = model.live(scoreboard).get(view.game_id) if model else None
+        if lines:
+            view = replace(view, fair=round(lines['fair_spread'], 1), win_prob=lines['home_win'])
+            fl = model.live_line(view.game_id, lines)
+            if fl is not None:
+                pick = dict(pick=fl.pick, line=fl.line, price=fl.price, book=fl.book) if fl.pick else {}
+                view = replace(view, live_edge=round(fl.edge, 1), **pick)
+                # Stake do pick in-play pelo mesmo otimizador do slate (limites de banca/exposição)
+                units = kelly_units(model, val_unid).get(view.game_id, 0.0)
+    st.markdown(st.session_state.card_cache.render(view), unsafe_allow_html=True)
+    if view.has_value:
+        register_button(view, units, val_unid)
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def scoreboard_watch(slate_abbrs, rendered_live, odds_key):
+    # Sem UI: só dispara um rerun da página quando um jogo começa ou termina
+    # (cards pré-jogo e finais são estáticos, o fragmento ao vivo entra/sai)
+    # ou, com jogo ao vivo, quando chega um snapshot novo de odds (cotações in-play)
+    live = get_live_scores()
+    now_live = frozenset(a for a in slate_abbrs if live.get(a, {}).get('live'))
+    if now_live != rendered_live:
+        st.rerun()
+    if now_live and odds_fingerprint(get_odds(API_KEY)) != odds_key:
+        st.rerun()
+
 # --- 4. INTERFACE ---
 st.title("🏆 NBA Terminal Pro")
 
@@ -146,6 +246,7 @@ with st.sidebar:
     st.session_state.unidade_pct = st.slider("Unidade (%)", 0.5, 5.0, st.session_state.unidade_pct, step=0.5)
     val_unid = st.session_state.banca * (st.session_state.unidade_pct / 100)
     st.markdown("---")
+    st.toggle("⏱️ Timings", key="trace_on", help="Mede cada fetch, passo do modelo e render deste rerun")
     st.markdown(f"<div class='bankroll-card'><div style='color:#64748b;font-size:0.75rem;font-weight:700'>VALOR 1 UNIDADE</div><div style='color:#38bdf8;font-size:1.6rem;font-weight:800'>R$ {val_unid:.2f}</div></div>", unsafe_allow_html=True)
 
 # Inicializa Engine
@@ -164,8 +265,12 @@ with tab_props:
 
     if p_name and opp_team and st.button("🔮 Calcular Projeção", type="primary"):
         with st.spinner(f"Analisando dados de {p_name}..."):
-            proj = st.session_state.props_engine.get_projection(p_name, opp_team.upper())
-            
+            with span('model.prop_projection', player=p_name):
+                st.session_state.prop_proj = st.session_state.props_engine.get_projection(p_name, opp_team.upper())
+                st.session_state.prop_dist = st.session_state.props_engine.get_distribution(p_name, opp_team.upper())
+
+    if 'prop_proj' in st.session_state:
+        proj = st.session_state.prop_proj
         if proj:
             html_card = textwrap.dedent(f"""
             <div class="game-card" style="padding: 20px; text-align: center;">
@@ -198,175 +303,232 @@ with tab_props:
             """)
             st.markdown(html_card, unsafe_allow_html=True)
             
-            if st.button(f"📥 Registrar Over {proj['projection']}", key="btn_prop"):
-                save_bet(f"{proj['player']} (Props)", "Over Pts", f"Over {proj['projection']}", 1.90, st.session_state.banca * 0.01)
+            # --- ESCADA DE LINHAS (OVER/UNDER) ---
+            dist = st.session_state.get('prop_dist')
+            if dist:
+                c_lin, c_ov, c_un = st.columns(3)
+                linha_mkt = c_lin.number_input("Linha de Mercado", value=float(ladder_around(dist.mean, 0)[0]), step=0.5, key="prop_line")
+                odd_over = c_ov.number_input("Odd Over", value=1.90, step=0.01, key="prop_odd_over")
+                odd_under = c_un.number_input("Odd Under", value=1.90, step=0.01, key="prop_odd_under")
+                # As odds informadas valem só para a linha cotada: as alternativas mostram prob. e odd justa
+                lines = np.union1d(ladder_around(dist.mean), [linha_mkt])
+                cotada = lines == linha_mkt
+                with span('model.prop_ladder'):
+                    ladder = price_ladder([dist], lines, np.where(cotada, odd_over, np.nan), np.where(cotada, odd_under, np.nan))
+                ladder_df = pd.DataFrame({
+                    "Linha": lines,
+                    "P(Over)": ladder['p_over'][0] * 100,
+                    "P(Under)": ladder['p_under'][0] * 100,
+                    "Odd Justa Over": ladder['fair_over'][0],
+                    "Odd Justa Under": ladder['fair_under'][0],
+                    "EV Over %": ladder['edge_over'][0] * 100,
+                    "EV Under %": ladder['edge_under'][0] * 100,
+                })
+                st.caption(f"Distribuição: {dist.family} | média {dist.mean:.1f} | desvio {dist.std:.1f} | {dist.n_games} jogos")
+                st.dataframe(ladder_df.round(2), hide_index=True, use_container_width=True)
+
+                # Melhor lado na linha cotada (o par linha/odd que o mercado de fato oferece)
+                mkt = ladder_df[cotada].iloc[0]
+                if mkt["EV Over %"] >= mkt["EV Under %"]:
+                    side, odd_side, best_ev = "Over", odd_over, mkt["EV Over %"]
+                else:
+                    side, odd_side, best_ev = "Under", odd_under, mkt["EV Under %"]
+
+                if best_ev > 0:
+                    if st.button(f"📥 Registrar {side} {linha_mkt} @ {odd_side:.2f} (EV {best_ev:+.1f}%)", key="btn_prop"):
+                        register_bet(f"{proj['player']} (Props)", f"{side} Pts", f"{side} {linha_mkt}", odd_side, st.session_state.banca * 0.01)
+                else:
+                    st.info("Sem EV positivo na linha cotada com essas odds.")
         else:
             st.error("Jogador não encontrado ou dados insuficientes.")
 
+    # --- COMBINAÇÃO DO MESMO JOGO (CORRELAÇÕES) ---
+    with st.expander("🔗 Combinação do Mesmo Jogo (Correlações)"):
+        with st.form("form_sgp"):
+            c_sgp1, c_sgp2, c_sgp3 = st.columns([3, 1, 1])
+            sgp_legs_txt = c_sgp1.text_area("Pernas (uma por linha: Jogador, STAT, Linha, Over/Under)", placeholder="Jayson Tatum, PTS, 26.5, Over\nJaylen Brown, AST, 4.5, Over")
+            sgp_team = c_sgp2.text_input("Time (Sigla)", placeholder="BOS")
+            sgp_opp = c_sgp3.text_input("Contra (Sigla)", placeholder="NYK")
+            sgp_submit = st.form_submit_button("🎲 Simular Combinação")
+
+        if sgp_submit and sgp_legs_txt and sgp_team:
+            try:
+                legs = []
+                for raw in sgp_legs_txt.strip().splitlines():
+                    nome, stat, linha, lado = [x.strip() for x in raw.split(",")]
+                    legs.append(PropLeg(nome, stat.upper(), float(linha), lado.capitalize()))
+            except ValueError:
+                legs = []
+                st.error("Formato inválido. Use: Jogador, STAT, Linha, Over/Under")
+
+            if legs:
+                with st.spinner("Simulando combinação..."), span('model.same_game', legs=len(legs)):
+                    sgp = st.session_state.props_engine.price_same_game(sgp_team.upper(), legs, sgp_opp.upper())
+                if sgp:
+                    k1, k2, k3 = st.columns(3)
+                    k1.metric("Prob. Conjunta", f"{sgp['p_joint']*100:.1f}%")
+                    k2.metric("Odd Justa", f"{sgp['fair_odds']:.2f}")
+                    k3.metric("Lift da Correlação", f"{sgp['correlation_lift']:.2f}x")
+                else:
+                    st.error("Jogador não encontrado ou dados insuficientes.")
+
 with tab_ops:
     c_scan, c_news = st.columns([1.5, 4])
     with c_scan:
         if st.button("🔄 ATUALIZAR ODDS", type="primary", use_container_width=True):
             st.cache_data.clear(); st.rerun()
     with c_news:
-        news = get_news()
+        with span('page.news', cached=True):
+            news = get_news()
         if news and st.toggle("Mostrar Notícias", False):
             for n in news:
                 st.markdown(f"<div class='news-item'><b style='color:#94a3b8; font-size:0.8rem'>{n['hora']}</b> <span style='color:#e2e8f0; font-size:0.9rem'>{n['titulo']}</span></div>", unsafe_allow_html=True)
     
     st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
     
-    STATS = get_advanced_team_stats()
-    ODDS = get_odds(API_KEY)
-    LIVE = get_live_scores()
+    with span('page.team_stats', cached=True):
+        STATS = NBA_TEAMS.index(get_advanced_team_stats())
+    with span('page.star_impact', cached=True):
+        refresh_star_table()
+    with span('page.odds', cached=True):
+        ODDS = get_odds(API_KEY)
+    with span('page.live_scores', cached=True):
+        LIVE = get_live_scores()
+    
+    # Jogos finalizados: liquida as pendentes (Spread/Total/ML) uma vez por novo conjunto de finais
+    FINALS = frozenset(final_scores(LIVE))
+    if FINALS and FINALS != st.session_state.get('settled_finals'):
+        with span('page.settle', games=len(FINALS)):
+            liquidadas = settle(str(HISTORY_FILE), LIVE)
+        st.session_state.settled_finals = FINALS
+        if not liquidadas.empty: st.toast(f"⚖️ {len(liquidadas)} apostas liquidadas pelo placar final")
     
     if not ODDS or isinstance(ODDS, dict):
         st.info("Mercado Fechado ou Sem Jogos.")
     else:
+        # Modelo do slate na sessão: consenso/melhor linha, scan e ratings base calculados uma
+        # vez por snapshot de odds/stats; linhas justas memoizadas por (jogo, desfalques)
+        MODEL = st.session_state.get('slate_model')
+        if MODEL is None or not MODEL.matches(ODDS, STATS):
+            with span('model.slate_build', games=len(ODDS)):
+                MODEL = st.session_state.slate_model = SlateModel(ODDS, STATS)
+        
+        # Fechamento: a cada snapshot novo de odds grava a linha atual nas apostas abertas
+        # de jogos ainda não iniciados (o último snapshot antes do tip-off fica como CLV)
+        if st.session_state.get('clv_snapshot') != MODEL.fingerprint[0]:
+            with span('page.clv_capture'):
+                capture_closing(MODEL.odds, str(HISTORY_FILE), MODEL.summary)
+            st.session_state.clv_snapshot = MODEL.fingerprint[0]
+        
+        # Surebets e middles entre todas as casas do slate
+        SCAN = MODEL.arbitrage()
+        n_opps = len(SCAN['arbs']) + len(SCAN['middles'])
+        if n_opps:
+            with st.expander(f"🧮 Arbitragem & Middles ({n_opps})"):
+                for r in SCAN['arbs'].itertuples():
+                    pernas = " | ".join(f"{sd} @ {bk} {pr:.2f} ({stk*100:.1f}%)" for sd, bk, pr, stk in r.legs)
+                    st.markdown(f"**SUREBET** {r.market} {r.line:+.1f} → retorno garantido **{r.roi*100:.2f}%** · {pernas}")
+                for r in SCAN['middles'].itertuples():
+                    pernas = " | ".join(f"{sd} {pt:+.1f} @ {bk} {pr:.2f}" for sd, bk, pt, pr in r.legs)
+                    st.markdown(f"**MIDDLE** {r.market} janela {r.width:.1f} pts · pior {r.worst_case*100:+.2f}% / melhor {r.best_case*100:+.1f}% · {pernas}")
+        
+        # Cards: primeiro monta os dados de cada jogo, depois renderiza cada coluna em blocos
+        if 'card_cache' not in st.session_state:
+            st.session_state.card_cache = CardRenderCache()
+        CARDS = st.session_state.card_cache
         col_1, col_2 = st.columns(2)
-        for idx, game in enumerate(ODDS):
-            h, a = game['home_team'], game['away_team']
-            curr_col = col_1 if idx % 2 == 0 else col_2
+        columns_views = ([], [])
+        
+        for idx, base in enumerate(MODEL.games.values()):
+            h, a, gid = base.home, base.away, base.game_id
+            h_abbr, a_abbr = base.home_abbr, base.away_abbr
             
-            linfo = None
-            for k, v in LIVE.items():
-                if k in h or h in k: linfo = v; break
+            linfo = LIVE.get(h_abbr)
             is_live = linfo['live'] if linfo else False
-            
-            if is_live:
-                badge_html = f"<span class='status-badge live-badge'>🔴 Q{linfo['period']} {linfo['clock']}</span>"
-                s_a_txt = linfo['s_away']; s_h_txt = linfo['s_home']; css_live = "card-live"
-            else:
-                badge_html = f"<span class='status-badge'>{pd.to_datetime(game['commence_time']).strftime('%H:%M')}</span>"
-                s_a_txt = "-"; s_h_txt = "-"; css_live = ""
-
-            # Mapping simplificado para testar (Ideal: Usar dados da NBA API)
-            team_map = {
-                "Boston Celtics": "BOS", "Denver Nuggets": "DEN", "Milwaukee Bucks": "MIL",
-                "Philadelphia 76ers": "PHI", "Phoenix Suns": "PHX", "Los Angeles Lakers": "LAL",
-                "Golden State Warriors": "GSW", "Dallas Mavericks": "DAL", "Oklahoma City Thunder": "OKC",
-                "Minnesota Timberwolves": "MIN", "New York Knicks": "NYK", "Miami Heat": "MIA",
-                "Los Angeles Clippers": "LAC", "Atlanta Hawks": "ATL", "Houston Rockets": "HOU"
-            }
-            
+
             # --- LESÕES E AJUSTES ---
-            h_abbr, a_abbr = team_map.get(h, "UNK"), team_map.get(a, "UNK")
-            h_stars, a_stars = get_team_stars(h_abbr), get_team_stars(a_abbr)
-            
-            penalty_h, penalty_a = 0.0, 0.0
+            missing = set()
             
             # Expander para Lesões (Só mostra se tiver estrelas mapeadas)
-            if h_stars or a_stars:
+            if base.home_stars or base.away_stars:
                 with st.expander(f"🚑 Ajuste de Desfalques ({a_abbr} @ {h_abbr})"):
                     c_inj_a, c_inj_h = st.columns(2)
                     
-                    with c_inj_a:
-                        if a_stars:
-                            st.caption(f"Desfalques {a}")
-                            for star, imp in a_stars.items():
-                                if st.checkbox(f"{star} (-{imp})", key=f"inj_{idx}_{star}"):
-                                    penalty_a += imp
-                                    
-                    with c_inj_h:
-                        if h_stars:
-                            st.caption(f"Desfalques {h}")
-                            for star, imp in h_stars.items():
-                                if st.checkbox(f"{star} (-{imp})", key=f"inj_{idx}_{star}"):
-                                    penalty_h += imp
-
-            s_h = next((v for k,v in STATS.items() if k in h or h in k), {'net_rtg':0})
-            s_a = next((v for k,v in STATS.items() if k in a or a in k), {'net_rtg':0})
-            
-            # CÁLCULO DINÂMICO
-            # NetRtg Ajustado = NetRtg Base - Penalidade por Lesão
-            rtg_h_adj = s_h['net_rtg'] - penalty_h
-            rtg_a_adj = s_a['net_rtg'] - penalty_a
-            
-            # Fair Line: (Home_Adj + 2.5 HomeAdv) - Away_Adj
-            # Negativo = Home Fav (ex: -5.0)
-            fair = -((rtg_h_adj + 2.5) - rtg_a_adj)
-            
-            m_spr = 0.0
-            for s in game.get('bookmakers', []):
-                p = s['markets'][0]['outcomes'][0]['point']
-                m_spr = -p if s['markets'][0]['outcomes'][0]['name'] != h else p; break
-            if m_spr == 0.0: continue
-            
-            diff = abs(fair - m_spr)
-            has_val = diff >= 1.5
+                    for col, team, stars in ((c_inj_a, a, base.away_stars), (c_inj_h, h, base.home_stars)):
+                        with col:
+                            if stars:
+                                st.caption(f"Desfalques {team}")
+                                for star, imp in stars.items():
+                                    if st.checkbox(f"{star} (-{imp})", key=f"inj_{gid}_{star}"):
+                                        missing.add(star)
+
+            # Linha justa memoizada: só o jogo cujo conjunto de desfalques mudou é recalculado
+            fl = MODEL.line(gid, frozenset(missing))
+            if fl is None: continue
             
-            # --- CORREÇÃO FINAL: TEXTWRAP.DEDENT ---
-            # Remove qualquer indentação acidental antes de renderizar
-            html_card = textwrap.dedent(f"""
-                <div class="game-card {css_live}">
-                    <div class="card-header">
-                        <div>{badge_html}</div>
-                        <div style="text-align:right">
-                            <div class="team-row"><span class="team-name">{a}</span> <span class="team-score">{s_a_txt}</span></div>
-                            <div class="team-row"><span class="team-name">{h}</span> <span class="team-score">{s_h_txt}</span></div>
-                        </div>
-                    </div>
-                    <div class="card-body">
-                        <div class="metric-col">
-                            <div class="metric-lbl">MODELO (AJUSTADO)</div>
-                            <div class="metric-val val-highlight">{fair:+.1f}</div>
-                        </div>
-                        <div class="metric-col">
-                            <div class="metric-lbl">MERCADO</div>
-                            <div class="metric-val">{m_spr:+.1f}</div>
-                        </div>
-                    </div>
-            """).strip()
+            pick = {}
+            if fl.pick is not None:
+                pick = dict(pick=fl.pick, line=fl.line, price=fl.price, book=fl.book)
             
-            with curr_col:
-                with st.container():
-                    st.markdown(html_card, unsafe_allow_html=True)
-                    
-                    if has_val:
-                        pick = h if fair < m_spr else a
-                        line = m_spr if pick == h else -m_spr
-                        units = 1.5 if diff > 3 else 0.75
-                        units = 1.5 if diff > 3 else 0.75
-                        bet_value = val_unid * units
-                        
-                        html_footer = textwrap.dedent(f"""
-                            <div class="card-action">
-                                <div>
-                                    <div class="value-tag">✨ VALOR ENCONTRADO</div>
-                                    <div class="bet-info">{pick} {line:+.1f}</div>
-                                </div>
-                            </div>
-                        """).strip()
-                        st.markdown(html_footer, unsafe_allow_html=True)
-                        
-                        if st.button(f"📥 REGISTRAR (R$ {bet_value:.2f})", key=f"b_{h}", type="secondary", use_container_width=True):
-                             st.toast(f"💰 Apostando: R$ {bet_value:.2f} ({units}u)")
-                             save_bet(f"{a} @ {h}", "Spread", f"{pick} {line:+.1f}", 1.91, bet_value)
-                    else:
-                         st.markdown("""<div style="padding:15px; text-align:center; color:#475569; font-size:0.8rem; font-style:italic;">Sem oportunidade de valor</div>""", unsafe_allow_html=True)
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
+            live_fields = dict(live=True, period=linfo['period'], clock=linfo['clock'],
+                               s_home=str(linfo['s_home']), s_away=str(linfo['s_away'])) if is_live else {}
+            columns_views[idx % 2].append(CardView(
+                game_id=gid, home=h, away=a,
+                tipoff=pd.to_datetime(base.commence_time).strftime('%H:%M'),
+                fair=round(fl.fair, 1), market=fl.market, **live_fields, **pick
+            ))
+        
+        # Jogos em andamento entram no portfolio pelo pick in-play (ou saem, sem cotação recente)
+        MODEL.live(LIVE)
+        units_by_game = kelly_units(MODEL, val_unid)
+        
+        # Um st.markdown por bloco de cards estáticos (cards com valor quebram o bloco, pelo botão);
+        # jogos com status 2 viram fragmentos que se atualizam sozinhos
+        CARDS.prune(v.game_id for views in columns_views for v in views)
+        for curr_col, views in zip((col_1, col_2), columns_views):
+            with span('render.column', cards=len(views)):
+                with curr_col:
+                    for is_live, run in groupby(views, key=lambda v: v.live):
+                        if is_live:
+                            for view in run:
+                                live_card(view, units_by_game.get(view.game_id, 0.0), val_unid)
+                            continue
+                        for block_html, view in batch_cards(list(run), CARDS):
+                            st.markdown(block_html, unsafe_allow_html=True)
+                            if view is not None:
+                                register_button(view, units_by_game.get(view.game_id, 0.0), val_unid)
+        
+        # Vigia do placar só enquanto houver jogo do slate não encerrado
+        slate_abbrs = frozenset(NBA_TEAMS.resolve(t) for g in ODDS for t in (g['home_team'], g['away_team'])) - {None}
+        if any(LIVE.get(a, {}).get('status', 1) != 3 for a in slate_abbrs):
+            scoreboard_watch(slate_abbrs, frozenset(a for a in slate_abbrs if LIVE.get(a, {}).get('live')), MODEL.fingerprint[0])
 
 with tab_adm:
     st.subheader("📈 Performance da Carteira")
-    df = load_history()
+    df = load_history(str(HISTORY_FILE))
     if not df.empty:
         edited = st.data_editor(
             df, num_rows="dynamic", key="editor",
-            column_config={"Resultado": st.column_config.SelectboxColumn("Status", options=["Pendente","Green","Red"]), "Lucro": st.column_config.NumberColumn("Lucro (R$)", format="%.2f")},
+            column_config={"Resultado": st.column_config.SelectboxColumn("Status", options=["Pendente","Green","Red","Void"]), "Lucro": st.column_config.NumberColumn("Lucro (R$)", format="%.2f", disabled=True)},
             hide_index=True
         )
         if st.button("💾 Salvar Alterações"):
-            for i, r in edited.iterrows():
-                if r['Resultado'] == 'Green': edited.at[i, 'Lucro'] = r['Valor'] * 0.91
-                elif r['Resultado'] == 'Red': edited.at[i, 'Lucro'] = -r['Valor']
-            edited.to_csv(HISTORY_FILE, index=False); st.rerun()
+            # Lucro sai do Resultado e da odd de cada aposta (Void = 0; coluna só leitura no editor)
+            # e o índice de exposição recebe só a diferença de pendentes
+            update_results(edited, str(HISTORY_FILE))
+            st.rerun()
+        
+        # CLV por mercado e faixa de edge (índice pré-computado, sem reler snapshots)
+        clv_resumo = get_clv_index(str(HISTORY_FILE)).frame()
+        if not clv_resumo.empty:
+            st.subheader("📐 Closing Line Value")
+            st.dataframe(clv_resumo.round(2), hide_index=True, use_container_width=True)
             
         finalizadas = edited[edited['Resultado']!='Pendente']
         if not finalizadas.empty:
             edited['Acumulado'] = edited['Lucro'].cumsum()
             fig = px.area(edited, x=edited.index, y='Acumulado', title='Crescimento da Banca (R$)', template='plotly_dark')
-            fig.update_traces(line_color='#38bdf8', fill_color='rgba(56, 189, 248, 0.1)')
+            fig.update_traces(line_color='#38bdf8', fillcolor='rgba(56, 189, 248, 0.1)')
             fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
             st.plotly_chart(fig, use_container_width=True)
             
@@ -377,3 +539,12 @@ with tab_adm:
             k3.metric("Fechadas", len(finalizadas))
     else:
         st.info("Nenhuma aposta registrada ainda.")
+
+# --- 5. TIMINGS DO RERUN ---
+TRACE = tracing.end_trace()
+if TRACE is not None:
+    with st.sidebar.expander(f"⏱️ Timings ({TRACE.duration*1000:.0f} ms)", expanded=False):
+        resumo = pd.DataFrame(TRACE.summary())
+        if not resumo.empty:
+            st.dataframe(resumo.round(1), hide_index=True, use_container_width=True)
+        st.caption(f"Trace gravado em {tracing.TRACE_FILE}")
@@ -1,10 +1,10 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 from scipy.stats import poisson
-import requests
-import time
-from datetime import datetime
+
+from core.epl_table import get_epl_table, table_stats
+from core.teams import EPL_TEAMS
+from core.devig import SHIN, devig, overround
 
 # --- CONFIGURACAO VISUAL ---
 st.markdown("""
@@ -28,58 +28,22 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 1. DADOS DE BACKUP (Para caso o site bloqueie) ---
-BACKUP_STATS = {
-    "Liverpool": [19, 45, 19], "Arsenal": [19, 42, 18], "Man City": [19, 48, 20],
-    "Aston Villa": [19, 30, 25], "Chelsea": [19, 35, 22], "Newcastle": [19, 32, 21],
-    "Man Utd": [19, 26, 25], "Tottenham": [19, 38, 28], "Brighton": [19, 28, 28],
-    "Nott'm Forest": [19, 22, 25], "Brentford": [19, 30, 30], "West Ham": [19, 26, 32],
-    "Bournemouth": [19, 24, 28], "Fulham": [19, 22, 26], "Crystal Palace": [19, 20, 28],
-    "Everton": [19, 18, 30], "Wolves": [19, 20, 35], "Leicester City": [19, 20, 38],
-    "Ipswich Town": [19, 18, 40], "Southampton": [19, 15, 42]
-}
-
-# --- 2. MOTOR DE DADOS AO VIVO ---
+# --- 1. MOTOR DE DADOS (cache em disco > requisicao condicional ao fbref > dados_pl.csv) ---
 @st.cache_data(ttl=600)
 def obter_dados_live():
-    """Baixa a tabela atualizada com tecnica anti-cache."""
-    timestamp_request = int(time.time())
-    url = f"https://fbref.com/en/comps/9/Premier-League-Stats?nocache={timestamp_request}"
-
-    stats = {}
-    hora_atual = datetime.now().strftime("%H:%M:%S")
-
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=6)
-
-        if response.status_code == 200:
-            dfs = pd.read_html(response.text)
-            tabela = dfs[0]
-            for index, row in tabela.iterrows():
-                time_nome = row['Squad']
-                jogos = row['MP']
-                gf = row['GF']
-                ga = row['GA']
-                stats[time_nome] = [jogos, gf, ga]
-            return stats, "online", hora_atual
-    except Exception:
-        pass
-
-    return BACKUP_STATS, "backup", hora_atual
-
-# --- 3. CALCULO DE POISSON ---
+    """Tabela da liga: so a classificacao do fbref, revalidada com ETag quando o cache em disco vence."""
+    tabela = get_epl_table()
+    return table_stats(tabela.frame), tabela.source, tabela.fetched_at.strftime("%d/%m %H:%M:%S")
+
+# --- 2. CALCULO DE POISSON ---
 def calcular_probs(time_casa, time_fora, stats):
-    # Tratamento de erro para times nao encontrados
+    # Tratamento de erro para times nao encontrados (nomes de fontes diferentes via registro canonico)
+    stats_por_id = EPL_TEAMS.index(stats)
+
     def get_stat(t):
         if t in stats:
             return stats[t]
-        for k in stats.keys():
-            if t in k or k in t:
-                return stats[k]
-        return [1, 1, 1]
+        return stats_por_id.get(EPL_TEAMS.resolve(t), [1, 1, 1])
 
     stat_c = get_stat(time_casa)
     stat_f = get_stat(time_fora)
@@ -114,22 +78,24 @@ def calcular_probs(time_casa, time_fora, stats):
 
     return xg_casa, xg_fora, prob_c, prob_e, prob_f
 
-# --- 4. INTERFACE ---
+# --- 3. INTERFACE ---
 st.title("Premier League Live-Quant")
 
 with st.sidebar:
     st.header("Central de Controle")
     if st.button("FORCAR ATUALIZACAO AGORA", type="primary", use_container_width=True):
-        st.cache_data.clear()
-        st.rerun()
-    st.caption("Isso ignora o cache e tenta baixar dados frescos.")
+        get_epl_table(force=True)
+        obter_dados_live.clear()
+    st.caption("Isso ignora o cache e revalida a tabela com o fbref.")
 
 stats, status, hora = obter_dados_live()
 
-if status == "online":
+if status in ("online", "cache"):
     st.markdown(f'<div class="status-badge status-ok">ONLINE: DADOS DE {hora}</div>', unsafe_allow_html=True)
+elif status == "stale":
+    st.markdown(f'<div class="status-badge status-backup">CACHE EM DISCO DE {hora} (fbref indisponivel)</div>', unsafe_allow_html=True)
 else:
-    st.markdown(f'<div class="status-badge status-backup">MODO BACKUP (Erro na conexao)</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="status-badge status-backup">MODO BACKUP: dados_pl.csv (fbref indisponivel)</div>', unsafe_allow_html=True)
 
 times = sorted(list(stats.keys()))
 idx_casa = next((i for i, t in enumerate(times) if "City" in t), 0)
@@ -212,6 +178,16 @@ if t_casa != t_fora:
         else:
             st.error(f"EV: {ev_fora*100:.1f}%")
 
+    # Probabilidade do mercado sem a margem da casa (Shin) vs modelo
+    pm_c, pm_e, pm_f = devig([[odd_mercado_casa, odd_mercado_empate, odd_mercado_fora]], SHIN)[0]
+    margem = overround([[odd_mercado_casa, odd_mercado_empate, odd_mercado_fora]])[0]
+    st.caption(
+        f"Mercado sem vig (margem {margem*100:.1f}%): "
+        f"Casa {pm_c*100:.1f}% (modelo {pc*100:.1f}%) | "
+        f"Empate {pm_e*100:.1f}% (modelo {pe*100:.1f}%) | "
+        f"Fora {pm_f*100:.1f}% (modelo {pf*100:.1f}%)"
+    )
+
     # Resumo de apostas com valor
     apostas_valor = []
     if ev_casa > 0: